@@ -1,64 +1,127 @@
 import sys
 import os
 
-from core.loader import Loader
-from core.config_manager import ConfigManager
-from core.osc_handler import OSCHandler
-from ui.main_window import MainWindow
-from schemas.contacts import Contact
-from schemas.bindings import Binding
+# Created before anything else is imported, so the startup profile covers the imports too
+from core.startup import StartupProfiler
+PROFILER = StartupProfiler()
+
+with PROFILER.phase("import config and schemas"):
+    from core.config_manager import ConfigManager, CONFIG_FILE
+    from core.config_watcher import ConfigWatcher, parse_config
+    from schemas.patterns import Pattern
+    from schemas.spatial import MotorLayout
+with PROFILER.phase("import core"):
+    from core.loader import Loader
+    from core.osc_handler import OSCHandler
+    from core.metrics import MetricsServer
+    from core.state_export import StateExporter
+    from core.module_watcher import ModuleWatcher
+    from core.device_registry import DeviceRegistry
+with PROFILER.phase("import ui"):
+    from ui.main_window import MainWindow
 
 class MainApp:
     def __init__(self):
-        self.loader = Loader()
+        self.loader = Loader(isolated_modules=ConfigManager.get_isolated_modules())
         self.modules = self.loader.load_modules()
-        self._scan_all_modules()
+        # Devices from the last run are usable right away, scans confirm them in the background
+        self.registry = DeviceRegistry(ConfigManager.get_known_devices())
 
-    def _scan_all_modules(self):
-        for name, module in self.modules.items():
-            if hasattr(module, 'scan'):
-                print(f"Auto-scanning devices for module: {name}")
-                try:
-                    module.scan()
-                except Exception as e:
-                    print(f"Error during auto-scan for module '{name}': {e}")
+    def scan_devices(self):
+        return self.registry.scan_all(self.modules)
 
-if __name__ == "__main__":
-    app = MainApp()
-    
-    print("Loading Configuration...")
-    config_data = ConfigManager.load_config()
-    
+def load_config(config_data):
+    """Contacts, bindings, patterns and motor layouts from the config file's data."""
     # Parse Contacts and Bindings
-    contacts = []
-    if "contacts" in config_data:
-        for c in config_data["contacts"]:
-            try:
-                # Ensure it's a dict
-                if isinstance(c, dict):
-                    contacts.append(Contact(**c))
-            except Exception as e:
-                print(f"Error parsing contact: {e}")
-                
-    bindings = []
-    if "bindings" in config_data:
-        for b in config_data["bindings"]:
+    contacts, bindings = parse_config(config_data)
+
+    patterns = []
+    if "patterns" in config_data:
+        for p in config_data["patterns"]:
             try:
-                if isinstance(b, dict):
-                    bindings.append(Binding(**b))
+                if isinstance(p, dict):
+                    patterns.append(Pattern(**p))
             except Exception as e:
-                print(f"Error parsing binding: {e}")
+                print(f"Error parsing pattern: {e}")
+
+    layouts = []
+    for l in config_data.get("layouts", []):
+        try:
+            if isinstance(l, dict):
+                layouts.append(MotorLayout(**l))
+        except Exception as e:
+            print(f"Error parsing layout: {e}")
+    return contacts, bindings, patterns, layouts
+
+if __name__ == "__main__":
+    with PROFILER.phase("load modules"):
+        app = MainApp()
+    
+    print("Loading Configuration...")
+    with PROFILER.phase("load config"):
+        config_data = ConfigManager.load_config()
+        contacts, bindings, patterns, layouts = load_config(config_data)
 
     print(f"Loaded {len(contacts)} contacts and {len(bindings)} bindings.")
 
     print("Initializing OSC Handler...")
-    osc_handler = OSCHandler(app.modules, contacts, bindings)
+    app_settings = ConfigManager.get_app_settings()
+    with PROFILER.phase("OSC handler"):
+        osc_handler = OSCHandler(
+            app.modules, contacts, bindings,
+            patterns=patterns,
+            pattern_rate_hz=app_settings.get("pattern_rate_hz", 50),
+            frame_rate_hz=app_settings.get("array_frame_rate_hz", 60),
+            layouts=layouts
+        )
+
+
+    # Optional loopback endpoint for dashboards (Prometheus / JSON)
+    metrics_server = None
+    if app_settings.get("metrics_port"):
+        metrics_server = MetricsServer(osc_handler.metrics, port=int(app_settings["metrics_port"]))
+        metrics_server.start()
+
+    # Optional live state file for overlays and other tools (core/state_export.py)
+    state_exporter = None
+    if app_settings.get("state_export"):
+        path = app_settings["state_export"] if isinstance(app_settings["state_export"], str) else None
+        state_exporter = StateExporter(osc_handler, app.registry, path=path,
+                                       rate_hz=app_settings.get("state_export_hz", 30))
+        state_exporter.start()
     
     print("Starting Main Window...")
     # Pass ConfigManager class and the handler
-    gui = MainWindow(ConfigManager, osc_handler)
+    with PROFILER.phase("main window"):
+        gui = MainWindow(ConfigManager, osc_handler, app.registry, profiler=PROFILER)
+    app.scan_devices()
+
+    # Reload edited modules in place instead of restarting the app
+    module_watcher = None
+    if app_settings.get("hot_reload_modules"):
+        module_watcher = ModuleWatcher(app.loader, on_change=gui.on_module_changed)
+
+    # Apply edits made to user_config.json by other tools while running
+    config_watcher = None
+    if app_settings.get("watch_config", True):
+        config_watcher = ConfigWatcher(CONFIG_FILE, on_change=gui.on_config_file_changed)
+        ConfigManager.add_save_listener(config_watcher.saved)
+
+    PROFILER.mark("window ready")
+    if app_settings.get("profile_startup") or "--profile-startup" in sys.argv:
+        print(PROFILER.report())
+
     gui.mainloop()
     
     # Cleanup on exit
     print("Shutting down...")
+    if config_watcher:
+        config_watcher.stop()
+    if module_watcher:
+        module_watcher.stop()
+    if metrics_server:
+        metrics_server.stop()
+    if state_exporter:
+        state_exporter.stop()
     osc_handler.shutdown()
+    app.loader.shutdown()
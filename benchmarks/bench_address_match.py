@@ -0,0 +1,79 @@
+"""
+Address matching cost for growing numbers of contacts (core/address_trie.py).
+
+A third of the contacts have exact osc_paths, a third are patterns like
+/avatar/parameters/Zone<n>_{index}, and a third share their literal prefix
+and differ after the capture: /avatar/parameters/Haptic_{index}_Zone<n>.
+Compares the old linear scan over the
+contact list (exact paths only, it can't match patterns) with the trie
+lookup the handler uses now, for a mix of exact, pattern and unmapped
+addresses.
+
+Usage: python benchmarks/bench_address_match.py [contacts...]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.address_trie import AddressTrie
+
+LOOKUPS = 20000
+
+
+def linear_find(contacts, address):
+    for contact_id, osc_path in contacts:
+        if osc_path and osc_path == address:
+            return contact_id
+        if address.endswith(f"/{contact_id}"):
+            return contact_id
+    return None
+
+
+def run(count):
+    contacts = []
+    for i in range(count):
+        if i % 3 == 1:
+            contacts.append((f"zone{i}", f"/avatar/parameters/Zone{i}_{{index}}"))
+        elif i % 3 == 2:
+            contacts.append((f"haptic{i}", f"/avatar/parameters/Haptic_{{index}}_Zone{i}"))
+        else:
+            contacts.append((f"c{i}", f"/avatar/parameters/Contact{i}"))
+    trie = AddressTrie()
+    for contact_id, osc_path in contacts:
+        trie.add(osc_path, contact_id)
+
+    addresses = []
+    for n in range(LOOKUPS):
+        i = (n * 7919) % count
+        if n % 4 == 3:
+            addresses.append(f"/avatar/parameters/Unmapped{n}")
+        elif i % 3 == 1:
+            addresses.append(f"/avatar/parameters/Zone{i}_{n % 16}")
+        elif i % 3 == 2:
+            addresses.append(f"/avatar/parameters/Haptic_{n % 16}_Zone{i}")
+        else:
+            addresses.append(f"/avatar/parameters/Contact{i}")
+
+    start = time.perf_counter()
+    for address in addresses:
+        linear_find(contacts, address)
+    linear = (time.perf_counter() - start) / LOOKUPS
+
+    start = time.perf_counter()
+    matched = sum(1 for address in addresses if trie.match(address) is not None)
+    trie_time = (time.perf_counter() - start) / LOOKUPS
+
+    print(f"{count:6d} contacts: linear scan {linear * 1e6:8.2f} us/lookup, "
+          f"trie {trie_time * 1e6:6.2f} us/lookup ({matched} of {LOOKUPS} matched)")
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [10, 100, 1000, 5000]
+    for count in sizes:
+        run(count)
+
+
+if __name__ == "__main__":
+    main()
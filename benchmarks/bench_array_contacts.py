@@ -0,0 +1,77 @@
+"""
+Multi-zone suit through OSCHandler: one contact per zone versus one array contact.
+
+Every zone of a ZONES-motor vest gets a new value RATE_HZ times per second.
+Per-zone setup: ZONES contacts and continuous bindings, each zone its own
+Simulator device. Array setup: one array contact (core/arrays.py) with one
+binding, sent as frames through the Simulator's apply_frame. Reports the
+handler time per zone update, module calls per second and per-contact
+state entries.
+
+Usage: python benchmarks/bench_array_contacts.py [zones] [seconds]
+"""
+import contextlib
+import io
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.osc_handler import OSCHandler
+from modules.Simulator import SimulatorModule
+from schemas.bindings import Binding
+from schemas.contacts import Contact
+
+RATE_HZ = 60
+
+
+def setup(zones, array):
+    sim = SimulatorModule(seed=1, device_count=zones, latency_ms=0, jitter_ms=0)
+    common = dict(module_name="Simulator", is_continuous=True, use_mapping=True, curve_type="exponential")
+    if array:
+        contacts = [Contact(name="Vest", id="vest", type=0, array_size=zones,
+                            osc_path="/avatar/parameters/Vest_{index}")]
+        bindings = [Binding(contact_id="vest", contact_name="Vest", device_id="sim0", device_name="Vest", **common)]
+    else:
+        contacts = [Contact(name=f"Vest {i}", id=f"Vest_{i}", type=0) for i in range(zones)]
+        bindings = [Binding(contact_id=f"Vest_{i}", contact_name=f"Vest {i}", device_id=f"sim{i}",
+                            device_name=f"Zone {i}", **common) for i in range(zones)]
+        # Only the per-zone path is measured, not the batching of 038
+        sim.apply_batch = None
+    return sim, OSCHandler({"Simulator": sim}, contacts, bindings)
+
+
+def run(zones, seconds, array):
+    sim, handler = setup(zones, array)
+    updates = 0
+    busy = 0.0
+    start = time.monotonic()
+    with contextlib.redirect_stdout(io.StringIO()):
+        while time.monotonic() - start < seconds:
+            t = time.monotonic() - start
+            tick = time.perf_counter()
+            for i in range(zones):
+                handler.map_message(f"/avatar/parameters/Vest_{i}", [0.5 + 0.45 * math.sin(t * 4 + i * 0.4)])
+            busy += time.perf_counter() - tick
+            updates += zones
+            time.sleep(1.0 / RATE_HZ)
+        time.sleep(0.1)
+    handler.shutdown()
+
+    label = "array contact" if array else "contact per zone"
+    print(f"  {label:17s} {busy / updates * 1e6:7.2f} us/update, {sim.calls / seconds:7.0f} module calls/s, "
+          f"{len(handler.contact_states)} contact states")
+
+
+def main():
+    zones = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    print(f"{zones} zones at {RATE_HZ} Hz:")
+    run(zones, seconds, array=False)
+    run(zones, seconds, array=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Shared connection service (core/connections.py) against local stand-in servers.
+
+HTTP: a keep-alive server on 127.0.0.1 with a small per-connection setup cost
+(standing in for a TLS handshake). Compares opening a connection per request,
+as modules did, with the pooled keep-alive connections.
+
+Websocket: a minimal echo server. Measures message round trips, then kills
+every server-side connection and times how long the client takes to come back.
+
+Usage: python benchmarks/bench_connections.py [requests]
+"""
+import base64
+import hashlib
+import http.client
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.connections import ConnectionManager, _WS_GUID
+
+SETUP_COST = 0.002 # seconds per new server connection
+
+
+class CommandHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True # headers and body are written separately
+
+    def setup(self):
+        super().setup()
+        time.sleep(SETUP_COST)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class EchoWebSocketServer:
+    def __init__(self):
+        self.sock = socket.socket()
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen()
+        self.port = self.sock.getsockname()[1]
+        self.clients = []
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.clients.append(conn)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        try:
+            request = b""
+            while b"\r\n\r\n" not in request:
+                request += conn.recv(4096)
+            key = [line.split(":", 1)[1].strip() for line in request.decode().split("\r\n")
+                   if line.lower().startswith("sec-websocket-key")][0]
+            accept = base64.b64encode(hashlib.sha1((key + _WS_GUID).encode()).digest()).decode()
+            conn.sendall(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                          f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+            reader = conn.makefile("rb")
+            while True:
+                b0, b1 = reader.read(2)
+                length = b1 & 0x7F
+                if length == 126:
+                    length = struct.unpack("!H", reader.read(2))[0]
+                elif length == 127:
+                    length = struct.unpack("!Q", reader.read(8))[0]
+                mask = reader.read(4)
+                payload = bytes(b ^ mask[i % 4] for i, b in enumerate(reader.read(length)))
+                if b0 & 0x0F == 0x8:
+                    return
+                # Server frames are unmasked
+                header = struct.pack("!BB", b0, length) if length < 126 else struct.pack("!BBH", b0, 126, length)
+                conn.sendall(header + payload)
+        except (OSError, ValueError, IndexError):
+            pass
+
+    def drop_clients(self):
+        for conn in self.clients:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+                conn.close()
+            except OSError:
+                pass
+        self.clients = []
+
+
+def bench_http(count):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CommandHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    body = b'{"intensity": 0.5}'
+
+    start = time.perf_counter()
+    for _ in range(count):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        conn.request("POST", "/command", body=body, headers={"Connection": "close"})
+        conn.getresponse().read()
+        conn.close()
+    fresh = time.perf_counter() - start
+
+    manager = ConnectionManager()
+    url = f"http://127.0.0.1:{port}/command"
+    start = time.perf_counter()
+    for _ in range(count):
+        manager.request("POST", url, json={"intensity": 0.5})
+    pooled = time.perf_counter() - start
+
+    start = time.perf_counter()
+    futures = [manager.request_async("POST", url, json={"intensity": 0.5}) for _ in range(count)]
+    for f in futures:
+        f.result()
+    concurrent = time.perf_counter() - start
+
+    stats = manager.stats()["http"][f"http://127.0.0.1:{port}"]
+    print(f"http, {count} requests:")
+    print(f"  new connection each  {fresh / count * 1e3:7.3f} ms/request")
+    print(f"  pooled keep-alive    {pooled / count * 1e3:7.3f} ms/request")
+    print(f"  pooled, async        {concurrent / count * 1e3:7.3f} ms/request  "
+          f"({stats['connections_opened']} connections opened in total)")
+    manager.close()
+    server.shutdown()
+
+
+def bench_websocket(count):
+    server = EchoWebSocketServer()
+    replies = []
+    got = threading.Event()
+
+    def on_message(message):
+        replies.append(message)
+        got.set()
+
+    manager = ConnectionManager()
+    ws = manager.websocket(f"ws://127.0.0.1:{server.port}/", on_message, backoff_initial=0.05)
+    ws.wait_connected(5)
+
+    rtts = []
+    for i in range(count):
+        got.clear()
+        start = time.perf_counter()
+        ws.send(f'{{"seq": {i}}}')
+        got.wait(5)
+        rtts.append(time.perf_counter() - start)
+    rtts.sort()
+
+    server.drop_clients()
+    dropped = time.perf_counter()
+    time.sleep(0.01)
+    ws.wait_connected(5)
+    reconnect = time.perf_counter() - dropped
+    got.clear()
+    ws.send("after reconnect")
+    got.wait(5)
+
+    print(f"websocket, {count} round trips: p50 {rtts[len(rtts) // 2] * 1e3:.3f} ms, "
+          f"p99 {rtts[int(len(rtts) * 0.99)] * 1e3:.3f} ms")
+    print(f"  reconnected {reconnect * 1e3:.1f} ms after the server dropped it, "
+          f"echo after reconnect: {replies[-1] == 'after reconnect'}")
+    manager.close()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    bench_http(count)
+    bench_websocket(count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Ingest deduplication (core/dedup.py) on a VRChat-like parameter stream.
+
+PARAMS float parameters are resent every tick; only CHANGING of them get a
+new value, the rest repeat their last one. Runs the stream through
+OSCHandler.map_message as is and behind IngestDedup, and reports the time per
+message and how many messages were dropped before the handler.
+
+Usage: python benchmarks/bench_dedup.py [params] [changing]
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.dedup import IngestDedup
+from core.osc_handler import OSCHandler
+from schemas.bindings import Binding
+from schemas.contacts import Contact
+
+TICKS = 200
+
+
+def stream(params, changing):
+    for tick in range(TICKS):
+        for i in range(params):
+            value = ((tick + i) % 10) / 10 if i < changing else 0.5
+            yield f"/avatar/parameters/P{i}", (value,)
+
+
+def run(params, changing, dedup):
+    contacts = [Contact(name=f"P{i}", id=f"P{i}", type=0, cooldown=0.1) for i in range(params)]
+    bindings = [Binding(contact_id=f"P{i}", contact_name=f"P{i}", module_name="None", device_id="d",
+                        device_name="d") for i in range(params)]
+    handler = OSCHandler({}, contacts, bindings)
+    filt = IngestDedup(1.0, exempt=handler.needs_repeats) if dedup else None
+    messages = list(stream(params, changing))
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for address, args in messages:
+            if filt is None or filt.admit(address, args):
+                handler.map_message(address, list(args))
+        elapsed = time.perf_counter() - start
+    handler.shutdown()
+    label = "with dedup" if dedup else "no dedup"
+    dropped = f", {filt.suppressed} of {len(messages)} dropped" if filt else ""
+    print(f"  {label:10s} {elapsed / len(messages) * 1e6:6.2f} us/message{dropped}")
+
+
+def main():
+    params = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    changing = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    print(f"{params} parameters, {changing} changing, {TICKS} ticks:")
+    run(params, changing, dedup=False)
+    run(params, changing, dedup=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Cost and effect of the per-contact smoothing filters (core/filters.py).
+
+Feeds a noisy 60 Hz contact signal through each filter type and reports the
+CPU time per sample and how many output changes larger than 1% remain,
+i.e. how many device commands a continuous binding would still produce.
+
+Usage: python benchmarks/bench_filters.py [samples]
+"""
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.filters import FilterBank
+from schemas.contacts import Contact
+
+
+def signal(samples):
+    rng = random.Random(7)
+    for i in range(samples):
+        base = 0.5 + 0.3 * math.sin(i / 120.0)
+        yield i / 60.0, min(1.0, max(0.001, base + rng.gauss(0.0, 0.03)))
+
+
+def main():
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    data = list(signal(samples))
+
+    print(f"{'filter':<10}{'ns/sample':>12}{'changes >1%':>14}")
+    for kind in ("none", "ema", "median3", "one_euro"):
+        contact = Contact(name="bench", id="bench", type=0, filter_type=kind,
+                          filter_alpha=0.3, filter_min_cutoff=1.0, filter_beta=0.5)
+        bank = FilterBank()
+        last_sent = None
+        changes = 0
+
+        start = time.perf_counter()
+        outputs = [bank.apply(contact, value, t) for t, value in data]
+        elapsed = time.perf_counter() - start
+
+        for out in outputs:
+            if last_sent is None or abs(out - last_sent) > 0.01:
+                changes += 1
+                last_sent = out
+        print(f"{kind:<10}{elapsed / samples * 1e9:>12.0f}{changes:>14}")
+
+
+if __name__ == "__main__":
+    main()
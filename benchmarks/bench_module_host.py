@@ -0,0 +1,66 @@
+"""
+Compares command round-trip latency of an in-process module with the same
+module hosted out-of-process (see core/module_host.py).
+
+Usage: python benchmarks/bench_module_host.py [calls]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.loader import Loader
+from core.module_host import IsolatedModule
+from core.stats import LatencyStats
+from schemas.bindings import Binding
+
+ECHO_MODULE = '''
+class EchoModule:
+    def __init__(self):
+        self.name = "Echo"
+        self.devices = [{"id": "0", "name": "Echo Device"}]
+        self.calls = 0
+
+    def vibrate(self, binding, value):
+        self.calls += 1
+'''
+
+
+def measure(module, binding, calls):
+    stats = LatencyStats(size=calls)
+    for i in range(calls):
+        start = time.perf_counter()
+        module.vibrate(binding, (i % 100) / 100.0)
+        stats.add(time.perf_counter() - start)
+    return stats.summary()
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    binding = Binding(contact_id="c", contact_name="c", module_name="Echo", device_id="0", device_name="Echo Device")
+
+    with tempfile.TemporaryDirectory() as modules_dir:
+        with open(os.path.join(modules_dir, "Echo.py"), "w") as f:
+            f.write(ECHO_MODULE)
+
+        loader = Loader()
+        loader.modules_dir = modules_dir
+        in_process = loader.load_module("Echo.py")
+        isolated = IsolatedModule("Echo", modules_dir, "Echo.py")
+        try:
+            results = {
+                "in-process": measure(in_process, binding, calls),
+                "isolated": measure(isolated, binding, calls),
+            }
+        finally:
+            isolated.close()
+
+    print(f"{'mode':<12}{'calls':>8}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for mode, s in results.items():
+        print(f"{mode:<12}{s['count']:>8}{s['p50_ms']:>10.3f}{s['p99_ms']:>10.3f}{s['max_ms']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Measures the cost of one PatternEngine tick (core/patterns.py) for a growing
+number of active pattern instances, with and without NumPy evaluation.
+
+Usage: python benchmarks/bench_patterns.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.numeric import numpy, use_numpy
+from core.patterns import BUILTIN_PATTERNS, PatternEngine
+from schemas.bindings import Binding
+
+
+def bench(count, with_numpy, ticks=200):
+    available = numpy() is not None
+    use_numpy(with_numpy)
+    try:
+        engine = PatternEngine(lambda binding, value: None, threaded=False)
+        names = list(BUILTIN_PATTERNS)
+        for i in range(count):
+            binding = Binding(contact_id=str(i), contact_name="c", module_name="Bench", device_id=str(i),
+                              device_name="d", duration=1.0, pattern=names[i % len(names)])
+            engine.start(i, binding, 1.0, loop=True)
+        start = time.perf_counter()
+        for _ in range(ticks):
+            engine.tick()
+        elapsed = (time.perf_counter() - start) / ticks
+        engine.shutdown()
+        return elapsed
+    finally:
+        use_numpy(available)
+
+
+def main():
+    print(f"{'instances':>10}{'python us/tick':>16}{'numpy us/tick':>16}")
+    for count in (1, 16, 64, 256, 1024):
+        py = bench(count, False)
+        vec = bench(count, True) if numpy() is not None else float('nan')
+        print(f"{count:>10}{py * 1e6:>16.1f}{vec * 1e6:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+End-to-end run of OSCHandler against the bundled Simulator module.
+
+Continuous bindings on several virtual devices receive 120 Hz contact
+updates while each device takes latency_ms per command. Reports how many
+updates became device commands (the rest were superseded in the lanes or
+suppressed by min_change) and how long the final stop took to arrive.
+
+Runs twice: once with the simulator's apply_batch hidden, so every output
+is its own backend call, and once batched, where all outputs for the module
+merge into one call.
+
+Usage: python benchmarks/bench_simulator.py [devices] [latency_ms] [seconds]
+"""
+import contextlib
+import io
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.osc_handler import OSCHandler
+from modules.Simulator import SimulatorModule
+from schemas.bindings import Binding
+from schemas.contacts import Contact
+
+RATE_HZ = 120
+
+
+def run(devices, latency_ms, seconds, batched):
+    sim = SimulatorModule(seed=1, device_count=devices, latency_ms=latency_ms, jitter_ms=latency_ms / 5)
+    if not batched:
+        sim.apply_batch = None
+    contacts = [Contact(name=f"c{i}", id=f"c{i}", type=0) for i in range(devices)]
+    bindings = [Binding(contact_id=f"c{i}", contact_name=f"c{i}", module_name="Simulator",
+                        device_id=dev["id"], device_name=dev["name"], reaction_type="vibrate",
+                        is_continuous=True)
+                for i, dev in enumerate(sim.devices)]
+    handler = OSCHandler({"Simulator": sim}, contacts, bindings)
+
+    updates = 0
+    start = time.monotonic()
+    with contextlib.redirect_stdout(io.StringIO()):
+        while time.monotonic() - start < seconds:
+            t = time.monotonic() - start
+            for i in range(devices):
+                handler.map_message(f"/avatar/parameters/c{i}", [0.5 + 0.45 * math.sin(t * 3 + i)])
+                updates += 1
+            time.sleep(1.0 / RATE_HZ)
+
+        stop_sent = time.monotonic()
+        for i in range(devices):
+            handler.map_message(f"/avatar/parameters/c{i}", [0.0])
+        time.sleep(latency_ms * 3 / 1000 + 0.1)
+    handler.shutdown()
+
+    stops = [c.finished - stop_sent for c in sim.commands() if c.intensity == 0 and c.received >= stop_sent]
+    received = sum(counts.get("ok", 0) for counts in sim.stats().values())
+    lanes = handler.lane_metrics().values()
+    superseded = sum(m["superseded"] for m in lanes) + handler.merged_outputs
+
+    print(f"{'batched' if batched else 'per binding'}: {updates} updates in {seconds:.1f}s, "
+          f"backend calls {sim.calls} ({sim.calls / seconds:.0f}/s), device commands {received}, "
+          f"superseded {superseded}, suppressed {handler.suppressed_calls}")
+    if stops:
+        print(f"  stop arrival: max {max(stops) * 1000:.1f} ms after the stop message "
+              f"({len(stops)}/{devices} devices)")
+
+
+def main():
+    devices = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 30.0
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 2.0
+    print(f"{devices} devices, {latency_ms:.0f} ms latency")
+    run(devices, latency_ms, seconds, batched=False)
+    run(devices, latency_ms, seconds, batched=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Spatial mapping cost per tick (core/spatial.py).
+
+CONTACTS contacts spread over a body map drive a MOTORS-motor layout. Compares
+recomputing inverse-distance weights from the positions every tick with the
+precomputed weight matrix the handler uses: one matrix-vector product with
+NumPy, or the sparse per-motor sums without it.
+
+Usage: python benchmarks/bench_spatial.py [contacts] [motors]
+"""
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core.spatial as spatial
+from core.numeric import numpy, use_numpy
+from schemas.spatial import MotorLayout
+
+TICKS = 500
+
+
+def setup(contacts, motors):
+    rng = random.Random(1)
+    side = max(1, int(math.sqrt(motors)))
+    layout = MotorLayout(name="vest", motors=[[(i % side) / side, (i // side) / side] for i in range(motors)])
+    positions = [(f"c{i}", [rng.random(), rng.random()]) for i in range(contacts)]
+    values = [[rng.random() for _ in range(contacts)] for _ in range(16)]
+    return layout, positions, values
+
+
+def run_naive(layout, positions, values):
+    start = time.perf_counter()
+    for tick in range(TICKS):
+        vector = values[tick % len(values)]
+        frame = [0.0] * len(layout.motors)
+        for (_, position), value in zip(positions, vector):
+            for m, w in enumerate(spatial.contact_weights(position, layout)):
+                frame[m] += w * value
+        frame = [min(1.0, v) for v in frame]
+    return (time.perf_counter() - start) / TICKS
+
+
+def run_matrix(layout, positions, values):
+    group = spatial.SpatialGroup("vest", None, layout, positions)
+    start = time.perf_counter()
+    for tick in range(TICKS):
+        vector = values[tick % len(values)]
+        for column, value in enumerate(vector):
+            group.values[column] = value
+        group.frame()
+    return (time.perf_counter() - start) / TICKS
+
+
+def main():
+    contacts = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    motors = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    layout, positions, values = setup(contacts, motors)
+    print(f"{contacts} contacts, {motors} motors, per tick:")
+    print(f"  weights recomputed      {run_naive(layout, positions, values) * 1e6:9.1f} us")
+    available = numpy() is not None
+    if available:
+        print(f"  weight matrix (NumPy)   {run_matrix(layout, positions, values) * 1e6:9.1f} us")
+    use_numpy(False)
+    print(f"  weight matrix (Python)  {run_matrix(layout, positions, values) * 1e6:9.1f} us")
+    use_numpy(available)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Cold start time against a budget, measured in fresh interpreters.
+
+Each run starts a new Python process that goes through app.py's startup:
+imports, loading modules, a config of CONTACTS contacts and the OSC handler.
+With a display it then opens the main window (which starts the OSC listener
+and builds the first tab) and builds each remaining tab once, as if the user
+clicked through them. Without one it only starts the OSC listener. The times
+come from app.py's startup profiler (core/startup.py). Reports the median of
+the runs and exits with status 1 if the median time to "listening for OSC"
+is over the budget, so regressions show up in scripts.
+
+Usage: python benchmarks/bench_startup.py [budget_ms] [runs]
+"""
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CONTACTS = 200
+DEFAULT_BUDGET_MS = 1000
+MARKER = "STARTUP_PROFILE "
+
+
+def child():
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app # records its import phases in app.PROFILER
+        from core.osc_sniffer import OSCSniffer
+        from schemas.bindings import Binding
+        from schemas.contacts import Contact
+        profiler = app.PROFILER
+
+        with profiler.phase("load modules"):
+            main_app = app.MainApp()
+        with profiler.phase("load config"):
+            contacts = [Contact(name=f"Contact {i}", id=f"c{i}", type=0) for i in range(CONTACTS)]
+            bindings = [Binding(contact_id=f"c{i}", contact_name=f"Contact {i}", module_name="Simulator",
+                                device_id="sim0", device_name="Sim") for i in range(CONTACTS)]
+        with profiler.phase("OSC handler"):
+            handler = app.OSCHandler(main_app.modules, contacts, bindings)
+
+        window = None
+        if os.environ.get("DISPLAY") or sys.platform in ("win32", "darwin"):
+            with profiler.phase("main window"):
+                window = app.MainWindow(app.ConfigManager, handler, main_app.registry, profiler=profiler)
+        else:
+            # No display: only the listener
+            with profiler.phase("OSC listener"):
+                sniffer = OSCSniffer(port=0)
+                sniffer.start()
+            profiler.mark("listening for OSC")
+            sniffer.stop()
+        if window is not None:
+            from ui.main_window import TABS
+            window.update()
+            profiler.mark("window ready")
+            for name, _ in TABS:
+                window._build_tab(name)
+            window.update()
+            window._on_close()
+        handler.shutdown()
+        main_app.loader.shutdown()
+    print(MARKER + json.dumps({**profiler.as_dict(), "window": window is not None}))
+
+
+def run_once():
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child"], cwd=ROOT,
+                         capture_output=True, text=True, check=True).stdout
+    for line in out.splitlines():
+        if line.startswith(MARKER):
+            return json.loads(line[len(MARKER):])
+    raise RuntimeError("child printed no profile")
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    budget_ms = float(args[0]) if args else DEFAULT_BUDGET_MS
+    runs = int(args[1]) if len(args) > 1 else 5
+    results = [run_once() for _ in range(runs)]
+
+    print(f"Startup, median of {runs} fresh interpreters ({CONTACTS} contacts):")
+    for kind, suffix in (("phases", ""), ("marks", " after start")):
+        names = list(dict.fromkeys(name for r in results for name in r[kind]))
+        for name in names:
+            values = [r[kind][name] for r in results if name in r[kind]]
+            print(f"  {name:26s} {statistics.median(values) * 1000:8.1f} ms{suffix}")
+    if not results[0]["window"]:
+        print("  (no display: window and tab construction not measured)")
+
+    listening = statistics.median(r["marks"]["listening for OSC"] for r in results) * 1000
+    if listening > budget_ms:
+        print(f"OVER BUDGET: listening for OSC after {listening:.0f} ms, budget {budget_ms:.0f} ms")
+        sys.exit(1)
+    print(f"Within budget: listening for OSC after {listening:.0f} ms, budget {budget_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        child()
+    else:
+        main()
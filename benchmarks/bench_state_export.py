@@ -0,0 +1,85 @@
+"""
+Live state export (core/state_export.py): writer cost and reader rate.
+
+A fake handler with CONTACTS contacts and DEVICES devices changes every
+value before each snapshot. Reports the time to publish one snapshot, then
+runs the exporter's thread at WRITE_HZ while a reader takes snapshots as fast
+as it can, and reports snapshots per second and how many had to be re-read
+because a write was in progress.
+
+Usage: python benchmarks/bench_state_export.py [contacts] [devices]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.state_export import StateExporter, StateReader
+
+SNAPSHOTS = 2000
+WRITE_HZ = 1000
+READ_SECONDS = 1.0
+
+
+class FakeHandler:
+    def __init__(self, contacts, devices):
+        self.contact_states = {f"contact{i}": {"last_val": 0.0} for i in range(contacts)}
+        self.device_levels = {("Simulator", f"sim{i}"): 0.0 for i in range(devices)}
+        self.arrays = {}
+        self.spatial_groups = {}
+
+    def step(self, n):
+        for i, state in enumerate(self.contact_states.values()):
+            state["last_val"] = ((n + i) % 100) / 100
+        for key in self.device_levels:
+            self.device_levels[key] = (n % 100) / 100
+
+
+def main():
+    contacts = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    devices = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    handler = FakeHandler(contacts, devices)
+    path = os.path.join(tempfile.gettempdir(), "bench_state_export.bin")
+    print(f"{contacts} contacts, {devices} devices:")
+
+    # Publishing by hand: the exporter's own thread stays idle at this rate
+    with contextlib.redirect_stdout(io.StringIO()):
+        exporter = StateExporter(handler, path=path, rate_hz=0.001,
+                                 contact_capacity=contacts, device_capacity=devices)
+        exporter.start()
+    busy = 0.0
+    for n in range(SNAPSHOTS):
+        handler.step(n)
+        start = time.perf_counter()
+        exporter.publish()
+        busy += time.perf_counter() - start
+    exporter.stop()
+    print(f"  publish       {busy / SNAPSHOTS * 1e6:8.1f} us/snapshot")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        exporter = StateExporter(handler, path=path, rate_hz=WRITE_HZ,
+                                 contact_capacity=contacts, device_capacity=devices)
+        exporter.start()
+    reader = StateReader(path)
+    reads = 0
+    n = 0
+    start = time.monotonic()
+    while time.monotonic() - start < READ_SECONDS:
+        if n % 50 == 0:
+            handler.step(n // 50)
+        n += 1
+        if reader.snapshot() is not None:
+            reads += 1
+    print(f"  reader        {reads / READ_SECONDS:8.0f} snapshots/s while writing at {WRITE_HZ} Hz, "
+          f"{reader.retries} retries, {exporter.published} published")
+    reader.close()
+    exporter.stop()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Per-edit cost of the config views (ui/list_model.py) at growing contact counts.
+
+For each size the contacts list, the mappings list and the visualizer are
+loaded once, then single edits are applied: rename one contact, add one,
+delete one, and an external reload where one contact changed. Reports the
+rows touched and the time per edit, next to a full rebuild of the same views
+as the tabs used to do it.
+
+Timings need a display for Tk. Without one only the model side runs and
+the number of row changes each edit sends to the views is reported.
+
+Usage: python benchmarks/bench_ui_updates.py [sizes...]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from schemas.contacts import Contact
+from ui.list_model import KeyedListModel
+
+REPEATS = 20
+
+
+def make_contacts(count):
+    return [Contact(name=f"Contact {i}", id=f"c{i}", type=0, osc_path=f"/avatar/parameters/c{i}")
+            for i in range(count)]
+
+
+def edits(model, count):
+    """(name, function) pairs, each applying one edit to the model."""
+    def rename():
+        i = count // 2
+        c = model[i]
+        model.replace(i, c.model_copy(update={"name": c.name + "*"}))
+
+    def add_and_delete():
+        model.append(Contact(name="Extra", id="extra", type=0, osc_path="/avatar/parameters/extra"))
+        model.pop(len(model) - 1)
+
+    def reload_one_changed():
+        contacts = [c.model_copy() for c in model]
+        contacts[count // 3] = contacts[count // 3].model_copy(update={"cooldown": contacts[count // 3].cooldown + 0.1})
+        model.set_items(contacts)
+
+    return [("rename one", rename), ("add + delete", add_and_delete), ("reload, one changed", reload_one_changed)]
+
+
+def bench_model(count):
+    model = KeyedListModel(key=lambda c: c.id)
+    model.set_items(make_contacts(count))
+    events = []
+    model.subscribe(lambda *change: events.append(change))
+    for name, edit in edits(model, count):
+        events.clear()
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            edit()
+        elapsed = (time.perf_counter() - start) / REPEATS
+        print(f"  {name:22s} {len(events) / REPEATS:4.1f} row changes  {elapsed * 1e3:7.3f} ms (model only)")
+
+
+def bench_tk(root, count):
+    from ui.list_model import bind_listbox
+    from ui.visualizer import VisualizerTab
+    import tkinter as tk
+
+    listbox = tk.Listbox(root)
+    visualizer = VisualizerTab(root)
+    model = KeyedListModel(key=lambda c: c.id)
+    bind_listbox(model, listbox, lambda c: c.name)
+    visualizer.bind_model(model)
+    model.set_items(make_contacts(count))
+    root.update()
+
+    # What every edit used to cost: refill the listbox and rebuild all visualizer rows
+    start = time.perf_counter()
+    for _ in range(3):
+        listbox.delete(0, tk.END)
+        for c in model:
+            listbox.insert(tk.END, c.name)
+        keep = model.items[:]
+        model.set_items([])
+        model.set_items(keep)
+        root.update()
+    print(f"  {'full rebuild':22s} {count:6d} rows         {(time.perf_counter() - start) / 3 * 1e3:7.3f} ms")
+
+    for name, edit in edits(model, count):
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            edit()
+            root.update()
+        print(f"  {name:22s}                    {(time.perf_counter() - start) / REPEATS * 1e3:7.3f} ms")
+
+    listbox.destroy()
+    visualizer.destroy()
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [30, 300, 3000]
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+    except Exception as e:
+        print(f"No Tk display ({e}), measuring the model only.")
+        root = None
+
+    for count in sizes:
+        print(f"{count} contacts:")
+        bench_model(count)
+        if root is not None:
+            bench_tk(root, count)
+    if root is not None:
+        root.destroy()
+
+
+if __name__ == "__main__":
+    main()
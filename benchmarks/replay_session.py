@@ -0,0 +1,88 @@
+"""
+Replays a recorded OSC session (core/recording.py) through OSCHandler.
+
+Contacts and bindings come from user_config.json; modules are replaced by a
+counter so nothing reaches real devices. The handler runs on a ReplayClock,
+so cooldowns and triggers see the recorded timing at any speed; pulse ends,
+patterns and frame ticks still run in real time (see ReplayClock).
+
+Without a recording, a synthetic one is written first so the recorder's
+size and throughput can be measured as well.
+
+Usage: python benchmarks/replay_session.py [recording] [speed]   (speed 0 = as fast as possible)
+"""
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config_manager import ConfigManager
+from core.osc_handler import OSCHandler
+from core.recording import ReplayClock, SessionPlayer, SessionRecorder
+from schemas.bindings import Binding
+from schemas.contacts import Contact
+
+
+class CountingModule:
+    def __init__(self):
+        self.calls = 0
+
+    def handle_event(self, binding, value):
+        self.calls += 1
+
+
+def synthesize(path, contacts, messages=100000):
+    rng = random.Random(3)
+    # Configured contacts plus unmapped addresses, like a real avatar sends
+    addresses = [c.osc_path or f"/avatar/parameters/{c.id}" for c in contacts]
+    addresses += [f"/avatar/parameters/Other{i}" for i in range(32)]
+    fake_ns = [0]
+    recorder = SessionRecorder(path, clock_ns=lambda: fake_ns[0])
+    start = time.perf_counter()
+    for _ in range(messages):
+        fake_ns[0] += 1_000_000 # 1000 messages per second
+        address = rng.choice(addresses)
+        value = rng.random() if rng.random() < 0.9 else rng.random() < 0.5
+        recorder.record(address, (value,))
+    recorder.close()
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(path)
+    print(f"recorded {messages} messages in {elapsed:.2f}s ({elapsed / messages * 1e6:.1f} us/msg), "
+          f"{size / messages:.1f} bytes/msg")
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else None
+    speed = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    config = ConfigManager.load_config()
+    contacts = [Contact(**c) for c in config.get("contacts", [])]
+    bindings = [Binding(**b) for b in config.get("bindings", [])]
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), "synthetic.rec")
+        synthesize(path, contacts)
+    modules = {name: CountingModule() for name in {b.module_name for b in bindings}}
+
+    clock = ReplayClock(start=1000.0)
+    handler = OSCHandler(modules, contacts, bindings, clock=clock)
+    player = SessionPlayer(path)
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        played = player.play(handler.map_message, speed=speed, clock=clock)
+    elapsed = time.perf_counter() - start
+    time.sleep(0.2) # let queued commands drain
+    handler.shutdown()
+    player.close()
+
+    print(f"replayed {played} messages in {elapsed:.2f}s ({played / elapsed:.0f} msg/s, "
+          f"{len(contacts)} contacts, {len(bindings)} bindings)")
+    print(f"recorded span {clock.now - 1000.0:.1f}s, module calls {sum(m.calls for m in modules.values())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Matches OSC addresses against contact paths, exact or pattern, in one walk.
+
+Paths are split into segments (/avatar/parameters/Haptic_Chest_3 becomes
+"avatar", "parameters", "Haptic_Chest_3") and stored in a trie. A segment may
+hold one wildcard, `*` or a named capture `{name}`, with literal text around
+it: `Haptic_Chest_{index}`. A wildcard matches one or more characters and
+never crosses a "/". Pattern segments of a node are indexed by their literal
+prefix and then by their literal suffix, so matching a segment takes one dict
+lookup per distinct prefix and suffix length, however many patterns share a
+prefix (Haptic_{index}_L, Haptic_{index}_R, ...). Capture names aren't part
+of the trie: paths that differ only in them share nodes and branch on the
+next literal segment, and each path's names are applied to the captured
+values at its end node. Exact segments win over patterns.
+
+Unnamed wildcards are captured by position: the first `*` of a path is "0".
+"""
+import re
+from typing import Any, Dict, Optional, Tuple
+
+_WILDCARD = re.compile(r"\{(\w*)\}|\*")
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+
+def is_pattern(path: Optional[str]) -> bool:
+    return bool(path) and _WILDCARD.search(path) is not None
+
+
+def fill_captures(text: str, captures: Dict[str, str]) -> str:
+    """Replaces {name} placeholders in text with captured values; unknown names stay as they are."""
+    if not captures or "{" not in text:
+        return text
+    return _PLACEHOLDER.sub(lambda m: captures.get(m.group(1), m.group(0)), text)
+
+
+class _Node:
+    __slots__ = ("children", "patterns", "prefix_lengths", "suffix_lengths", "value", "names", "has_value")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.patterns: Dict[str, Dict[str, "_Node"]] = {} # literal prefix -> literal suffix -> node
+        self.prefix_lengths = () # distinct prefix lengths, longest first
+        self.suffix_lengths: Dict[str, tuple] = {} # literal prefix -> distinct suffix lengths, longest first
+        self.value = None
+        self.names = () # capture names of the path ending here, in order
+        self.has_value = False
+
+
+class AddressTrie:
+    def __init__(self):
+        self.root = _Node()
+        self.size = 0
+
+    def add(self, path: str, value: Any) -> bool:
+        """
+        Adds a path (exact or pattern). Returns False if the same path was added before (capture
+        names aside), the first value is kept. Raises ValueError for a segment with more than one
+        wildcard.
+        """
+        node = self.root
+        names = []
+        position = 0
+        for segment in path.split("/"):
+            wildcards = list(_WILDCARD.finditer(segment))
+            if not wildcards:
+                node = node.children.setdefault(segment, _Node())
+                continue
+            if len(wildcards) > 1:
+                raise ValueError(f"Only one wildcard per path segment is supported: '{segment}' in '{path}'")
+            wildcard = wildcards[0]
+            name = wildcard.group(1)
+            if not name:
+                name = str(position)
+                position += 1
+            names.append(name)
+            prefix, suffix = segment[:wildcard.start()], segment[wildcard.end():]
+            by_suffix = node.patterns.setdefault(prefix, {})
+            child = by_suffix.get(suffix)
+            if child is None:
+                child = by_suffix[suffix] = _Node()
+                node.prefix_lengths = tuple(sorted({len(p) for p in node.patterns}, reverse=True))
+                node.suffix_lengths[prefix] = tuple(sorted({len(s) for s in by_suffix}, reverse=True))
+            node = child
+        if node.has_value:
+            return False
+        node.value = value
+        node.names = tuple(names)
+        node.has_value = True
+        self.size += 1
+        return True
+
+    def match(self, address: str) -> Optional[Tuple[Any, Dict[str, str]]]:
+        """Returns (value, captures) of the best matching path, or None."""
+        return self._walk(self.root, address.split("/"), 0, ())
+
+    def _walk(self, node: _Node, segments, index: int, captures: Tuple[str, ...]):
+        if index == len(segments):
+            return (node.value, dict(zip(node.names, captures))) if node.has_value else None
+        segment = segments[index]
+
+        child = node.children.get(segment)
+        if child is not None:
+            found = self._walk(child, segments, index + 1, captures)
+            if found is not None:
+                return found
+
+        n = len(segment)
+        for length in node.prefix_lengths:
+            if length >= n:
+                continue
+            prefix = segment[:length]
+            by_suffix = node.patterns.get(prefix)
+            if by_suffix is None:
+                continue
+            for suffix_length in node.suffix_lengths[prefix]:
+                # The wildcard needs at least one character
+                if length + suffix_length >= n:
+                    continue
+                child = by_suffix.get(segment[n - suffix_length:] if suffix_length else "")
+                if child is None:
+                    continue
+                found = self._walk(child, segments, index + 1, captures + (segment[length:n - suffix_length],))
+                if found is not None:
+                    return found
+        return None
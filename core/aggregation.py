@@ -0,0 +1,124 @@
+"""
+Incremental reducers for bindings that combine several contacts into one output.
+
+Each aggregator keeps one slot per input contact. An update only touches the
+slot of the contact that changed; the merged value is maintained from running
+totals or a lazily cleaned heap, never by rescanning every input.
+"""
+import heapq
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List
+
+
+def _as_float(raw_value: Any) -> float:
+    if isinstance(raw_value, bool):
+        return 1.0 if raw_value else 0.0
+    try:
+        return float(raw_value)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+class Aggregator(ABC):
+    def __init__(self, inputs: List[Any]):
+        """inputs: objects with contact_id, weight and priority (schemas.bindings.AggregateInput)."""
+        self.slots: Dict[str, int] = {}
+        self.weights: List[float] = []
+        self.priorities: List[int] = []
+        for inp in inputs:
+            if inp.contact_id in self.slots:
+                continue
+            self.slots[inp.contact_id] = len(self.weights)
+            self.weights.append(inp.weight)
+            self.priorities.append(inp.priority)
+        self.values = [0.0] * len(self.weights)
+        self.value = 0.0
+        self.active = 0 # inputs that are currently non-zero
+
+    def update(self, contact_id: str, raw_value: Any) -> float:
+        """Feeds a new value for one input and returns the merged value."""
+        slot = self.slots.get(contact_id)
+        if slot is None:
+            return self.value
+        new = _as_float(raw_value)
+        old = self.values[slot]
+        if new != old:
+            self.values[slot] = new
+            self.active += (new != 0.0) - (old != 0.0)
+            self.value = self._apply(slot, old, new)
+        return self.value
+
+    @abstractmethod
+    def _apply(self, slot: int, old: float, new: float) -> float:
+        """Updates the running state for one changed input and returns the merged value."""
+
+
+class SumAggregator(Aggregator):
+    def __init__(self, inputs, limit: float = 1.0):
+        super().__init__(inputs)
+        self.limit = limit
+        self.total = 0.0
+
+    def _apply(self, slot, old, new):
+        # Running totals drift by float rounding; all inputs released must merge to exactly 0
+        self.total = self.total + (new - old) if self.active else 0.0
+        return max(0.0, min(self.total, self.limit))
+
+
+class AverageAggregator(Aggregator):
+    """Weighted average over all inputs."""
+    def __init__(self, inputs):
+        super().__init__(inputs)
+        self.weight_total = sum(self.weights) or 1.0
+        self.weighted_sum = 0.0
+
+    def _apply(self, slot, old, new):
+        self.weighted_sum = self.weighted_sum + self.weights[slot] * (new - old) if self.active else 0.0
+        return self.weighted_sum / self.weight_total
+
+
+class _HeapAggregator(Aggregator):
+    """Base for reductions that pick one input: a max-heap with lazy invalidation."""
+    def __init__(self, inputs):
+        super().__init__(inputs)
+        self.versions = [0] * len(self.values)
+        self.heap = []
+
+    @abstractmethod
+    def _rank(self, slot: int, value: float):
+        """Heap key of an input; the smallest key wins."""
+
+    def _apply(self, slot, old, new):
+        self.versions[slot] += 1
+        if new != 0.0:
+            heapq.heappush(self.heap, (self._rank(slot, new), slot, self.versions[slot]))
+
+        # Drop stale entries from the top only; amortised O(log n) per update
+        heap = self.heap
+        while heap and heap[0][2] != self.versions[heap[0][1]]:
+            heapq.heappop(heap)
+        if len(heap) > 4 * len(self.values) + 16:
+            self.heap = heap = [e for e in heap if e[2] == self.versions[e[1]]]
+            heapq.heapify(heap)
+        return self.values[heap[0][1]] if heap else 0.0
+
+
+class MaxAggregator(_HeapAggregator):
+    def _rank(self, slot, value):
+        return -value
+
+
+class PriorityAggregator(_HeapAggregator):
+    """Value of the highest priority input that is currently active (non-zero)."""
+    def _rank(self, slot, value):
+        return -self.priorities[slot]
+
+
+def make_aggregator(mode: str, inputs: List[Any], limit: float = 1.0) -> Aggregator:
+    if mode == "sum":
+        return SumAggregator(inputs, limit)
+    if mode == "average":
+        return AverageAggregator(inputs)
+    if mode == "priority":
+        return PriorityAggregator(inputs)
+    return MaxAggregator(inputs)
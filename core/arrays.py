@@ -0,0 +1,69 @@
+"""
+State and mapping for array contacts (Contact.array_size > 0).
+
+An array contact groups N indexed parameters, e.g. the 32 zones of a vest,
+into one entity. Incoming element values are written into a preallocated
+float vector; once per frame tick every binding of the contact maps the whole
+vector at once (NumPy when installed) and sends one frame per device.
+"""
+from array import array
+from typing import Callable, Dict, Optional
+
+from core.numeric import numpy
+
+DEFAULT_FRAME_RATE_HZ = 60
+
+
+class ArrayState:
+    __slots__ = ("size", "values", "last_frames")
+
+    def __init__(self, size: int):
+        self.size = size
+        np = numpy()
+        self.values = np.zeros(size) if np is not None else array('d', bytes(8 * size))
+        self.last_frames: Dict[object, tuple] = {} # {binding_key: frame last sent}
+
+
+def map_vector(binding, values, scalar: Callable[[object, float], float]):
+    """
+    Binding mapping (intensity or input/output range with curve, then deadband) over a whole vector.
+    scalar(binding, value) is the per-value mapping used when NumPy isn't available.
+    Returns a NumPy array or a list.
+    """
+    np = numpy()
+    if np is None:
+        out = [scalar(binding, v) for v in values]
+        if binding.deadband > 0:
+            out = [0.0 if abs(v) < binding.deadband else v for v in out]
+        return out
+
+    v = np.asarray(values, dtype=float)
+    if not binding.use_mapping:
+        out = v * binding.intensity
+    else:
+        in_min, in_max = binding.input_min, binding.input_max
+        rng = in_max - in_min
+        if rng == 0:
+            norm = np.zeros_like(v)
+        else:
+            norm = (np.where(v < in_min, in_min, np.where(v > in_max, in_max, v)) - in_min) / rng
+        if binding.curve_type == "exponential":
+            norm = norm * norm
+        elif binding.curve_type == "logarithmic":
+            norm = np.sqrt(norm)
+        elif binding.curve_type == "threshold":
+            norm = (norm >= 0.5).astype(float)
+        out = binding.output_min + norm * (binding.output_max - binding.output_min)
+    if binding.deadband > 0:
+        out = np.where(np.abs(out) < binding.deadband, 0.0, out)
+    return out
+
+
+def element_address(path: str, index: int) -> str:
+    return path.replace("{index}", str(index))
+
+
+def array_path(contact) -> Optional[str]:
+    """OSC path template of an array contact; defaults to /avatar/parameters/<id>_{index}."""
+    path = contact.osc_path or f"/avatar/parameters/{contact.id}_{{index}}"
+    return path if "{index}" in path else None
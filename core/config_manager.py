@@ -1,11 +1,14 @@
 import json
 import os
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, List
 from schemas.contacts import Contact
 from schemas.bindings import Binding
 
 CONFIG_FILE = "user_config.json"
 
+# Called after every successful write of CONFIG_FILE, e.g. so the ConfigWatcher skips the app's own writes
+_save_listeners: List[Callable[[], None]] = []
+
 class ConfigManager:
     @staticmethod
     def load_config() -> Dict[str, Any]:
@@ -24,7 +27,8 @@ class ConfigManager:
             return {"contacts": [], "bindings": []}
 
     @staticmethod
-    def save_config(contacts: List[Contact] = None, bindings: List[Binding] = None, app_settings: Dict[str, Any] = None):
+    def save_config(contacts: List[Contact] = None, bindings: List[Binding] = None, app_settings: Dict[str, Any] = None,
+                    devices: List[Dict[str, Any]] = None):
         # Load existing manually to preserve other keys (like "modules")
         current_data = {}
         if os.path.exists(CONFIG_FILE):
@@ -42,19 +46,41 @@ class ConfigManager:
         
         if app_settings is not None:
             current_data["app_settings"] = app_settings
+
+        if devices is not None:
+            current_data["devices"] = devices
         
+        if ConfigManager._write_config(current_data):
+            print("Config saved.")
+
+    @staticmethod
+    def _write_config(data: Dict[str, Any]) -> bool:
+        """Writes CONFIG_FILE and tells the save listeners. Returns False if the write failed."""
         try:
             with open(CONFIG_FILE, 'w') as f:
-                json.dump(current_data, f, indent=4)
-            print("Config saved.")
+                json.dump(data, f, indent=4)
         except Exception as e:
             print(f"Error saving config: {e}")
+            return False
+        for listener in list(_save_listeners):
+            listener()
+        return True
+
+    @staticmethod
+    def add_save_listener(listener: Callable[[], None]):
+        _save_listeners.append(listener)
 
     @staticmethod
     def get_app_settings() -> Dict[str, Any]:
         data = ConfigManager.load_config()
         return data.get("app_settings", {"osc_port": 9001})
 
+    @staticmethod
+    def get_known_devices() -> List[Dict[str, Any]]:
+        """Devices remembered from the last run (DeviceRegistry.to_config())."""
+        data = ConfigManager.load_config()
+        return data.get("devices", [])
+
     @staticmethod
     def export_config(filepath: str, contacts: List[Contact], bindings: List[Binding]):
         if not filepath:
@@ -90,6 +116,12 @@ class ConfigManager:
         data = ConfigManager.load_config()
         return data.get("modules", {}).get(module_name, {})
 
+    @staticmethod
+    def get_isolated_modules() -> List[str]:
+        """Names of modules configured to run out-of-process ("isolated": true in their module config)."""
+        data = ConfigManager.load_config()
+        return [name for name, cfg in data.get("modules", {}).items() if isinstance(cfg, dict) and cfg.get("isolated")]
+
     @staticmethod
     def set_module_config(module_name: str, config: Dict[str, Any]):
         data = ConfigManager.load_config()
@@ -98,9 +130,5 @@ class ConfigManager:
         
         data["modules"][module_name] = config
         
-        try:
-            with open(CONFIG_FILE, 'w') as f:
-                json.dump(data, f, indent=4)
+        if ConfigManager._write_config(data):
             print(f"Module config for {module_name} saved.")
-        except Exception as e:
-            print(f"Error saving module config: {e}")
@@ -0,0 +1,123 @@
+"""
+Picks up edits made to user_config.json outside the app.
+
+The watcher polls the file's mtime and size. Once a change has been stable
+for one poll (so half-written saves are skipped) and the file parses, the
+contacts and bindings in it are handed to on_change. diff_by_key tells
+callers which entries actually changed, so they can leave the rest alone.
+The app's own saves call saved(), which takes the file as already seen, so
+they are never loaded back.
+"""
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from core.dispatch import binding_key
+from schemas.bindings import Binding
+from schemas.contacts import Contact
+
+
+def snapshot_by_key(items: Iterable[Any], key: Callable[[Any], Hashable]) -> Dict[Hashable, List[dict]]:
+    """Field values of every item grouped by key. Copies, so later in-place edits show up as changes."""
+    snapshot = {}
+    for item in items:
+        snapshot.setdefault(key(item), []).append(item.model_dump())
+    return snapshot
+
+
+def diff_by_key(old: Dict[Hashable, Any], new: Dict[Hashable, Any]) -> Tuple[Set, Set, Set]:
+    """Returns (added, removed, changed) keys between two snapshots."""
+    added = {k for k in new if k not in old}
+    removed = {k for k in old if k not in new}
+    changed = {k for k in new if k in old and old[k] != new[k]}
+    return added, removed, changed
+
+
+def parse_config(data: Dict[str, Any]) -> Tuple[List[Contact], List[Binding]]:
+    contacts = []
+    for c in data.get("contacts", []):
+        try:
+            if isinstance(c, dict):
+                contacts.append(Contact(**c))
+        except Exception as e:
+            print(f"Error parsing contact: {e}")
+    bindings = []
+    keys = set()
+    for b in data.get("bindings", []):
+        try:
+            if isinstance(b, dict):
+                binding = Binding(**b)
+            else:
+                continue
+        except Exception as e:
+            print(f"Error parsing binding: {e}")
+            continue
+        # Trigger, pulse and pattern state is kept per binding_key, two bindings sharing one would clobber it
+        key = binding_key(binding)
+        if key in keys:
+            print(f"Ignoring duplicate binding of '{binding.contact_name}' to '{binding.device_name}' "
+                  f"({binding.reaction_type}): another binding already drives that output from this contact.")
+            continue
+        keys.add(key)
+        bindings.append(binding)
+    return contacts, bindings
+
+
+class ConfigWatcher:
+    def __init__(self, path: str, on_change: Callable[[List[Contact], List[Binding]], None],
+                 interval: float = 1.0):
+        """on_change(contacts, bindings) is called from the watcher thread."""
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self._signature = self._stat()
+        self._pending: Optional[Tuple] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self._thread.start()
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def saved(self):
+        """Called after the app wrote the file itself (ConfigManager.add_save_listener)."""
+        self._signature = self._stat()
+        self._pending = None
+
+    def poll(self) -> bool:
+        """Returns True if a changed config was loaded and handed to on_change."""
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            self._pending = None
+            return False
+        if self._pending != signature:
+            # Wait one more poll in case the file is still being written
+            self._pending = signature
+            return False
+        self._pending = None
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring config change, file can't be read: {e}")
+            self._signature = signature
+            return False
+        self._signature = signature
+        contacts, bindings = parse_config(data)
+        try:
+            self.on_change(contacts, bindings)
+        except Exception as e:
+            print(f"Error applying config change: {e}")
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,445 @@
+"""
+Shared network connections for modules that talk to services.
+
+HTTP requests go through per-host pools of keep-alive connections, so the
+TCP/TLS handshake happens once per connection instead of once per command.
+Websockets stay connected in the background and reconnect with exponential
+backoff; messages sent while disconnected are queued and flushed on reconnect.
+
+Only the standard library is used. Modules get the shared ConnectionManager
+from the loader: a module class whose __init__ takes a `connections`
+argument receives it.
+"""
+import base64
+import concurrent.futures
+import hashlib
+import http.client
+import json as jsonlib
+import os
+import queue
+import random
+import socket
+import ssl
+import struct
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_TIMEOUT = 10.0
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+OP_CONTINUATION, OP_TEXT, OP_BINARY, OP_CLOSE, OP_PING, OP_PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+
+
+class HttpResponse:
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return jsonlib.loads(self.body) if self.body else None
+
+
+class HttpPool:
+    """Keep-alive connections to one scheme://host:port, at most max_size of them open."""
+    def __init__(self, scheme: str, host: str, port: int, max_size: int = DEFAULT_POOL_SIZE,
+                 timeout: float = DEFAULT_TIMEOUT, ssl_context: Optional[ssl.SSLContext] = None):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self._idle = queue.LifoQueue()  # most recently used first, it's the least likely to have timed out
+        self._slots = threading.BoundedSemaphore(max_size)
+        self.created = 0
+        self.requests = 0
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        self.created += 1
+        if self.scheme == "https":
+            context = self.ssl_context or ssl.create_default_context()
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout, context=context)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None) -> HttpResponse:
+        headers = dict(headers or {})
+        self._slots.acquire()
+        try:
+            try:
+                conn, reused = self._idle.get_nowait(), True
+            except queue.Empty:
+                conn, reused = self._new_connection(), False
+
+            try:
+                response = self._send(conn, method, path, body, headers)
+            except (http.client.RemoteDisconnected, ConnectionError, http.client.BadStatusLine):
+                conn.close()
+                if not reused:
+                    raise
+                # The server closed an idle keep-alive connection, retry once on a fresh one
+                conn = self._new_connection()
+                response = self._send(conn, method, path, body, headers)
+            except Exception:
+                conn.close()
+                raise
+
+            self.requests += 1
+            if response.will_close:
+                conn.close()
+            else:
+                self._idle.put(conn)
+            return HttpResponse(response.status, dict(response.getheaders()), response.data)
+        finally:
+            self._slots.release()
+
+    @staticmethod
+    def _send(conn, method, path, body, headers):
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        response.data = response.read()
+        return response
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class WebSocketConnection:
+    """
+    Client websocket that stays connected: a background thread connects,
+    reads incoming messages and reconnects with exponential backoff.
+    on_message(data) is called on that thread with str (text) or bytes (binary).
+    """
+    def __init__(self, url: str, on_message: Optional[Callable[[Any], None]] = None,
+                 headers: Optional[Dict[str, str]] = None, reconnect: bool = True,
+                 backoff_initial: float = 0.5, backoff_max: float = 30.0, ping_interval: float = 20.0,
+                 max_queued: int = 256, timeout: float = DEFAULT_TIMEOUT,
+                 ssl_context: Optional[ssl.SSLContext] = None):
+        parts = urlsplit(url)
+        if parts.scheme not in ("ws", "wss"):
+            raise ValueError(f"Not a websocket URL: {url}")
+        self.url = url
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "wss" else 80)
+        self.secure = parts.scheme == "wss"
+        self.resource = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self.on_message = on_message
+        self.headers = dict(headers or {})
+        self.reconnect = reconnect
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.ping_interval = ping_interval
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+
+        self.connected = threading.Event()
+        self.connects = 0
+        self._sock = None
+        self._buffer = b""
+        self._send_lock = threading.Lock()
+        self._pending = queue.Queue(maxsize=max_queued)  # sent while disconnected
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f"ws-{self.host}:{self.port}", daemon=True)
+        self._thread.start()
+
+    def wait_connected(self, timeout: Optional[float] = None) -> bool:
+        return self.connected.wait(timeout)
+
+    def send(self, data) -> bool:
+        """
+        Sends a text (str) or binary (bytes) message without waiting for any reply.
+        While disconnected the message is queued; returns False if the queue is full.
+        """
+        opcode = OP_TEXT if isinstance(data, str) else OP_BINARY
+        payload = data.encode("utf-8") if isinstance(data, str) else bytes(data)
+        if self.connected.is_set():
+            try:
+                self._send_frame(opcode, payload)
+                return True
+            except OSError:
+                self._drop()
+        try:
+            self._pending.put_nowait((opcode, payload))
+            return True
+        except queue.Full:
+            return False
+
+    def send_json(self, obj) -> bool:
+        return self.send(jsonlib.dumps(obj))
+
+    def close(self):
+        self._running = False
+        sock = self._sock
+        if sock is not None:
+            try:
+                self._send_frame(OP_CLOSE, struct.pack("!H", 1000))
+            except OSError:
+                pass
+        self._drop()
+
+    # Connection thread
+
+    def _run(self):
+        delay = self.backoff_initial
+        while self._running:
+            try:
+                self._connect()
+            except (OSError, ValueError) as e:
+                if not self.reconnect or not self._running:
+                    print(f"Websocket {self.url} failed: {e}")
+                    return
+                # Full jitter so many clients don't reconnect in lockstep
+                time.sleep(random.uniform(0, delay))
+                delay = min(delay * 2, self.backoff_max)
+                continue
+
+            delay = self.backoff_initial
+            self.connects += 1
+            self.connected.set()
+            try:
+                self._flush_pending()
+                self._read_loop()
+            except (OSError, ValueError):
+                pass
+            finally:
+                self._drop()
+            if not self.reconnect:
+                return
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        try:
+            if self.secure:
+                context = self.ssl_context or ssl.create_default_context()
+                sock = context.wrap_socket(sock, server_hostname=self.host)
+            key = base64.b64encode(os.urandom(16)).decode()
+            lines = [f"GET {self.resource} HTTP/1.1", f"Host: {self.host}:{self.port}", "Upgrade: websocket",
+                     "Connection: Upgrade", f"Sec-WebSocket-Key: {key}", "Sec-WebSocket-Version: 13"]
+            lines += [f"{k}: {v}" for k, v in self.headers.items()]
+            sock.sendall(("\r\n".join(lines) + "\r\n\r\n").encode())
+
+            data = b""
+            while b"\r\n\r\n" not in data:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    raise ConnectionError("Connection closed during websocket handshake")
+                data += chunk
+                if len(data) > 65536:
+                    raise ValueError("Websocket handshake response too large")
+            head, self._buffer = data.split(b"\r\n\r\n", 1)
+            status, *header_lines = head.decode("latin-1").split("\r\n")
+            if " 101 " not in f"{status} ":
+                raise ValueError(f"Websocket handshake rejected: {status}")
+            response_headers = {}
+            for line in header_lines:
+                name, _, value = line.partition(":")
+                response_headers[name.strip().lower()] = value.strip()
+            expected = base64.b64encode(hashlib.sha1((key + _WS_GUID).encode()).digest()).decode()
+            if response_headers.get("sec-websocket-accept") != expected:
+                raise ValueError("Websocket handshake: bad Sec-WebSocket-Accept")
+            sock.settimeout(self.ping_interval if self.ping_interval > 0 else None)
+        except Exception:
+            sock.close()
+            raise
+        self._sock = sock
+
+    def _flush_pending(self):
+        while True:
+            try:
+                opcode, payload = self._pending.get_nowait()
+            except queue.Empty:
+                return
+            self._send_frame(opcode, payload)
+
+    def _read_loop(self):
+        fragments = []
+        fragment_opcode = None
+        awaiting_pong = False
+        while self._running:
+            try:
+                opcode, fin, payload = self._read_frame()
+            except socket.timeout:
+                if awaiting_pong:
+                    raise ConnectionError("Websocket ping timed out")
+                self._send_frame(OP_PING, b"")
+                awaiting_pong = True
+                continue
+            awaiting_pong = False
+
+            if opcode == OP_PING:
+                self._send_frame(OP_PONG, payload)
+            elif opcode == OP_PONG:
+                pass
+            elif opcode == OP_CLOSE:
+                try:
+                    self._send_frame(OP_CLOSE, payload[:2])
+                except OSError:
+                    pass
+                return
+            else:
+                if opcode != OP_CONTINUATION:
+                    fragment_opcode = opcode
+                    fragments = []
+                fragments.append(payload)
+                if fin:
+                    message = b"".join(fragments)
+                    fragments = []
+                    if self.on_message:
+                        try:
+                            self.on_message(message.decode("utf-8") if fragment_opcode == OP_TEXT else message)
+                        except Exception as e:
+                            print(f"Error in websocket handler for {self.url}: {e}")
+
+    def _recv_exact(self, n: int) -> bytes:
+        while len(self._buffer) < n:
+            chunk = self._sock.recv(max(4096, n - len(self._buffer)))
+            if not chunk:
+                raise ConnectionError("Websocket closed by peer")
+            self._buffer += chunk
+        data, self._buffer = self._buffer[:n], self._buffer[n:]
+        return data
+
+    def _read_frame(self) -> Tuple[int, bool, bytes]:
+        b0, b1 = self._recv_exact(2)
+        length = b1 & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", self._recv_exact(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", self._recv_exact(8))[0]
+        mask = self._recv_exact(4) if b1 & 0x80 else None
+        payload = self._recv_exact(length) if length else b""
+        if mask:
+            payload = _mask(payload, mask)
+        return b0 & 0x0F, bool(b0 & 0x80), payload
+
+    def _send_frame(self, opcode: int, payload: bytes):
+        # Client frames must be masked
+        mask = os.urandom(4)
+        n = len(payload)
+        if n < 126:
+            header = struct.pack("!BB", 0x80 | opcode, 0x80 | n)
+        elif n < 65536:
+            header = struct.pack("!BBH", 0x80 | opcode, 0x80 | 126, n)
+        else:
+            header = struct.pack("!BBQ", 0x80 | opcode, 0x80 | 127, n)
+        frame = header + mask + _mask(payload, mask)
+        with self._send_lock:
+            sock = self._sock
+            if sock is None:
+                raise ConnectionError("Websocket not connected")
+            sock.sendall(frame)
+
+    def _drop(self):
+        self.connected.clear()
+        sock, self._sock = self._sock, None
+        self._buffer = b""
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+
+def _mask(payload: bytes, mask: bytes) -> bytes:
+    if not payload:
+        return payload
+    n = len(payload)
+    key = (mask * (n // 4 + 1))[:n]
+    return (int.from_bytes(payload, "big") ^ int.from_bytes(key, "big")).to_bytes(n, "big")
+
+
+class ConnectionManager:
+    """Owns every HTTP pool and websocket modules use, so they can be shared and closed together."""
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, timeout: float = DEFAULT_TIMEOUT, async_workers: int = 8):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.pools: Dict[Tuple[str, str, int], HttpPool] = {}
+        self.websockets: Dict[Any, WebSocketConnection] = {}
+        self._lock = threading.Lock()
+        self._async_workers = async_workers
+        self._executor = None
+
+    def pool(self, url: str) -> HttpPool:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Not an HTTP URL: {url}")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        key = (parts.scheme, parts.hostname, port)
+        with self._lock:
+            pool = self.pools.get(key)
+            if pool is None:
+                pool = self.pools[key] = HttpPool(parts.scheme, parts.hostname, port, self.pool_size, self.timeout)
+            return pool
+
+    def request(self, method: str, url: str, json: Any = None, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None) -> HttpResponse:
+        """Sends one request over a pooled keep-alive connection and returns the full response."""
+        headers = dict(headers or {})
+        if json is not None:
+            body = jsonlib.dumps(json).encode("utf-8")
+            headers.setdefault("Content-Type", "application/json")
+        parts = urlsplit(url)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        return self.pool(url).request(method, path, body=body, headers=headers)
+
+    def request_async(self, method: str, url: str, **kwargs) -> concurrent.futures.Future:
+        """
+        Like request(), but returns at once. Several requests to one host run side by side on
+        the pool's connections, so a module can fire commands without waiting for each reply.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self._async_workers, thread_name_prefix="http-async")
+            executor = self._executor
+        return executor.submit(self.request, method, url, **kwargs)
+
+    def websocket(self, url: str, on_message: Optional[Callable[[Any], None]] = None, key: Any = None,
+                  **options) -> WebSocketConnection:
+        """
+        Returns the persistent websocket for key (default: the URL), opening it on first use.
+        options are passed to WebSocketConnection.
+        """
+        key = key if key is not None else url
+        with self._lock:
+            ws = self.websockets.get(key)
+            if ws is None:
+                ws = self.websockets[key] = WebSocketConnection(url, on_message, timeout=self.timeout, **options)
+            return ws
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "http": {f"{s}://{h}:{p}": {"connections_opened": pool.created, "requests": pool.requests}
+                         for (s, h, p), pool in self.pools.items()},
+                "websockets": {str(key): {"connected": ws.connected.is_set(), "connects": ws.connects}
+                               for key, ws in self.websockets.items()},
+            }
+
+    def close(self):
+        with self._lock:
+            pools, self.pools = list(self.pools.values()), {}
+            sockets, self.websockets = list(self.websockets.values()), {}
+            executor, self._executor = self._executor, None
+        for ws in sockets:
+            ws.close()
+        for pool in pools:
+            pool.close()
+        if executor is not None:
+            executor.shutdown(wait=False)
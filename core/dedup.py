@@ -0,0 +1,51 @@
+"""
+Drops exact repeats of OSC messages right after decoding.
+
+VRChat resends parameters whose values haven't changed. Without this, every copy goes
+through the UI queue, the Debug tab, the visualizer and map_message. A message is dropped
+when its address was last let through with the same arguments (same values and types) less
+than `window` seconds ago, so a steady value still passes once per window. Addresses for
+which exempt(address) is true always pass (Binding.pass_repeats).
+"""
+import threading
+import time
+from typing import Any, Callable, Optional, Tuple
+
+
+class IngestDedup:
+    def __init__(self, window: float, exempt: Optional[Callable[[str], bool]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.window = window
+        self.exempt = exempt
+        self.clock = clock
+        self.last = {} # {address: (args, time it last passed)}
+        self.passed = 0
+        self.suppressed = 0
+        self._lock = threading.Lock() # the UDP server handles datagrams on several threads
+
+    def admit(self, address: str, args: Tuple[Any, ...]) -> bool:
+        """Whether the message should be processed; False for a repeat within the window."""
+        now = self.clock()
+        with self._lock:
+            last = self.last.get(address)
+            if (last is not None and now - last[1] < self.window and last[0] == args
+                    and all(type(a) is type(b) for a, b in zip(args, last[0]))):
+                if self.exempt is None or not self.exempt(address):
+                    self.suppressed += 1
+                    return False
+            self.last[address] = (args, now)
+            self.passed += 1
+            return True
+
+    def reset(self):
+        with self._lock:
+            self.last = {}
+
+    def collect_metrics(self):
+        """Collector for core.metrics.Metrics.add_collector."""
+        return [
+            ("osc_deduplicated_total", "Repeated OSC messages dropped at ingest", "counter", (),
+             {(): self.suppressed}),
+            ("osc_ingested_total", "OSC messages passed on after deduplication", "counter", (),
+             {(): self.passed}),
+        ]
@@ -0,0 +1,254 @@
+"""
+Every device the modules have reported, indexed by (module name, device id).
+
+The registry is the one place the UI reads devices from. Entries carry a
+status and the reaction types the module supports, and listeners hear about
+each added, changed or removed entry. The list is saved in user_config.json
+("devices"), so at startup the devices of the previous run are available
+straight away as "last_known" while the real scans run in the background and
+mark them "online" or "missing".
+
+Modules can report devices as they find them instead of all at the end:
+scan() may be a generator yielding device dicts, or accept an `on_device`
+callback (and optionally a `cancel` threading.Event to stop early). Plain
+scan() returning a list works as before, and is what isolated modules
+(core.module_host) always do, since callbacks can't reach another process.
+ScanJob runs one scan on its own thread so the UI never waits on it.
+"""
+import inspect
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from schemas.devices import KnownDevice
+
+ONLINE = "online"
+LAST_KNOWN = "last_known"
+MISSING = "missing"
+
+ADDED = "added"
+CHANGED = "changed"
+REMOVED = "removed"
+
+REACTIONS = ("vibrate", "shock", "sound")
+
+
+def module_capabilities(module) -> List[str]:
+    """Reaction types a module can send, from the methods it implements."""
+    if module is None:
+        return []
+    if callable(getattr(module, 'handle_event', None)):
+        return list(REACTIONS)
+    return [r for r in REACTIONS if callable(getattr(module, r, None))]
+
+
+def display_name(device: KnownDevice) -> str:
+    text = f"{device.module_name} : {device.name} ({device.device_id})"
+    if device.status in (LAST_KNOWN, MISSING):
+        text += f" [{device.status.replace('_', ' ')}]"
+    return text
+
+
+class DeviceRegistry:
+    def __init__(self, known: Optional[Iterable[Dict[str, Any]]] = None):
+        """known: entries saved by to_config() on a previous run."""
+        self._devices: Dict[Tuple[str, str], KnownDevice] = {}
+        self._lock = threading.Lock()
+        self._listeners: List[Callable] = []
+        self.scanning = 0 # scans currently running, changes are only worth saving once this is 0
+        if known:
+            self.load(known)
+
+    def subscribe(self, listener: Callable):
+        """listener(kind, device) is called from whichever thread changed the registry."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _emit(self, changes):
+        for kind, device in changes:
+            for listener in list(self._listeners):
+                try:
+                    listener(kind, device)
+                except Exception as e:
+                    print(f"Error in device registry listener: {e}")
+
+    def load(self, entries: Iterable[Dict[str, Any]]):
+        changes = []
+        with self._lock:
+            for entry in entries:
+                try:
+                    device = KnownDevice(**entry)
+                except Exception as e:
+                    print(f"Skipping invalid known device: {e}")
+                    continue
+                # Nothing has been confirmed in this run yet
+                device.status = LAST_KNOWN
+                key = (device.module_name, device.device_id)
+                changes.append((CHANGED if key in self._devices else ADDED, device))
+                self._devices[key] = device
+        self._emit(changes)
+
+    def to_config(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [d.model_dump() for d in self._devices.values()]
+
+    def get(self, module_name: str, device_id: str) -> Optional[KnownDevice]:
+        return self._devices.get((module_name, device_id))
+
+    def devices(self, module_name: Optional[str] = None) -> List[KnownDevice]:
+        with self._lock:
+            return [d for d in self._devices.values() if module_name is None or d.module_name == module_name]
+
+    def update_module(self, module_name: str, devices, module=None, complete: bool = True):
+        """
+        Records the devices (module-style dicts with id, name and optional status/capabilities)
+        a module reported. With complete, its known devices that weren't reported become missing.
+        """
+        now = time.time()
+        capabilities = module_capabilities(module)
+        changes = []
+        seen = set()
+        with self._lock:
+            for dev in devices or []:
+                device_id = str(dev.get('id', '?'))
+                seen.add(device_id)
+                key = (module_name, device_id)
+                old = self._devices.get(key)
+                status = dev.get('status')
+                device = KnownDevice(
+                    module_name=module_name,
+                    device_id=device_id,
+                    name=str(dev.get('name', old.name if old else 'Unknown')),
+                    status=status if status and status not in (LAST_KNOWN, MISSING) else ONLINE,
+                    capabilities=list(dev.get('capabilities') or capabilities or (old.capabilities if old else [])),
+                    last_seen=now
+                )
+                self._devices[key] = device
+                if old is None:
+                    changes.append((ADDED, device))
+                elif old.model_dump(exclude={'last_seen'}) != device.model_dump(exclude={'last_seen'}):
+                    changes.append((CHANGED, device))
+
+            if complete:
+                for key, device in self._devices.items():
+                    if key[0] == module_name and key[1] not in seen and device.status != MISSING:
+                        device = self._devices[key] = device.model_copy(update={'status': MISSING})
+                        changes.append((CHANGED, device))
+        self._emit(changes)
+
+    def remove_module(self, module_name: str):
+        with self._lock:
+            removed = [self._devices.pop(key) for key in [k for k in self._devices if k[0] == module_name]]
+        self._emit([(REMOVED, device) for device in removed])
+
+    def scan(self, module_name: str, module, on_device: Optional[Callable] = None,
+             cancel: Optional[threading.Event] = None):
+        """
+        Runs module.scan() and records the result. Devices a streaming scan reports are recorded
+        (and passed to on_device) as they arrive. Returns the devices the module reported, or None
+        if cancel was set before the scan finished; devices found until then are kept, but nothing
+        is marked missing.
+        """
+        with self._lock:
+            self.scanning += 1
+        try:
+            return self._scan(module_name, module, on_device, cancel)
+        finally:
+            with self._lock:
+                self.scanning -= 1
+
+    def _scan(self, module_name: str, module, on_device: Optional[Callable], cancel: Optional[threading.Event]):
+        found = []
+
+        def report(dev):
+            found.append(dev)
+            self.update_module(module_name, [dev], module, complete=False)
+            if on_device:
+                on_device(dev)
+
+        try:
+            params = inspect.signature(module.scan).parameters
+        except (TypeError, ValueError):
+            params = {}
+        kwargs = {}
+        if "on_device" in params:
+            kwargs["on_device"] = report
+        if "cancel" in params and cancel is not None:
+            kwargs["cancel"] = cancel
+
+        devices = module.scan(**kwargs)
+        if inspect.isgenerator(devices):
+            try:
+                for dev in devices:
+                    report(dev)
+                    if cancel is not None and cancel.is_set():
+                        break
+            finally:
+                devices.close()
+            devices = found
+        elif devices is None:
+            devices = found if kwargs.get("on_device") else getattr(module, 'devices', None)
+
+        if cancel is not None and cancel.is_set():
+            return None
+        self.update_module(module_name, devices, module)
+        return devices
+
+    def scan_all(self, modules: Dict[str, Any], on_done: Optional[Callable] = None) -> threading.Thread:
+        """Scans every module on a background thread, one after another; on_done() runs at the end."""
+        def run():
+            for name, module in list(modules.items()):
+                if not hasattr(module, 'scan'):
+                    continue
+                print(f"Auto-scanning devices for module: {name}")
+                try:
+                    self.scan(name, module)
+                except Exception as e:
+                    print(f"Error during auto-scan for module '{name}': {e}")
+            if on_done:
+                on_done()
+
+        thread = threading.Thread(target=run, name="device-scan", daemon=True)
+        thread.start()
+        return thread
+
+
+class ScanJob:
+    """One registry scan of a module on its own thread. The UI polls found and done."""
+    def __init__(self, registry: DeviceRegistry, module_name: str, module):
+        self.registry = registry
+        self.module_name = module_name
+        self.module = module
+        self.found = 0 # devices reported so far
+        self.devices = None # the final list, None if cancelled or failed
+        self.error: Optional[Exception] = None
+        self.done = threading.Event()
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"scan-{module_name}", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            self.devices = self.registry.scan(self.module_name, self.module, self._count, self._cancel)
+            if self.devices is not None and not self.found:
+                # The module didn't stream (e.g. an isolated one): everything arrived at the end
+                self.found = len(self.devices)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done.set()
+
+    def _count(self, dev):
+        self.found += 1
+
+    def cancel(self):
+        """Stops waiting for the scan. A module that can't stop early finishes on its own, its result is dropped."""
+        self._cancel.set()
+        self.done.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
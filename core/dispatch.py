@@ -0,0 +1,278 @@
+"""
+Command scheduler for device output.
+
+Every (module, device_id) pair gets its own serial lane so commands for one
+device always run in the order they were accepted, while different devices
+still run in parallel on a shared pool of worker threads.
+"""
+import collections
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from core.stats import LatencyStats
+
+# Priority classes, lower runs first
+PRIORITY_STOP = 0    # stop signals, only queued through CommandScheduler.preempt
+PRIORITY_HIGH = 1    # pulses / one-shot events
+PRIORITY_NORMAL = 2  # continuous updates
+PRIORITY_LOW = 3     # background work (tests, refreshes)
+PRIORITY_CLASSES = 4
+
+DEFAULT_LANE_DEPTH = 32
+
+
+def binding_key(binding) -> Tuple[str, str, str, str]:
+    """Stable identity of a binding's output, used to detect superseded commands."""
+    return (binding.contact_id, binding.module_name, binding.device_id, binding.reaction_type)
+
+
+class Command:
+    __slots__ = ("key", "fn", "args", "priority", "enqueued")
+
+    def __init__(self, key: Optional[Hashable], fn: Callable, args: tuple, priority: int):
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.priority = priority
+        self.enqueued = time.perf_counter()
+
+
+class Lane:
+    """Pending commands and counters for one device."""
+    def __init__(self, lane_key: Hashable, max_depth: int):
+        self.lane_key = lane_key
+        self.max_depth = max_depth
+        self.queues = [collections.deque() for _ in range(PRIORITY_CLASSES)]
+        self.by_key: Dict[Hashable, Command] = {}
+        self.size = 0
+        self.scheduled = False  # in a ready queue or currently running
+        self.running = False
+        self.urgent = False     # a stop is queued, lane goes through the urgent queue
+
+        # Metrics
+        self.submitted = 0
+        self.executed = 0
+        self.superseded = 0
+        self.dropped = 0
+        self.max_size = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.cancelled = 0
+        self.stops = 0
+
+    def _remove(self, cmd: Command):
+        self.queues[cmd.priority].remove(cmd)
+        if cmd.key is not None and self.by_key.get(cmd.key) is cmd:
+            del self.by_key[cmd.key]
+        self.size -= 1
+
+    def push(self, cmd: Command) -> bool:
+        self.submitted += 1
+
+        # A newer command for the same output makes the queued one pointless
+        if cmd.key is not None:
+            old = self.by_key.get(cmd.key)
+            if old is not None:
+                self._remove(old)
+                self.superseded += 1
+
+        if self.size >= self.max_depth:
+            # Make room by dropping the oldest command of the least important class,
+            # unless the new command is the least important one
+            for priority in range(PRIORITY_CLASSES - 1, cmd.priority - 1, -1):
+                if self.queues[priority]:
+                    self._remove(self.queues[priority][0])
+                    break
+            else:
+                self.dropped += 1
+                return False
+            self.dropped += 1
+
+        self.queues[cmd.priority].append(cmd)
+        if cmd.key is not None:
+            self.by_key[cmd.key] = cmd
+        self.size += 1
+        if self.size > self.max_size:
+            self.max_size = self.size
+        return True
+
+    def clear(self) -> int:
+        """Drops every pending command, returns how many were dropped."""
+        count = self.size
+        for queue in self.queues:
+            queue.clear()
+        self.by_key.clear()
+        self.size = 0
+        self.cancelled += count
+        return count
+
+    def pop(self) -> Optional[Command]:
+        for queue in self.queues:
+            if queue:
+                cmd = queue.popleft()
+                if cmd.key is not None and self.by_key.get(cmd.key) is cmd:
+                    del self.by_key[cmd.key]
+                self.size -= 1
+                wait = time.perf_counter() - cmd.enqueued
+                self.total_wait += wait
+                if wait > self.max_wait:
+                    self.max_wait = wait
+                return cmd
+        return None
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "depth": self.size,
+            "max_depth": self.max_size,
+            "submitted": self.submitted,
+            "executed": self.executed,
+            "superseded": self.superseded,
+            "dropped": self.dropped,
+            "cancelled": self.cancelled,
+            "stops": self.stops,
+            "avg_wait_ms": (self.total_wait / self.executed * 1000) if self.executed else 0.0,
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+
+class CommandScheduler:
+    """
+    Runs commands on a fixed pool of worker threads, one at a time per lane.
+
+    Lanes take turns (round-robin), so a flood of commands for one device can
+    occupy at most one worker while every other device keeps being served.
+
+    Stops go through preempt(): they clear the lane and are served from an
+    urgent queue that every worker checks first, plus one worker reserved for
+    urgent lanes only. A stop therefore waits at most for the command already
+    running on its own device, never for other devices or for a free worker.
+    """
+    def __init__(self, max_workers: int = 10, lane_depth: int = DEFAULT_LANE_DEPTH):
+        self.lane_depth = lane_depth
+        self.lanes: Dict[Hashable, Lane] = {}
+        self.stop_latency = LatencyStats()
+        self._ready = collections.deque()
+        self._urgent = collections.deque()
+        # Regular workers and the reserved stop worker wait on separate conditions
+        # sharing one lock, so a wakeup meant for one kind never gets lost on the other
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._stop_cond = threading.Condition(self._lock)
+        self._running = True
+        self._workers = []
+        for i in range(max_workers):
+            t = threading.Thread(target=self._worker, name=f"dispatch-{i}", daemon=True)
+            t.start()
+            self._workers.append(t)
+        t = threading.Thread(target=self._worker, args=(True,), name="dispatch-stop", daemon=True)
+        t.start()
+        self._workers.append(t)
+
+    def _lane(self, lane_key: Hashable) -> Lane:
+        lane = self.lanes.get(lane_key)
+        if lane is None:
+            lane = self.lanes[lane_key] = Lane(lane_key, self.lane_depth)
+        return lane
+
+    def submit(self, lane_key: Hashable, fn: Callable, *args, key: Optional[Hashable] = None,
+               priority: int = PRIORITY_NORMAL) -> bool:
+        """
+        Queues fn(*args) on the lane for lane_key.
+        If key is given, a still-queued command with the same key is dropped in favour of this one.
+        Returns False if the command was rejected because the lane is full.
+        """
+        cmd = Command(key, fn, args, priority)
+        with self._lock:
+            if not self._running:
+                return False
+            lane = self._lane(lane_key)
+            accepted = lane.push(cmd)
+            if accepted and not lane.scheduled:
+                lane.scheduled = True
+                self._ready.append(lane)
+                self._cond.notify()
+            return accepted
+
+    def preempt(self, lane_key: Hashable, fn: Callable, *args):
+        """
+        Cancels everything still queued for lane_key and makes fn(*args) the
+        next command that runs on it, ahead of all other lanes.
+        """
+        cmd = Command(None, fn, args, PRIORITY_STOP)
+        with self._lock:
+            if not self._running:
+                return
+            lane = self._lane(lane_key)
+            lane.clear()
+            lane.submitted += 1
+            lane.stops += 1
+            lane.queues[PRIORITY_STOP].append(cmd)
+            lane.size += 1
+
+            if not lane.urgent:
+                lane.urgent = True
+                if lane.scheduled and not lane.running:
+                    self._ready.remove(lane)
+                    lane.scheduled = False
+                if not lane.scheduled:
+                    lane.scheduled = True
+                    self._urgent.append(lane)
+            self._stop_cond.notify()
+            self._cond.notify()
+
+    def cancel(self, lane_key: Hashable) -> int:
+        """Drops all queued commands of a lane without running anything."""
+        with self._lock:
+            lane = self.lanes.get(lane_key)
+            return lane.clear() if lane else 0
+
+    def _worker(self, urgent_only: bool = False):
+        cond = self._stop_cond if urgent_only else self._cond
+        while True:
+            with self._lock:
+                while self._running and not self._urgent and (urgent_only or not self._ready):
+                    cond.wait()
+                if not self._running:
+                    return
+                lane = self._urgent.popleft() if self._urgent else self._ready.popleft()
+                lane.urgent = False
+                lane.running = True
+                cmd = lane.pop()
+
+            if cmd is not None:
+                if cmd.priority == PRIORITY_STOP:
+                    self.stop_latency.add(time.perf_counter() - cmd.enqueued)
+                try:
+                    cmd.fn(*cmd.args)
+                except Exception as e:
+                    print(f"Error in dispatched command for {lane.lane_key}: {e}")
+
+            with self._lock:
+                lane.running = False
+                if cmd is not None:
+                    lane.executed += 1
+                if lane.urgent:
+                    # A stop arrived while this command was running
+                    self._urgent.append(lane)
+                    self._stop_cond.notify()
+                    self._cond.notify()
+                elif lane.size:
+                    self._ready.append(lane)
+                    self._cond.notify()
+                else:
+                    lane.scheduled = False
+
+    def lane_metrics(self) -> Dict[Hashable, Dict[str, Any]]:
+        with self._lock:
+            return {key: lane.metrics() for key, lane in self.lanes.items()}
+
+    def stop_latency_summary(self) -> Dict[str, float]:
+        """Time from preempt() until the stop command started running."""
+        return self.stop_latency.summary()
+
+    def shutdown(self):
+        with self._lock:
+            self._running = False
+            self._cond.notify_all()
+            self._stop_cond.notify_all()
@@ -0,0 +1,113 @@
+"""
+Per-contact smoothing filters applied to incoming values before bindings see them.
+
+State for every contact lives in a FilterBank: a handful of preallocated
+float arrays indexed by slot, so filtering a sample allocates nothing.
+"""
+import math
+from array import array
+from typing import Dict, List
+
+DEFAULT_RATE = 1.0 / 60.0 # assumed sample interval when two samples share a timestamp
+
+
+class FilterBank:
+    def __init__(self, capacity: int = 64):
+        self.slots: Dict[str, int] = {}
+        self._free: List[int] = [] # slots given back by release()
+        self.capacity = 0
+        self._alloc(capacity)
+
+    def _alloc(self, capacity: int):
+        grow = capacity - self.capacity
+        if grow <= 0:
+            return
+        if self.capacity == 0:
+            self.x = array('d', bytes(8 * capacity))     # last output
+            self.dx = array('d', bytes(8 * capacity))    # smoothed derivative (One Euro)
+            self.t = array('d', bytes(8 * capacity))     # timestamp of last sample
+            self.h0 = array('d', bytes(8 * capacity))    # previous raw sample (median)
+            self.h1 = array('d', bytes(8 * capacity))    # sample before that (median)
+            self.count = array('B', bytes(capacity))     # samples seen, saturates at 2
+        else:
+            for column in (self.x, self.dx, self.t, self.h0, self.h1):
+                column.extend(array('d', bytes(8 * grow)))
+            self.count.extend(array('B', bytes(grow)))
+        self.capacity = capacity
+
+    def slot_for(self, contact_id: str) -> int:
+        slot = self.slots.get(contact_id)
+        if slot is None:
+            slot = self._free.pop() if self._free else len(self.slots)
+            if slot >= self.capacity:
+                self._alloc(self.capacity * 2)
+            self.slots[contact_id] = slot
+            self.reset(slot)
+        return slot
+
+    def release(self, contact_id: str):
+        """Frees the contact's slot for reuse, e.g. when a pattern contact instance is evicted."""
+        slot = self.slots.pop(contact_id, None)
+        if slot is not None:
+            self.reset(slot)
+            self._free.append(slot)
+
+    def reset(self, slot: int):
+        self.x[slot] = self.dx[slot] = self.t[slot] = self.h0[slot] = self.h1[slot] = 0.0
+        self.count[slot] = 0
+
+    def apply(self, contact, value: float, now: float) -> float:
+        """Filters one sample of `contact` (a schemas.contacts.Contact) and returns the smoothed value."""
+        kind = contact.filter_type
+        if kind == "none":
+            return value
+
+        slot = self.slot_for(contact.id)
+        if value == 0:
+            # Contact released: report it immediately so stop signals aren't smeared out
+            self.reset(slot)
+            return 0.0
+
+        if self.count[slot] == 0:
+            self.x[slot] = self.h0[slot] = self.h1[slot] = value
+            self.t[slot] = now
+            self.count[slot] = 1
+            return value
+
+        if kind == "ema":
+            out = self.x[slot] + contact.filter_alpha * (value - self.x[slot])
+        elif kind == "median3":
+            a, b = self.h1[slot], self.h0[slot]
+            out = max(min(a, b), min(max(a, b), value))
+            self.h1[slot] = b
+            self.h0[slot] = value
+        elif kind == "one_euro":
+            out = self._one_euro(slot, contact, value, now)
+        else:
+            out = value
+
+        self.x[slot] = out
+        self.t[slot] = now
+        if self.count[slot] < 2:
+            self.count[slot] += 1
+        return out
+
+    def _one_euro(self, slot: int, contact, value: float, now: float) -> float:
+        te = now - self.t[slot]
+        if te <= 0:
+            te = DEFAULT_RATE
+        prev = self.x[slot]
+
+        # Smoothed speed of change drives the cutoff: slow movement -> heavy smoothing, fast -> low lag
+        a_d = _alpha(te, contact.filter_d_cutoff)
+        dx = (value - prev) / te
+        edx = self.dx[slot] + a_d * (dx - self.dx[slot])
+        self.dx[slot] = edx
+
+        cutoff = contact.filter_min_cutoff + contact.filter_beta * abs(edx)
+        return prev + _alpha(te, cutoff) * (value - prev)
+
+
+def _alpha(te: float, cutoff: float) -> float:
+    tau = 1.0 / (2 * math.pi * cutoff) if cutoff > 0 else float('inf')
+    return 1.0 / (1.0 + tau / te)
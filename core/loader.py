@@ -3,87 +3,211 @@ import importlib.util
 import inspect
 
 class Loader:
-    def __init__(self, modules_dir="modules"):
+    def __init__(self, modules_dir="modules", isolated_modules=None):
         # Set absolute path relative to the project root (parent of this file's folder)
         project_root = os.path.dirname(os.path.dirname(__file__))
         self.modules_dir = os.path.join(project_root, modules_dir)
         self.loaded_modules = {}
+        self.filenames = {} # {module_name: entry in modules_dir}, used to reload a single module
+        self.handed_over = {} # {module_name: whether the last reload moved the old instance's state over}
+        # Names of modules that should run in a worker subprocess instead of in-process
+        self.isolated_modules = set(isolated_modules or [])
+        self._connections = None
+
+    @property
+    def connections(self):
+        """Shared keep-alive HTTP pools and websockets, created for the first module that asks for `connections`."""
+        if self._connections is None:
+            from core.connections import ConnectionManager
+            self._connections = ConnectionManager()
+        return self._connections
 
     def load_modules(self):
         """
         Loads all .py modules from the modules directory.
         Returns a dictionary {module_name: module_instance_or_module}.
         It attempts to instantiate a class if found (heuristic: named {filename}Module or just the first class found).
+        Modules listed in isolated_modules are hosted out-of-process and represented by a proxy.
         """
         self.loaded_modules = {}
-        
+
         if not os.path.exists(self.modules_dir):
             print(f"Warning: Directory '{self.modules_dir}' does not exist.")
             return {}
 
         for filename in os.listdir(self.modules_dir):
-            file_path = os.path.join(self.modules_dir, filename)
-            module_name = filename
-            spec = None
+            module_name, spec = self._find_spec(filename)
+            if not spec:
+                continue
+
+            self.filenames[module_name] = filename
+            instance = self._create(module_name, spec, filename)
+            if instance is not None:
+                self.loaded_modules[module_name] = instance
+
+        return self.loaded_modules
+
+    def _create(self, module_name, spec, filename):
+        if module_name in self.isolated_modules:
+            try:
+                from core.module_host import IsolatedModule
+                return IsolatedModule(module_name, self.modules_dir, filename)
+            except Exception as e:
+                print(f"Failed to start isolated module {module_name}: {e}")
+                return None
+        return self._load_spec(module_name, spec)
+
+    def reload_module(self, module_name, filename=None):
+        """
+        Re-imports one module and swaps it into loaded_modules, leaving every other module running.
+        Pass filename for a module that wasn't loaded before.
 
-            # Case A: Directory Module (e.g., modules/TestModule/__init__.py)
-            if os.path.isdir(file_path):
-                # Check for __init__.py
-                init_path = os.path.join(file_path, "__init__.py")
-                if os.path.exists(init_path):
-                    try:
-                        spec = importlib.util.spec_from_file_location(module_name, init_path)
-                    except Exception:
-                        pass
-            
-            # Case B: Single File Module (e.g. modules/test.py)
-            elif filename.endswith('.py') and not filename.startswith('__'):
-                module_name = filename[:-3]
+        If the running instance has export_state(), the result is handed to the new instance's
+        import_state() (device lists, open connections, ...). Only when import_state() succeeds do
+        the resources belong to the new instance, so only then is the old one left open. Isolated
+        modules skip the handover: their state would have to pass through JSON, which objects like
+        deques and devices don't survive, and the old worker process is always stopped.
+        handed_over[module_name] records whether the handover happened; without it the new
+        instance starts from scratch and has to find its devices again.
+        Returns the new instance, or None if loading failed and the old one keeps running.
+        """
+        filename = filename or self.filenames.get(module_name)
+        if filename is None:
+            return None
+        name, spec = self._find_spec(filename)
+        if not spec:
+            return None
+        module_name = name
+
+        new = self._create(module_name, spec, filename)
+        if new is None:
+            print(f"Reload of module {module_name} failed, keeping the running version.")
+            return None
+
+        old = self.loaded_modules.get(module_name)
+        state = None
+        isolated = module_name in self.isolated_modules
+        if old is not None and not isolated and hasattr(old, 'export_state'):
+            try:
+                state = old.export_state()
+            except Exception as e:
+                print(f"Error exporting state of module {module_name}: {e}")
+        handed_over = False
+        if state is not None and hasattr(new, 'import_state'):
+            try:
+                new.import_state(state)
+                handed_over = True
+            except Exception as e:
+                print(f"Error importing state into module {module_name}: {e}")
+
+        # One dict store: the dispatcher looks modules up by name for every command,
+        # so the next command uses the new instance while calls already running finish on the old one
+        self.filenames[module_name] = filename
+        self.loaded_modules[module_name] = new
+        self.handed_over[module_name] = handed_over
+        print(f"Reloaded module {module_name}")
+
+        if old is not None and hasattr(old, 'close') and not handed_over:
+            try:
+                old.close()
+            except Exception as e:
+                print(f"Error closing module: {e}")
+        return new
+
+    def unload_module(self, module_name):
+        """Removes a module whose files were deleted."""
+        self.filenames.pop(module_name, None)
+        self.handed_over.pop(module_name, None)
+        old = self.loaded_modules.pop(module_name, None)
+        if old is not None and hasattr(old, 'close'):
+            try:
+                old.close()
+            except Exception as e:
+                print(f"Error closing module: {e}")
+
+    def load_module(self, filename):
+        """Loads a single entry of the modules directory (file or package) in this process."""
+        module_name, spec = self._find_spec(filename)
+        if not spec:
+            return None
+        return self._load_spec(module_name, spec)
+
+    def shutdown(self):
+        """Stops any out-of-process module workers and closes shared connections."""
+        for module in self.loaded_modules.values():
+            if hasattr(module, 'close'):
                 try:
-                    spec = importlib.util.spec_from_file_location(module_name, file_path)
+                    module.close()
+                except Exception as e:
+                    print(f"Error closing module: {e}")
+        if self._connections is not None:
+            self._connections.close()
+
+    def _find_spec(self, filename):
+        """Returns (module_name, spec) for a modules directory entry, spec is None if it isn't loadable."""
+        file_path = os.path.join(self.modules_dir, filename)
+        module_name = filename
+        spec = None
+
+        # Case A: Directory Module (e.g., modules/TestModule/__init__.py)
+        if os.path.isdir(file_path):
+            # Check for __init__.py
+            init_path = os.path.join(file_path, "__init__.py")
+            if os.path.exists(init_path):
+                try:
+                    spec = importlib.util.spec_from_file_location(module_name, init_path)
                 except Exception:
                     pass
 
-            # Load if spec found
-            if spec and spec.loader:
-                try:
-                    module = importlib.util.module_from_spec(spec)
-                    spec.loader.exec_module(module)
-                    
-                    # Try to find a primary class to instantiate
-                    # Heuristic: Match 'test' -> 'testModule' or 'TestModule' or 'Test'
-                    instance = self._instantiate_module_class(module, module_name)
-                    
-                    if instance:
-                        self.loaded_modules[module_name] = instance
-                    else:
-                        # Fallback: just store the raw module
-                        self.loaded_modules[module_name] = module
-                        
-                except Exception as e:
-                    print(f"Failed to load module {module_name}: {e}")
+        # Case B: Single File Module (e.g. modules/test.py)
+        elif filename.endswith('.py') and not filename.startswith('__'):
+            module_name = filename[:-3]
+            try:
+                spec = importlib.util.spec_from_file_location(module_name, file_path)
+            except Exception:
+                pass
 
-        return self.loaded_modules
+        if spec and not spec.loader:
+            spec = None
+        return module_name, spec
+
+    def _load_spec(self, module_name, spec):
+        try:
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+
+            # Try to find a primary class to instantiate
+            # Heuristic: Match 'test' -> 'testModule' or 'TestModule' or 'Test'
+            instance = self._instantiate_module_class(module, module_name)
+
+            if instance:
+                return instance
+            # Fallback: just store the raw module
+            return module
+
+        except Exception as e:
+            print(f"Failed to load module {module_name}: {e}")
+            return None
 
     def _instantiate_module_class(self, module, module_name):
         """Helper to find and instantiate the main class in the module."""
         # 1. Look for class named {ModuleName}Module (case insensitive)
         target_names = [
-            f"{module_name}Module".lower(), 
+            f"{module_name}Module".lower(),
             module_name.lower(),
             "module" # Generic 'Module' class
         ]
-        
+
         candidates = []
         for name, obj in inspect.getmembers(module, inspect.isclass):
             if obj.__module__ == module.__name__:
                 candidates.append((name, obj))
-        
+
         # Strategy A: Exact Name Match (case-insensitive)
         for name, obj in candidates:
             if name.lower() in target_names:
                 try:
-                    return obj()
+                    return self._construct(obj)
                 except Exception as e:
                     print(f"Error instantiating {name} in {module_name}: {e}")
                     return None
@@ -91,9 +215,19 @@ class Loader:
         # Strategy B: If only one class exists, assume it's the main one
         if len(candidates) == 1:
             try:
-                return candidates[0][1]()
+                return self._construct(candidates[0][1])
             except Exception as e:
                 print(f"Error instantiating {candidates[0][0]} in {module_name}: {e}")
                 return None
-                
-        return None
\ No newline at end of file
+
+        return None
+
+    def _construct(self, cls):
+        """Instantiates a module class, passing the shared ConnectionManager if __init__ accepts `connections`."""
+        try:
+            params = inspect.signature(cls).parameters
+        except (TypeError, ValueError):
+            params = {}
+        if "connections" in params:
+            return cls(connections=self.connections)
+        return cls()
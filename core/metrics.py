@@ -0,0 +1,227 @@
+"""
+Pipeline metrics and an optional loopback HTTP endpoint to scrape them.
+
+Counters and histograms are sharded per thread: each thread only ever writes
+its own shard, so recording a sample takes no lock and never waits for a
+scrape. A scrape sums the shards. Values that already live elsewhere (queue
+depths, lane counters) are read through collector callbacks at scrape time.
+
+    GET /metrics       Prometheus text format
+    GET /metrics.json  the same data as JSON
+"""
+import bisect
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+# Upper bounds in seconds for latency histograms
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class _Sharded:
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._lock = threading.Lock() # only taken once per thread, to register its shard
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def _snapshot(self) -> List[list]:
+        with self._lock:
+            shards = list(self._shards)
+        # dict.items() copies atomically under the GIL even while the owner thread writes
+        return [list(shard.items()) for shard in shards]
+
+
+class Counter(_Sharded):
+    kind = "counter"
+
+    def inc(self, labels: Tuple = (), amount: float = 1):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def collect(self) -> Dict[Tuple, float]:
+        totals = {}
+        for items in self._snapshot():
+            for labels, value in items:
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+
+class Histogram(_Sharded):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, labels: Tuple = ()):
+        shard = self._shard()
+        data = shard.get(labels)
+        if data is None:
+            # per-bucket counts (last one is +Inf), then sum and count
+            data = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        data[bisect.bisect_left(self.buckets, value)] += 1
+        data[-2] += value
+        data[-1] += 1
+
+    def collect(self) -> Dict[Tuple, list]:
+        totals = {}
+        for items in self._snapshot():
+            for labels, data in items:
+                total = totals.get(labels)
+                if total is None:
+                    totals[labels] = list(data)
+                else:
+                    for i, v in enumerate(data):
+                        total[i] += v
+        return totals
+
+
+class Metrics:
+    def __init__(self, prefix: str = "vrchaptics"):
+        self.prefix = prefix
+        self.started = time.time()
+        self._metrics: List[_Sharded] = []
+        self._collectors: List[Callable[[], List[Tuple]]] = []
+
+    def counter(self, name: str, help_text: str, labels: Tuple[str, ...] = ()) -> Counter:
+        metric = Counter(f"{self.prefix}_{name}", help_text, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, labels: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(f"{self.prefix}_{name}", help_text, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], List[Tuple]]):
+        """
+        collector() is called on every scrape and returns a list of
+        (name, help, "gauge" | "counter", label_names, {label_values: value}).
+        """
+        self._collectors.append(collector)
+
+    def collect(self) -> List[Tuple[str, str, str, Tuple[str, ...], Dict[Tuple, Any]]]:
+        families = [(m.name, m.help, m.kind, m.labels, m.collect()) for m in self._metrics]
+        for collector in self._collectors:
+            try:
+                for name, help_text, kind, labels, samples in collector():
+                    families.append((f"{self.prefix}_{name}", help_text, kind, labels, samples))
+            except Exception as e:
+                print(f"Error collecting metrics: {e}")
+        return families
+
+    def prometheus_text(self) -> str:
+        lines = []
+        for name, help_text, kind, label_names, samples in self.collect():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for label_values, value in samples.items():
+                labels = list(zip(label_names, label_values))
+                if kind != "histogram":
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                    continue
+                buckets = next(m.buckets for m in self._metrics if m.name == name)
+                cumulative = 0
+                for bound, count in zip(buckets + (float("inf"),), value):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{name}_bucket{_labels(labels + [('le', le)])} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(value[-2])}")
+                lines.append(f"{name}_count{_labels(labels)} {value[-1]}")
+        return "\n".join(lines) + "\n"
+
+    def as_dict(self) -> Dict[str, Any]:
+        out = {"uptime_s": time.time() - self.started, "metrics": {}}
+        for name, help_text, kind, label_names, samples in self.collect():
+            entries = []
+            for label_values, value in samples.items():
+                entry = {"labels": dict(zip(label_names, label_values))}
+                if kind == "histogram":
+                    entry["count"] = value[-1]
+                    entry["sum"] = value[-2]
+                    entry["buckets"] = value[:-2]
+                else:
+                    entry["value"] = value
+                entries.append(entry)
+            out["metrics"][name] = {"type": kind, "help": help_text, "samples": entries}
+        return out
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ""
+    escaped = []
+    for key, value in pairs:
+        value = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        escaped.append(f'{key}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsServer:
+    """Serves a Metrics registry over HTTP on the loopback interface."""
+    def __init__(self, metrics: Metrics, port: int = 9464, host: str = "127.0.0.1"):
+        self.metrics = metrics
+        self.port = port
+        self.host = host
+        self.server = None
+        self.thread = None
+
+    def start(self):
+        if self.server:
+            return
+        # Imported here: http.server pulls in ssl and http.client, not worth it at startup when unused
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path == "/metrics":
+                    body = metrics.prometheus_text().encode("utf-8")
+                    content_type = "text/plain; version=0.0.4; charset=utf-8"
+                elif path == "/metrics.json":
+                    body = json.dumps(metrics.as_dict(), default=str).encode("utf-8")
+                    content_type = "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+            self.server.daemon_threads = True
+            self.thread = threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True)
+            self.thread.start()
+            print(f"Metrics available at http://{self.host}:{self.port}/metrics")
+        except Exception as e:
+            self.server = None
+            print(f"Failed to start metrics server: {e}")
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
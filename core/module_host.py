@@ -0,0 +1,410 @@
+"""
+Out-of-process hosting for device modules.
+
+A module marked as isolated runs in its own worker process. The main process
+talks to it through two single-producer/single-consumer rings in shared memory
+(commands in, replies out), so a module that blocks or burns CPU in
+vibrate/shock can no longer stall OSC ingest or the other devices. Each ring
+has a semaphore the producer releases once per message, so an idle reader
+sleeps in the kernel instead of polling.
+"""
+import inspect
+import json
+import multiprocessing
+import os
+import struct
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional
+
+from core.stats import LatencyStats
+
+RING_SLOTS = 256
+SLOT_SIZE = 4096
+
+HEARTBEAT_INTERVAL = 0.2  # seconds between worker heartbeats
+HEARTBEAT_TIMEOUT = 2.0   # worker is restarted if no heartbeat for this long
+CALL_TIMEOUT = 5.0        # ... or if it has been running one call for longer than its timeout
+SCAN_TIMEOUT = 30.0
+
+
+class ShmRing:
+    """
+    Lock-free SPSC ring buffer on top of multiprocessing.shared_memory.
+
+    Layout: header (head u64, tail u64, stamp u64) followed by `slots` fixed
+    size slots of (length u32, payload). `head` is only written by the consumer,
+    `tail` only by the producer, so neither side ever needs a lock.
+    `stamp` is a free field the owner uses for the heartbeat.
+
+    With a `signal` semaphore (shared by both processes), push() releases it
+    once per message and wait() blocks on it, so there is exactly one count
+    per unread message.
+
+    The header is accessed through a native 'Q' memoryview so every counter
+    update is a single aligned 8 byte store; struct.pack_into writes byte by
+    byte and the other process could observe a torn value.
+    """
+    HEADER = struct.Struct("QQQ")
+    LENGTH = struct.Struct("<I")
+
+    def __init__(self, name: Optional[str] = None, slots: int = RING_SLOTS, slot_size: int = SLOT_SIZE,
+                 signal=None):
+        self.slots = slots
+        self.slot_size = slot_size
+        self.signal = signal
+        size = self.HEADER.size + slots * slot_size
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.HEADER.pack_into(self.shm.buf, 0, 0, 0, 0)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.buf = self.shm.buf
+        self._header = self.buf[:self.HEADER.size]
+        self.index = self._header.cast('Q')
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def stamp(self) -> int:
+        return self.index[2]
+
+    @stamp.setter
+    def stamp(self, value: int):
+        self.index[2] = value
+
+    def push(self, data: bytes) -> bool:
+        """Appends one message. Returns False if the ring is full."""
+        if len(data) > self.slot_size - self.LENGTH.size:
+            raise ValueError(f"Message of {len(data)} bytes does not fit a {self.slot_size} byte slot")
+        index = self.index
+        head = index[0]
+        tail = index[1]
+        if tail - head >= self.slots:
+            return False
+        offset = self.HEADER.size + (tail % self.slots) * self.slot_size
+        self.LENGTH.pack_into(self.buf, offset, len(data))
+        start = offset + self.LENGTH.size
+        self.buf[start:start + len(data)] = data
+        # Publish only after the slot is fully written
+        index[1] = tail + 1
+        if self.signal is not None:
+            self.signal.release()
+        return True
+
+    def pop(self) -> Optional[bytes]:
+        """Removes and returns the oldest message, or None if the ring is empty."""
+        index = self.index
+        head = index[0]
+        if index[1] <= head:
+            return None
+        offset = self.HEADER.size + (head % self.slots) * self.slot_size
+        length = self.LENGTH.unpack_from(self.buf, offset)[0]
+        start = offset + self.LENGTH.size
+        data = bytes(self.buf[start:start + length])
+        index[0] = head + 1
+        return data
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """Blocks until a message arrives (or timeout) and removes it; needs a signal."""
+        if not self.signal.acquire(timeout=timeout):
+            return None
+        return self.pop()
+
+    def close(self):
+        self.index.release()
+        self._header.release()
+        self.index = None
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _encode(value):
+    # Bindings are pydantic models; everything else is expected to be JSON friendly.
+    # Lists are walked so apply_batch([(binding, value), ...]) crosses the process boundary too.
+    if hasattr(value, 'model_dump'):
+        return {"__binding__": value.model_dump()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict) and "__binding__" in value:
+        from schemas.bindings import Binding
+        return Binding(**value["__binding__"])
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    return value
+
+
+def _worker_main(module_name: str, modules_dir: str, filename: str, cmd_name: str, reply_name: str,
+                 cmd_signal, reply_signal):
+    """Entry point of the worker process."""
+    from core.loader import Loader
+
+    commands = ShmRing(cmd_name, signal=cmd_signal)
+    replies = ShmRing(reply_name, signal=reply_signal)
+    parent_pid = os.getppid()
+
+    loader = Loader()
+    loader.modules_dir = modules_dir
+    module = loader.load_module(filename)
+
+    def reply(msg):
+        data = json.dumps(msg, default=str).encode()
+        while not replies.push(data):
+            time.sleep(0.001)
+
+    def heartbeat():
+        beat = 1
+        while replies.index is not None:
+            replies.stamp = beat
+            beat += 1
+            if os.getppid() != parent_pid:
+                os._exit(0)
+            time.sleep(HEARTBEAT_INTERVAL)
+
+    threading.Thread(target=heartbeat, daemon=True).start()
+
+    methods = [n for n in dir(module) if not n.startswith('_') and callable(getattr(module, n, None))] if module else []
+    reply({"seq": 0, "ok": module is not None, "name": getattr(module, 'name', module_name),
+           "methods": methods, "devices": getattr(module, 'devices', None)})
+    if module is None:
+        return
+
+    try:
+        while True:
+            data = commands.wait(HEARTBEAT_INTERVAL)
+            if data is None:
+                continue
+
+            msg = json.loads(data)
+            if msg.get("op") == "exit":
+                break
+
+            result = {"seq": msg["seq"], "ok": True}
+            try:
+                func = getattr(module, msg["method"])
+                value = func(*[_decode(a) for a in msg.get("args", [])], **msg.get("kwargs", {}))
+                if inspect.isgenerator(value):
+                    # A streaming scan() can't stream across the rings; send everything it yields
+                    value = list(value)
+                result["result"] = value
+            except Exception as e:
+                result["ok"] = False
+                result["error"] = f"{type(e).__name__}: {e}"
+            result["devices"] = getattr(module, 'devices', None)
+            reply(result)
+    finally:
+        commands.close()
+        replies.close()
+
+
+class _PendingCall:
+    __slots__ = ("event", "sent", "reply", "method", "timeout")
+
+    def __init__(self, method: str, timeout: float):
+        self.event = threading.Event()
+        self.sent = time.perf_counter()
+        self.reply = None
+        self.method = method
+        self.timeout = timeout
+
+
+class IsolatedModule:
+    """
+    Proxy that stands in for a module running in a worker process.
+
+    It exposes the same attributes the rest of the app uses (name, devices and
+    whatever methods the module implements), forwards every call through the
+    command ring and waits for the reply. A supervisor thread reads replies,
+    watches the worker heartbeat and restarts the worker if it dies or hangs.
+    The heartbeat comes from its own thread in the worker, so it only shows the
+    process is alive; a call that never returns is caught by its timeout.
+
+    Arguments, keyword arguments included, must survive JSON. Callbacks can't,
+    so an isolated module's scan() is never streaming: the proxy doesn't offer
+    on_device/cancel and a generator scan() is collected in the worker and
+    returned as a list.
+    """
+    def __init__(self, module_name: str, modules_dir: str, filename: str):
+        self.module_name = module_name
+        self.modules_dir = modules_dir
+        self.filename = filename
+        self.name = module_name
+        self.devices = []
+        self.latency = LatencyStats()
+        self.restarts = 0
+
+        self._methods = set()
+        self._seq = 0
+        self._pending: Dict[int, _PendingCall] = {}
+        self._send_lock = threading.Lock()
+        self._ctx = multiprocessing.get_context("spawn")
+        self._process = None
+        self._commands = None
+        self._replies = None
+        self._closed = False
+        self._ready = threading.Event()
+
+        self._start_worker()
+        self._supervisor = threading.Thread(target=self._supervise, daemon=True)
+        self._supervisor.start()
+        if not self._ready.wait(CALL_TIMEOUT):
+            print(f"Isolated module '{module_name}' did not report ready in time.")
+
+    def __getattr__(self, item):
+        # Only reached for attributes not set in __init__, i.e. module methods
+        methods = self.__dict__.get('_methods', ())
+        if item in methods:
+            timeout = SCAN_TIMEOUT if item in ("scan", "run") else CALL_TIMEOUT
+            return lambda *args, **kwargs: self._call(item, args, timeout, kwargs)
+        raise AttributeError(item)
+
+    def _start_worker(self):
+        self._commands = ShmRing(signal=self._ctx.Semaphore(0))
+        self._replies = ShmRing(signal=self._ctx.Semaphore(0))
+        self._ready.clear()
+        self._process = self._ctx.Process(
+            target=_worker_main,
+            args=(self.module_name, self.modules_dir, self.filename, self._commands.name, self._replies.name,
+                  self._commands.signal, self._replies.signal),
+            daemon=True,
+            name=f"module-{self.module_name}",
+        )
+        self._process.start()
+        self._last_stamp = 0
+        self._last_beat = time.monotonic()
+        self._last_reply = time.perf_counter()
+
+    def _stop_worker(self):
+        if self._process is not None:
+            if self._process.is_alive():
+                self._commands.push(json.dumps({"op": "exit"}).encode())
+                self._process.join(0.5)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join(0.5)
+        for ring in (self._commands, self._replies):
+            if ring is not None:
+                ring.close()
+        self._commands = None
+        self._replies = None
+
+    def _call(self, method: str, args, timeout: float, kwargs=None):
+        pending = _PendingCall(method, timeout)
+        with self._send_lock:
+            if self._commands is None:
+                raise RuntimeError(f"Isolated module '{self.module_name}' is not running")
+            self._seq += 1
+            seq = self._seq
+            msg = {"seq": seq, "method": method, "args": [_encode(a) for a in args]}
+            if kwargs:
+                msg["kwargs"] = {k: _encode(v) for k, v in kwargs.items()}
+            data = json.dumps(msg).encode()
+            self._pending[seq] = pending
+            deadline = time.monotonic() + timeout
+            while not self._commands.push(data):
+                if time.monotonic() > deadline:
+                    del self._pending[seq]
+                    raise TimeoutError(f"Command ring of '{self.module_name}' is full")
+                time.sleep(0.0005)
+
+        if not pending.event.wait(timeout):
+            # Stays in _pending: the supervisor sees the worker is stuck on it and restarts it
+            raise TimeoutError(f"'{self.module_name}.{method}' timed out after {timeout}s")
+
+        msg = pending.reply
+        if msg is None:
+            raise RuntimeError(f"Worker for '{self.module_name}' restarted during '{method}'")
+        if not msg.get("ok"):
+            raise RuntimeError(msg.get("error", "unknown error"))
+        return msg.get("result")
+
+    def _handle_reply(self, msg: Dict[str, Any]):
+        if msg.get("devices") is not None:
+            self.devices = msg["devices"]
+        seq = msg.get("seq")
+        if seq == 0:
+            self.name = msg.get("name") or self.module_name
+            self._methods = set(msg.get("methods") or [])
+            self._ready.set()
+            return
+        pending = self._pending.pop(seq, None)
+        self._last_reply = time.perf_counter()
+        if pending:
+            self.latency.add(self._last_reply - pending.sent)
+            pending.reply = msg
+            pending.event.set()
+
+    def _supervise(self):
+        last_check = time.monotonic()
+        while not self._closed:
+            replies = self._replies
+            data = replies.wait(HEARTBEAT_INTERVAL) if replies is not None else None
+            if data is not None:
+                self._handle_reply(json.loads(data))
+            now = time.monotonic()
+            if now - last_check < HEARTBEAT_INTERVAL:
+                continue
+            last_check = now
+
+            # Heartbeat check
+            stamp = replies.stamp if replies is not None else 0
+            if stamp != self._last_stamp:
+                self._last_stamp = stamp
+                self._last_beat = now
+            alive = self._process is not None and self._process.is_alive()
+            if not self._closed and (not alive or now - self._last_beat > HEARTBEAT_TIMEOUT):
+                self._restart()
+                continue
+            hung = self._hung_call()
+            if hung is not None and not self._closed:
+                self._restart(f"is stuck in '{hung}'")
+
+    def _hung_call(self) -> Optional[str]:
+        """Method the worker has been running for longer than its timeout, if any."""
+        in_flight = list(self._pending.items()) # callers add entries concurrently
+        if not in_flight:
+            return None
+        # The worker runs calls in order, so the oldest one in flight is the one it is on,
+        # and it started no earlier than the previous reply
+        _, call = min(in_flight, key=lambda item: item[0])
+        started = max(call.sent, self._last_reply)
+        if time.perf_counter() - started > call.timeout:
+            return call.method
+        return None
+
+    def _restart(self, reason: str = "stopped responding"):
+        print(f"Worker for module '{self.module_name}' {reason}, restarting.")
+        with self._send_lock:
+            self._stop_worker()
+            # Fail everything that was in flight
+            for pending in self._pending.values():
+                pending.event.set()
+            self._pending.clear()
+            self.restarts += 1
+            self._start_worker()
+
+    def latency_summary(self) -> Dict[str, float]:
+        return self.latency.summary()
+
+    def close(self):
+        self._closed = True
+        self._supervisor.join(1.0)
+        with self._send_lock:
+            self._stop_worker()
+        for pending in self._pending.values():
+            pending.event.set()
+        self._pending.clear()
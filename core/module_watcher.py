@@ -0,0 +1,120 @@
+"""
+Hot reload of device modules.
+
+A background thread keeps an index of every module's source files (path,
+mtime, size). When a module's entry changes and then stays unchanged for one
+more poll (so half-written saves are skipped), only that module is reloaded
+through Loader.reload_module; every other module keeps running untouched.
+"""
+import os
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+
+class ModuleWatcher:
+    def __init__(self, loader, on_change: Optional[Callable] = None, interval: float = 1.0):
+        """
+        on_change(module_name, instance) is called from the watcher thread after a module was
+        reloaded, added or (with instance None) removed.
+        """
+        self.loader = loader
+        self.on_change = on_change
+        self.interval = interval
+        self.index = self._snapshot()
+        self._pending: Dict[str, Tuple] = {}  # {filename: signature seen on the previous poll}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="module-watcher", daemon=True)
+        self._thread.start()
+
+    def _signature(self, path: str) -> Tuple:
+        if not os.path.isdir(path):
+            st = os.stat(path)
+            return ((os.path.basename(path), st.st_mtime_ns, st.st_size),)
+        files = []
+        for root, dirs, names in os.walk(path):
+            dirs[:] = [d for d in dirs if d != "__pycache__"]
+            for name in names:
+                if name.endswith(".py"):
+                    full = os.path.join(root, name)
+                    try:
+                        st = os.stat(full)
+                    except OSError:
+                        continue
+                    files.append((os.path.relpath(full, path), st.st_mtime_ns, st.st_size))
+        return tuple(sorted(files))
+
+    def _snapshot(self) -> Dict[str, Tuple]:
+        modules_dir = self.loader.modules_dir
+        index = {}
+        try:
+            entries = os.listdir(modules_dir)
+        except OSError:
+            return index
+        for filename in entries:
+            path = os.path.join(modules_dir, filename)
+            if os.path.isdir(path):
+                if not os.path.exists(os.path.join(path, "__init__.py")):
+                    continue
+            elif not filename.endswith(".py") or filename.startswith("__"):
+                continue
+            try:
+                index[filename] = self._signature(path)
+            except OSError:
+                continue
+        return index
+
+    def poll(self):
+        """Compares the index with the files on disk and reloads what changed. Returns the reloaded names."""
+        current = self._snapshot()
+        changed = []
+
+        for filename, signature in current.items():
+            if self.index.get(filename) == signature:
+                self._pending.pop(filename, None)
+                continue
+            if self._pending.get(filename) != signature:
+                # Wait one more poll in case the file is still being written
+                self._pending[filename] = signature
+                continue
+            del self._pending[filename]
+            self.index[filename] = signature
+            module_name, _ = self.loader._find_spec(filename)
+            instance = self.loader.reload_module(module_name, filename)
+            if instance is None:
+                continue
+            if not self.loader.handed_over.get(module_name) and hasattr(instance, 'scan'):
+                # Nothing was handed over, find the devices again like at startup
+                try:
+                    instance.scan()
+                except Exception as e:
+                    print(f"Error during scan of reloaded module '{module_name}': {e}")
+            changed.append(module_name)
+            self._notify(module_name, instance)
+
+        for filename in [f for f in self.index if f not in current]:
+            del self.index[filename]
+            self._pending.pop(filename, None)
+            module_name, _ = self.loader._find_spec(filename)
+            if module_name in self.loader.loaded_modules:
+                self.loader.unload_module(module_name)
+                print(f"Module {module_name} was removed")
+                changed.append(module_name)
+                self._notify(module_name, None)
+        return changed
+
+    def _notify(self, module_name, instance):
+        if self.on_change:
+            try:
+                self.on_change(module_name, instance)
+            except Exception as e:
+                print(f"Error in module change handler: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Error watching modules: {e}")
+
+    def stop(self):
+        self._stop.set()
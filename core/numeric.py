@@ -0,0 +1,32 @@
+"""
+Optional NumPy, imported on first use.
+
+NumPy takes tens of milliseconds to import and only array contacts, spatial
+layouts and large numbers of pattern instances need it, so it is not imported
+at startup. numpy() returns the module, or None if it isn't installed.
+"""
+_numpy = None
+_loaded = False
+
+
+def numpy():
+    global _numpy, _loaded
+    if not _loaded:
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+        _numpy = np
+        _loaded = True
+    return _numpy
+
+
+def use_numpy(enabled: bool):
+    """Switches NumPy off (or back on) for code paths that check numpy(); used by the benchmarks."""
+    global _numpy, _loaded
+    _loaded = False
+    _numpy = None
+    if enabled:
+        numpy()
+    else:
+        _loaded = True
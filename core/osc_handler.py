@@ -1,27 +1,590 @@
-from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Callable
 import math
+import threading
 import time
 from schemas.bindings import Binding
 from schemas.contacts import Contact
+from core.dispatch import CommandScheduler, binding_key, PRIORITY_HIGH, PRIORITY_NORMAL
+from core.timer_wheel import TimerWheel
+from core.patterns import PatternEngine, DEFAULT_RATE_HZ
+from schemas.patterns import Pattern
+from schemas.bindings import AggregateInput
+from core.aggregation import make_aggregator
+from core.filters import FilterBank
+from core.triggers import TriggerRule, TriggerState
+from core.metrics import Metrics
+from core.config_watcher import snapshot_by_key, diff_by_key
+from core.address_trie import AddressTrie, fill_captures
+from core.arrays import ArrayState, map_vector, element_address, array_path, DEFAULT_FRAME_RATE_HZ
+from core.spatial import build_groups
+from schemas.spatial import MotorLayout
+
+RAMP_STEP = 0.05 # seconds between ramp-down updates
+BATCH_LANE = "*" # device_id part of the single lane used by modules with apply_batch
+MAX_PATTERN_INSTANCES = 1024 # addresses matched by pattern contacts kept at once, least recently used go first
 
 class OSCHandler:
-    def __init__(self, loaded_modules: Dict[str, Any], contacts: List[Contact], bindings: List[Binding]):
+    def __init__(self, loaded_modules: Dict[str, Any], contacts: List[Contact], bindings: List[Binding],
+                 patterns: Optional[List[Pattern]] = None, pattern_rate_hz: float = DEFAULT_RATE_HZ,
+                 clock: Callable[[], float] = time.time, frame_rate_hz: float = DEFAULT_FRAME_RATE_HZ,
+                 layouts: Optional[List[MotorLayout]] = None):
+        # Time source for cooldowns, smoothing and triggers; replays pass a core.recording.ReplayClock
+        self.clock = clock
         self.loaded_modules = loaded_modules
         self.contacts = contacts
         self.bindings = bindings
         self.contact_states = {} # {contact_id: {'last_trigger': float, 'last_val': Any}}
+        self.filters = FilterBank(capacity=max(64, len(contacts)))
+        # Field values at the last update_config, to find what changed (the UI edits objects in place)
+        self._contact_snapshot = snapshot_by_key(contacts, lambda c: c.id)
+        self._binding_snapshot = snapshot_by_key(bindings, binding_key)
+
+        # Array contacts: element values land in one vector per contact, sent as frames once per tick
+        self.arrays = {} # {contact_id: ArrayState}
+        self.array_elements = {} # {address: (contact, index)}
+        self.dirty_arrays = set()
+        self.frame_interval = 1.0 / frame_rate_hz if frame_rate_hz > 0 else 1.0 / DEFAULT_FRAME_RATE_HZ
+        self._frame_pending = False
+        self._frame_lock = threading.Lock()
+        self._element_bindings = {} # {(binding_key, index): binding with {index} filled in}
+
+        # Spatial mapping: bindings into a motor layout, sent with the array frames
+        self.layouts = list(layouts or [])
+        self.spatial_groups = {} # {(layout, module, device_id, reaction): SpatialGroup}
+        self.spatial_index = {} # {contact_id: [(group, column, binding), ...]}
+        self.dirty_groups = set()
+
+        # Address lookup: exact and pattern osc_paths in a trie, ids for the /.../<id> shorthand
+        self.address_trie = AddressTrie()
+        self.contacts_by_id = {}
+        self._repeat_addresses = {} # {address: bool}, cache for needs_repeats
+        self._build_address_index()
+        # Pattern contacts get one concrete contact per matching address, created on first use
+        self.pattern_instances = OrderedDict() # {address: (pattern contact id, instance Contact)}, LRU order
+        self.instance_ids = {} # {pattern contact id: {instance id: [binding_key, ...]}}
+
+        # Dispatch table: plain (non-aggregate) bindings of each contact
+        self.contact_bindings = {} # {contact_id: [binding, ...]}
+        # Bindings that merge several contacts
+        self.aggregates = {} # {binding_key: (binding, aggregator)}
+        self.aggregate_index = {} # {contact_id: [binding_key, ...]}
+        # Contacts with a binding that wants every resent value (Binding.pass_repeats)
+        self._repeat_contacts = set()
+        # Compiled trigger rules of pulse bindings
+        self.triggers = {} # {binding_key: (rule, state)}
+        self.pattern_engine = None
+        self._compile_bindings()
+        self._compile_spatial()
         
-        # Initialize thread pool for async execution
-        import concurrent.futures
-        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=10)
+        # One serial lane per (module, device_id) on a shared worker pool
+        self.scheduler = CommandScheduler(max_workers=10)
+
+        # Ends pulses after Binding.duration
+        self.timers = TimerWheel()
+        self.pulses = {} # {binding_key: token of the pending pulse end}
+        self._pulse_lock = threading.Lock()
+
+        # Modules implementing apply_batch get one lane and one pending batch each.
+        # Outputs of one map_message call are collected per thread and merged into it at the end.
+        self.pending_batches = {} # {module_name: {entry_key: (binding, value)}}
+        self._batch_queued = set() # modules with a regular run of their batch queued
+        self.merged_outputs = 0 # outputs replaced by a newer value before their batch ran
+        self._batch_lock = threading.Lock()
+        self._cycle = threading.local()
+
+        # Last value handed to each output, to skip commands that wouldn't change anything
+        self.last_sent = {} # {(module, device_id, reaction_type): float}
+        self.suppressed_calls = 0
+        # Intensity of the last command actually handed to each device, for the state export
+        self.device_levels = {} # {(module, device_id): float}
+
+        # Renders bindings that play a pattern instead of a single value
+        self.pattern_engine = PatternEngine(self._submit_pattern_value, patterns, rate_hz=pattern_rate_hz)
+
+        # Counters for the metrics endpoint (core/metrics.py)
+        self.metrics = Metrics()
+        self.m_messages = self.metrics.counter("osc_messages_total", "OSC messages received", ("address_class",))
+        self.m_unmapped = self.metrics.counter("osc_unmapped_total", "OSC messages matching no contact")
+        self.m_commands = self.metrics.counter("device_commands_total", "Commands sent to modules",
+                                               ("module", "device", "reaction"))
+        self.m_calls = self.metrics.counter("module_calls_total", "Calls into modules (a batch counts once)", ("module",))
+        self.m_errors = self.metrics.counter("module_errors_total", "Module calls that raised", ("module",))
+        self.m_latency = self.metrics.histogram("module_call_seconds", "Duration of module calls", ("module",))
+        self.metrics.add_collector(self._collect_metrics)
 
     def shutdown(self):
-        if self.executor:
-            self.executor.shutdown(wait=False)
+        if self.scheduler:
+            self.scheduler.shutdown()
+        if self.timers:
+            self.timers.shutdown()
+        if self.pattern_engine:
+            self.pattern_engine.shutdown()
+
+    def _dispatch(self, binding: Binding, value: float, key=None, priority: int = PRIORITY_NORMAL,
+                  stop: bool = False):
+        """
+        Queues one output. key makes newer outputs with the same key replace queued ones,
+        stop cancels whatever is still queued for the device and jumps ahead.
+        Returns False if the device lane was full and the output was dropped.
+        """
+        module = self.loaded_modules.get(binding.module_name)
+        if callable(getattr(module, "apply_batch", None)):
+            self._queue_batch(binding, value, key if key is not None else object(), stop)
+            return True
+        lane_key = (binding.module_name, binding.device_id)
+        if stop:
+            self.scheduler.preempt(lane_key, self._send, binding, value)
+            return True
+        return self.scheduler.submit(lane_key, self._send, binding, value, key=key, priority=priority)
+
+    def _queue_batch(self, binding: Binding, value: float, key, stop: bool):
+        entries = getattr(self._cycle, "entries", None)
+        if entries is None:
+            self._flush_batch(binding.module_name, {key: (binding, value)}, {binding.device_id} if stop else None)
+            return
+        module_entries = entries.setdefault(binding.module_name, {})
+        # Re-insert so the batch keeps the order outputs were produced in
+        module_entries.pop(key, None)
+        module_entries[key] = (binding, value)
+        if stop:
+            self._cycle.stops.setdefault(binding.module_name, set()).add(binding.device_id)
+
+    def _begin_cycle(self):
+        self._cycle.entries = {}
+        self._cycle.stops = {} # {module_name: {device_id, ...}}
+
+    def _end_cycle(self):
+        entries = self._cycle.entries
+        stops = self._cycle.stops
+        self._cycle.entries = None
+        for module_name, module_entries in entries.items():
+            self._flush_batch(module_name, module_entries, stops.get(module_name))
+
+    def _flush_batch(self, module_name: str, entries: Dict[Any, Any], stopped=None):
+        """
+        Merges entries into the module's pending batch and makes sure a run of it is queued.
+        stopped: devices that got a stop. Like a preempted device lane, their older pending entries
+        are dropped and their entries go out in a run that jumps ahead; the other devices' entries
+        stay pending for the regular run.
+        """
+        lane_key = (module_name, BATCH_LANE)
+        # The scheduler is called under the lock so a preempt can't cancel a regular run
+        # another thread has just queued
+        with self._batch_lock:
+            pending = self.pending_batches.setdefault(module_name, {})
+            if stopped:
+                for key in [k for k, (b, _) in pending.items() if b.device_id in stopped and k not in entries]:
+                    del pending[key]
+            for key, entry in entries.items():
+                if pending.pop(key, None) is not None:
+                    self.merged_outputs += 1
+                pending[key] = entry
+
+            if stopped:
+                # preempt() cancels the queued regular run, queue it again behind the stop if needed
+                self.scheduler.preempt(lane_key, self._run_batch, module_name, frozenset(stopped))
+                if any(b.device_id not in stopped for b, _ in pending.values()):
+                    self._batch_queued.add(module_name)
+                    self.scheduler.submit(lane_key, self._run_batch, module_name, priority=PRIORITY_NORMAL)
+                else:
+                    self._batch_queued.discard(module_name)
+            elif module_name not in self._batch_queued:
+                self._batch_queued.add(module_name)
+                self.scheduler.submit(lane_key, self._run_batch, module_name, priority=PRIORITY_NORMAL)
+
+    def _run_batch(self, module_name: str, devices=None):
+        """Sends the module's pending batch; with devices, only the entries of those devices."""
+        with self._batch_lock:
+            if devices is None:
+                self._batch_queued.discard(module_name)
+                entries = self.pending_batches.pop(module_name, None)
+            else:
+                pending = self.pending_batches.get(module_name, {})
+                entries = {k: e for k, e in pending.items() if e[0].device_id in devices}
+                for key in entries:
+                    del pending[key]
+        if not entries:
+            return
+        commands = list(entries.values())
+        module = self.loaded_modules.get(module_name)
+        apply_batch = getattr(module, "apply_batch", None)
+        if not callable(apply_batch):
+            # Module was swapped for one without batching
+            for binding, value in commands:
+                self._send(binding, value)
+            return
+
+        labels = (module_name,)
+        for binding, value in commands:
+            self.m_commands.inc((module_name, binding.device_id, binding.reaction_type))
+            self.device_levels[(module_name, binding.device_id)] = value
+        self.m_calls.inc(labels)
+        started = time.perf_counter()
+        try:
+            apply_batch(commands)
+        except Exception as e:
+            self.m_errors.inc(labels)
+            print(f"Error executing 'apply_batch' in module '{module_name}': {e}")
+        self.m_latency.observe(time.perf_counter() - started, labels)
+
+    def _submit(self, binding: Binding, raw_value: Any):
+        if binding.pattern:
+            self._start_pattern(binding, raw_value)
+            return
+        if binding.is_continuous:
+            # Only the latest continuous value matters, older queued ones are superseded
+            self._output(binding, self._calculate_payload(binding, raw_value),
+                         key=binding_key(binding), priority=PRIORITY_NORMAL)
+        else:
+            self._output(binding, self._calculate_payload(binding, raw_value), force=True, priority=PRIORITY_HIGH)
+            if binding.auto_stop and binding.duration > 0:
+                self._schedule_pulse_end(binding, raw_value)
+
+    def _start_pattern(self, binding: Binding, raw_value: Any):
+        # The computed payload becomes the pattern's amplitude
+        key = binding_key(binding)
+        amplitude = self._calculate_payload(binding, raw_value)
+        if binding.is_continuous:
+            # Loops while the contact is active, following its value
+            if not self.pattern_engine.set_amplitude(key, amplitude):
+                self.pattern_engine.start(key, binding, amplitude, loop=True)
+        elif not self.pattern_engine.start(key, binding, amplitude):
+            print(f"Unknown pattern '{binding.pattern}', sending a single value instead.")
+            self._dispatch(binding, amplitude, priority=PRIORITY_HIGH)
+
+    @staticmethod
+    def _output_span(binding: Binding) -> float:
+        """Width of the range the binding's outputs can cover."""
+        if binding.use_mapping:
+            return abs(binding.output_max - binding.output_min)
+        return abs(binding.intensity)
+
+    def _filter_output(self, binding: Binding, value: float, force: bool = False) -> Optional[float]:
+        """
+        Applies the binding's deadband and returns the value to send,
+        or None if it would not change what the device was last sent.
+        """
+        if abs(value) < binding.deadband:
+            value = 0.0
+        last = self.last_sent.get((binding.module_name, binding.device_id, binding.reaction_type))
+        if not force and last is not None:
+            # Returning to zero always goes through, small changes elsewhere are skipped.
+            # min_change is a fraction of the output range, so it means the same for 0..1 and 0..100
+            if value == last or (value != 0 and abs(value - last) < binding.min_change * self._output_span(binding)):
+                self.suppressed_calls += 1
+                return None
+        return value
+
+    def _output(self, binding: Binding, value: float, force: bool = False, **dispatch):
+        """Filters and dispatches one output. last_sent only moves once the output was accepted."""
+        value = self._filter_output(binding, value, force)
+        if value is None:
+            return
+        if self._dispatch(binding, value, **dispatch):
+            self.last_sent[(binding.module_name, binding.device_id, binding.reaction_type)] = value
+
+    def _submit_pattern_value(self, binding: Binding, value: float):
+        self._output(binding, value, key=binding_key(binding), priority=PRIORITY_NORMAL)
+
+    def update_patterns(self, patterns: List[Pattern]):
+        self.pattern_engine.set_patterns(patterns)
+
+    def _schedule_pulse_end(self, binding: Binding, raw_value: Any):
+        # A retrigger replaces the pending end of the previous pulse
+        key = binding_key(binding)
+        token = object()
+        peak = self._calculate_payload(binding, raw_value)
+        with self._pulse_lock:
+            old = self.pulses.get(key)
+            if old is not None:
+                self.timers.cancel(old[1])
+            handle = self.timers.schedule(binding.duration, self._pulse_step, binding, token, peak, 1)
+            self.pulses[key] = (token, handle)
+
+    def _pulse_step(self, binding: Binding, token: object, peak: float, step: int):
+        """Timer callback: sends the next ramp-down value or the final stop."""
+        key = binding_key(binding)
+        steps = max(1, math.ceil(binding.ramp_down / RAMP_STEP)) if binding.ramp_down > 0 else 1
+        with self._pulse_lock:
+            current = self.pulses.get(key)
+            if current is None or current[0] is not token:
+                return
+            if step < steps:
+                value = peak * (1.0 - step / steps)
+                handle = self.timers.schedule(binding.ramp_down / steps, self._pulse_step, binding, token, peak, step + 1)
+                self.pulses[key] = (token, handle)
+            else:
+                value = 0.0
+                del self.pulses[key]
+
+        self._output(binding, value, force=True, key=key, priority=PRIORITY_HIGH)
+
+    def _stop_pattern(self, key):
+        """Stops the pattern playing for a binding and sends its device a preempting 0."""
+        binding = self.pattern_engine.stop(key)
+        if binding is not None:
+            self._silence(binding)
+
+    def _silence(self, binding: Binding):
+        # The device would otherwise stay at whatever it was last sent
+        self._output(binding, 0.0, force=True, key=binding_key(binding), stop=True)
+
+    def _preempt_stop(self, binding: Binding, raw_value: Any):
+        if binding.pattern:
+            self.pattern_engine.stop(binding_key(binding))
+        # Stops jump the queue: anything still pending for the device is cancelled
+        self._output(binding, self._calculate_payload(binding, raw_value), force=True,
+                     key=binding_key(binding), stop=True)
+
+    def stop_latency(self) -> Dict[str, float]:
+        """Time between a stop signal arriving and it reaching the module."""
+        return self.scheduler.stop_latency_summary()
+
+    def lane_metrics(self) -> Dict[Any, Dict[str, Any]]:
+        """Queue depth, wait time and drop counters per (module, device_id) lane."""
+        return self.scheduler.lane_metrics()
+
+    def _collect_metrics(self):
+        lanes = self.lane_metrics()
+        lane_labels = ("module", "device")
+        def per_lane(field):
+            return {(str(key[0]), str(key[1])): m[field] for key, m in lanes.items()}
+        return [
+            ("queue_depth", "Commands waiting per device lane", "gauge", lane_labels, per_lane("depth")),
+            ("commands_superseded_total", "Queued commands replaced by a newer value", "counter", lane_labels,
+             per_lane("superseded")),
+            ("commands_dropped_total", "Commands dropped because a lane was full", "counter", lane_labels,
+             per_lane("dropped")),
+            ("commands_cancelled_total", "Queued commands cancelled by a stop", "counter", lane_labels,
+             per_lane("cancelled")),
+            ("commands_merged_total", "Outputs replaced in a pending batch by a newer value", "counter", (),
+             {(): self.merged_outputs}),
+            ("commands_suppressed_total", "Outputs skipped by deadband / min change", "counter", (),
+             {(): self.suppressed_calls}),
+            ("active_patterns", "Pattern instances being rendered", "gauge", (),
+             {(): len(self.pattern_engine.instances)}),
+        ]
+
+    def update_config(self, contacts: List[Contact], bindings: List[Binding]) -> Dict[str, Any]:
+        """
+        Applies new contact and binding lists. Only entries that were added, removed or changed
+        are recompiled; cooldowns, smoothing and trigger state of everything else carry over.
+        Returns the (added, removed, changed) keys for "contacts" and "bindings".
+        """
+        contact_snapshot = snapshot_by_key(contacts, lambda c: c.id)
+        contact_diff = diff_by_key(self._contact_snapshot, contact_snapshot)
+        added, removed, changed = contact_diff
+        for contact_id in removed | changed:
+            slot = self.filters.slots.get(contact_id)
+            old = self._contact_snapshot[contact_id][-1]
+            new = contact_snapshot[contact_id][-1] if contact_id in contact_snapshot else None
+            # Restart smoothing if the contact is gone or its filter settings changed
+            if slot is not None and (new is None or self._filter_settings(old) != self._filter_settings(new)):
+                self.filters.reset(slot)
+            if new is None:
+                self.contact_states.pop(contact_id, None)
+        self._contact_snapshot = contact_snapshot
+
+        binding_snapshot = snapshot_by_key(bindings, binding_key)
+        binding_diff = diff_by_key(self._binding_snapshot, binding_snapshot)
+        self._binding_snapshot = binding_snapshot
 
-    def update_config(self, contacts: List[Contact], bindings: List[Binding]):
         self.contacts = contacts
         self.bindings = bindings
+        if any(contact_diff):
+            self._build_address_index()
+        added, removed, changed = binding_diff
+        if added or removed or changed:
+            self._element_bindings = {}
+        # Pattern instances copy their contact and bindings, so rebuild them on next use
+        self._drop_instances(contact_diff[1] | contact_diff[2] | {key[0] for key in added | removed | changed})
+        if added or removed or changed:
+            self._compile_bindings(added | removed | changed)
+        if any(contact_diff) or any(binding_diff):
+            self._compile_spatial()
+        return {"contacts": contact_diff, "bindings": binding_diff}
+
+    def _build_address_index(self):
+        trie = AddressTrie()
+        by_id = {}
+        arrays = {}
+        elements = {}
+        for contact in self.contacts:
+            if contact.array_size > 0:
+                path = array_path(contact)
+                if path is None:
+                    print(f"Skipping array contact '{contact.name}': its OSC path needs an {{index}} placeholder")
+                    continue
+                state = self.arrays.get(contact.id)
+                arrays[contact.id] = state if state is not None and state.size == contact.array_size \
+                    else ArrayState(contact.array_size)
+                for index in range(contact.array_size):
+                    elements.setdefault(element_address(path, index), (contact, index))
+                continue
+            by_id.setdefault(contact.id, contact)
+            if contact.osc_path:
+                try:
+                    trie.add(contact.osc_path, contact)
+                except ValueError as e:
+                    print(f"Skipping OSC path of contact '{contact.name}': {e}")
+        self.address_trie = trie
+        self.contacts_by_id = by_id
+        self.arrays = arrays
+        self.array_elements = elements
+        self._slash_ids = [c for c in self.contacts if "/" in c.id and c.array_size <= 0]
+        self._repeat_addresses = {}
+
+    def _instantiate(self, contact: Contact, captures: Dict[str, str], address: str) -> Contact:
+        """
+        Concrete contact for one address matched by a pattern contact. Its bindings are copies of
+        the pattern contact's with {name} placeholders in device_id / device_name filled from the
+        captures, so cooldowns, smoothing and triggers are kept per address.
+        A pattern contact without bindings of its own gets no instances.
+        """
+        if not self.contact_bindings.get(contact.id):
+            return contact
+        instance_id = f"{contact.id}[{','.join(captures.values())}]"
+        instance = contact.model_copy(update={"id": instance_id, "osc_path": address})
+        bindings, keys = [], []
+        for template in self.contact_bindings.get(contact.id, ()):
+            binding = template.model_copy(update={
+                "contact_id": instance_id,
+                "device_id": fill_captures(template.device_id, captures),
+                "device_name": fill_captures(template.device_name, captures),
+            })
+            key = binding_key(binding)
+            if not binding.is_continuous:
+                self.triggers[key] = (TriggerRule(binding), TriggerState())
+            bindings.append(binding)
+            keys.append(key)
+        self.contact_bindings[instance_id] = bindings
+        self.instance_ids.setdefault(contact.id, {})[instance_id] = keys
+        self.pattern_instances[address] = (contact.id, instance)
+        while len(self.pattern_instances) > MAX_PATTERN_INSTANCES:
+            _, (contact_id, evicted) = self.pattern_instances.popitem(last=False)
+            keys = self.instance_ids.get(contact_id, {}).pop(evicted.id, None)
+            if keys is not None:
+                self._release_instance(evicted.id, keys)
+        return instance
+
+    def _drop_instances(self, contact_ids):
+        dropped = False
+        for contact_id in contact_ids:
+            for instance_id, keys in self.instance_ids.pop(contact_id, {}).items():
+                dropped = True
+                self._release_instance(instance_id, keys)
+        if dropped:
+            self.pattern_instances = OrderedDict((address, entry) for address, entry in self.pattern_instances.items()
+                                                 if entry[0] not in contact_ids)
+
+    def _release_instance(self, instance_id: str, keys):
+        bindings = self.contact_bindings.pop(instance_id, None) or ()
+        self.contact_states.pop(instance_id, None)
+        self.filters.release(instance_id)
+        for key in keys:
+            self.triggers.pop(key, None)
+        # Devices the instance is still driving get a preempting 0
+        for binding in bindings:
+            playing = self.pattern_engine.stop(binding_key(binding)) is not None
+            if playing or self.last_sent.get((binding.module_name, binding.device_id, binding.reaction_type)):
+                self._silence(binding)
+
+    @staticmethod
+    def _filter_settings(contact: Dict[str, Any]):
+        return tuple(contact.get(name) for name in
+                     ("filter_type", "filter_alpha", "filter_min_cutoff", "filter_beta", "filter_d_cutoff"))
+
+    def _compile_bindings(self, keys=None):
+        """
+        Compiles trigger rules, aggregators and the per-contact dispatch table for the given
+        binding keys (all bindings if None). A pulse binding whose trigger settings did not
+        change keeps its trigger state.
+        """
+        by_key = {}
+        for binding in self.bindings:
+            by_key[binding_key(binding)] = binding
+        if keys is None:
+            keys = set(by_key)
+
+        aggregates_changed = False
+        for key in keys:
+            binding = by_key.get(key)
+            if self.pattern_engine is not None:
+                # A removed or edited binding must not keep playing its old pattern
+                self._stop_pattern(key)
+
+            if binding is None or binding.is_continuous:
+                self.triggers.pop(key, None)
+            else:
+                rule = TriggerRule(binding)
+                existing = self.triggers.get(key)
+                keep = existing is not None and existing[0].settings() == rule.settings()
+                self.triggers[key] = (rule, existing[1] if keep else TriggerState())
+
+            if binding is None or not binding.aggregate_mode:
+                if self.aggregates.pop(key, None) is not None:
+                    aggregates_changed = True
+            else:
+                # Explicit inputs first so their weight/priority win over the defaults of the primary contact
+                inputs = list(binding.aggregate_inputs) + [AggregateInput(contact_id=binding.contact_id)]
+                self.aggregates[key] = (binding, make_aggregator(binding.aggregate_mode, inputs, limit=binding.input_max))
+                aggregates_changed = True
+
+        # Dispatch table entries of the contacts these bindings belong to (key[0] is the contact id)
+        contact_ids = {key[0] for key in keys}
+        for contact_id in contact_ids:
+            self.contact_bindings.pop(contact_id, None)
+        for binding in self.bindings:
+            if binding.contact_id in contact_ids and not binding.aggregate_mode and not binding.layout:
+                self.contact_bindings.setdefault(binding.contact_id, []).append(binding)
+
+        repeat_contacts = set()
+        for binding in self.bindings:
+            if binding.pass_repeats:
+                repeat_contacts.add(binding.contact_id)
+                repeat_contacts.update(i.contact_id for i in binding.aggregate_inputs)
+        if repeat_contacts != self._repeat_contacts:
+            self._repeat_contacts = repeat_contacts
+            self._repeat_addresses = {}
+
+        if aggregates_changed:
+            index = {}
+            for key, (binding, aggregator) in self.aggregates.items():
+                for contact_id in aggregator.slots:
+                    index.setdefault(contact_id, []).append(key)
+            self.aggregate_index = index
+
+    def update_layouts(self, layouts: List[MotorLayout]):
+        self.layouts = list(layouts)
+        self._compile_spatial()
+
+    def _compile_spatial(self):
+        """Rebuilds the spatial groups and their weights; current contact values carry over."""
+        groups, index = build_groups(self.contacts, self.bindings, self.layouts)
+        previous = self.spatial_groups
+        carried = set()
+        for key, group in groups.items():
+            old = previous.get(key)
+            if old is None:
+                continue
+            for contact_id, column in group.columns.items():
+                old_column = old.columns.get(contact_id)
+                if old_column is not None and old.values[old_column]:
+                    group.values[column] = old.values[old_column]
+                    carried.add(key)
+            group.last_frames = old.last_frames
+        with self._frame_lock:
+            self.spatial_groups = groups
+            self.spatial_index = index
+            self.dirty_groups = carried
+        if carried:
+            # Same values, new weights
+            self._schedule_frame()
+        # Motors of removed groups would otherwise keep their last intensity
+        for key, old in previous.items():
+            if key not in groups and any(old.last_frames.get(binding_key(old.binding), ())):
+                self._send_vector(old.binding, (0.0,) * len(old.layout.motors), old.last_frames)
 
     def update_modules(self, loaded_modules: Dict[str, Any]):
         self.loaded_modules = loaded_modules
@@ -32,35 +595,53 @@ class OSCHandler:
         address: The OSC address (e.g. /avatar/parameters/MyContact)
         args: List of arguments (values)
         """
+        # Everything this message produces for a batching module goes out as one apply_batch call
+        self._begin_cycle()
+        try:
+            self._map_message(address, args)
+        finally:
+            self._end_cycle()
+
+    def _map_message(self, address: str, args: List[Any]):
         if not args:
             return
         print(f"Received OSC message: {address} with args {args}")
         # Assuming single value for most VRC parameters
         raw_value = args[0]
-        
+        self.m_messages.inc((self._address_class(address),))
+
+        element = self.array_elements.get(address)
+        if element is not None:
+            self._update_array(element[0], element[1], raw_value)
+            return
+
         matched_contact = self._find_contact(address)
         if not matched_contact:
+            self.m_unmapped.inc()
             # Optional: Debug print for unmapped addresses
             # print(f"Unmapped OSC address: {address}")
             return
 
+        current_time = self.clock()
+
+        # Smooth jittery float inputs before anything else looks at them
+        if isinstance(raw_value, float) and matched_contact.filter_type != "none":
+            raw_value = self.filters.apply(matched_contact, raw_value, current_time)
+
         # Handle Cooldown
-        current_time = time.time()
         c_state = self.contact_states.get(matched_contact.id, {'last_trigger': 0, 'last_val': None})
+        is_stop_signal = (isinstance(raw_value, bool) and not raw_value) or (isinstance(raw_value, (int, float)) and raw_value == 0)
         
         # Debounce / Cooldown Logic
         if matched_contact.cooldown > 0:
             if current_time - c_state['last_trigger'] < matched_contact.cooldown:
                 # Still in cooldown
-                # Exception: unless it's a "stop" signal (0 or False) we might want to let it through?
-                # For simplicity, strict cooldown on start. 
-                # But we need to allow stopping if continuous.
-                is_stop_signal = (isinstance(raw_value, bool) and not raw_value) or (isinstance(raw_value, (int, float)) and raw_value == 0)
+                # Stop signals (0 or False) always pass so continuous outputs can end
                 if not is_stop_signal:
                     return
 
         # Find bindings associated with this contact
-        active_bindings = [b for b in self.bindings if b.contact_id == matched_contact.id]
+        active_bindings = self.contact_bindings.get(matched_contact.id, ())
         
         should_update_trigger_time = False
 
@@ -68,24 +649,45 @@ class OSCHandler:
             # Logic for Continuous vs Pulse
             if binding.is_continuous:
                  # Always trigger updates, module handles smoothing/throttling
-                 self.executor.submit(self._trigger_binding, binding, raw_value)
+                 if is_stop_signal:
+                     self._preempt_stop(binding, raw_value)
+                 else:
+                     self._submit(binding, raw_value)
                  should_update_trigger_time = True
             else:
-                 # Pulse Mode: Only trigger on "rising edge" or significant activation
-                 # Simple boolean rising edge
-                 if isinstance(raw_value, bool) and raw_value and not c_state.get('last_val'):
-                     self.executor.submit(self._trigger_binding, binding, raw_value)
+                 # Pulse Mode: the binding's compiled trigger rule decides (edges, hysteresis, velocity, re-arm)
+                 compiled = self.triggers.get(binding_key(binding))
+                 if compiled is None:
+                     continue
+                 rule, t_state = compiled
+                 fire_value = rule.evaluate(t_state, raw_value, current_time)
+                 if fire_value is not None:
+                     self._submit(binding, fire_value)
                      should_update_trigger_time = True
-                 # Float threshold logic could go here (e.g. if val > 0.5 and last_val < 0.5)
-                 elif isinstance(raw_value, (int, float)):
-                     # For floats, we treat > 0 as "active".
-                     # Trigger if it wasn't active before, OR if val varies significantly?
-                     # Standard "Event" usually means 0->NZ transition.
-                     prev = float(c_state.get('last_val') or 0)
-                     curr = float(raw_value)
-                     if curr > 0 and prev == 0:
-                         self.executor.submit(self._trigger_binding, binding, raw_value)
-                         should_update_trigger_time = True
+
+        # Aggregate bindings: only this contact's input changes, one merged command per change
+        for key in self.aggregate_index.get(matched_contact.id, ()):
+            binding, aggregator = self.aggregates[key]
+            previous = aggregator.value
+            merged = aggregator.update(matched_contact.id, raw_value)
+            if merged == previous:
+                continue
+            if binding.is_continuous:
+                if merged == 0:
+                    self._preempt_stop(binding, merged)
+                else:
+                    self._submit(binding, merged)
+                should_update_trigger_time = True
+            else:
+                rule, t_state = self.triggers[key]
+                fire_value = rule.evaluate(t_state, merged, current_time)
+                if fire_value is not None:
+                    self._submit(binding, fire_value)
+                    should_update_trigger_time = True
+
+        # Contacts placed on a motor layout (core/spatial.py)
+        if self._update_spatial(matched_contact.id, raw_value, is_stop_signal):
+            should_update_trigger_time = True
 
         # Update State
         if should_update_trigger_time:
@@ -94,47 +696,203 @@ class OSCHandler:
         c_state['last_val'] = raw_value
         self.contact_states[matched_contact.id] = c_state
 
+    def _update_array(self, contact: Contact, index: int, raw_value: Any):
+        state = self.arrays.get(contact.id)
+        if state is None:
+            return
+        if isinstance(raw_value, bool):
+            value = 1.0 if raw_value else 0.0
+        else:
+            try:
+                value = float(raw_value)
+            except (ValueError, TypeError):
+                return
+        state.values[index] = value
+        with self._frame_lock:
+            self.dirty_arrays.add(contact.id)
+        self._schedule_frame()
+
+    def _update_spatial(self, contact_id: str, raw_value: Any, stop: bool) -> bool:
+        """Writes the contact's payload into the layouts it drives. Returns False if it drives none."""
+        entries = self.spatial_index.get(contact_id)
+        if not entries:
+            return False
+        with self._frame_lock:
+            for group, column, binding in entries:
+                # A released contact drops out of the sum, like the stop of a continuous binding
+                group.values[column] = 0.0 if stop else self._calculate_payload(binding, raw_value)
+                self.dirty_groups.add(group.key)
+        self._schedule_frame()
+        return True
+
+    def _schedule_frame(self):
+        with self._frame_lock:
+            if self._frame_pending:
+                return
+            self._frame_pending = True
+        # Updates arriving until then go out together in one frame
+        self.timers.schedule(self.frame_interval, self._flush_frames)
+
+    def _flush_frames(self):
+        """Timer callback: sends one frame per binding of each changed array contact and per changed layout."""
+        with self._frame_lock:
+            dirty = self.dirty_arrays
+            self.dirty_arrays = set()
+            dirty_groups = self.dirty_groups
+            self.dirty_groups = set()
+            self._frame_pending = False
+        self._begin_cycle()
+        try:
+            for contact_id in dirty:
+                state = self.arrays.get(contact_id)
+                if state is None:
+                    continue
+                for binding in self.contact_bindings.get(contact_id, ()):
+                    self._send_array(binding, state)
+            for key in dirty_groups:
+                group = self.spatial_groups.get(key)
+                if group is None:
+                    continue
+                # One matrix-vector product: every contact's payload spread over the motors
+                frame = group.frame()
+                if group.binding.deadband > 0:
+                    frame = [0.0 if v < group.binding.deadband else v for v in frame]
+                self._send_vector(group.binding, frame, group.last_frames)
+        finally:
+            self._end_cycle()
+
+    def _send_array(self, binding: Binding, state: ArrayState):
+        self._send_vector(binding, map_vector(binding, state.values, self._calculate_payload), state.last_frames)
+
+    def _send_vector(self, binding: Binding, frame, last_frames: Dict[Any, tuple]):
+        """Sends a mapped frame through apply_frame, or per element to device_id with {index} filled in."""
+        key = binding_key(binding)
+        frame = tuple(frame.tolist() if hasattr(frame, "tolist") else frame)
+        last = last_frames.get(key)
+        if frame == last:
+            self.suppressed_calls += 1
+            return
+        last_frames[key] = frame
+
+        module = self.loaded_modules.get(binding.module_name)
+        if callable(getattr(module, "apply_frame", None)):
+            lane_key = (binding.module_name, binding.device_id)
+            if not any(frame):
+                self.scheduler.preempt(lane_key, self._send_frame, binding, list(frame))
+            else:
+                # A frame still queued for the device is replaced by this one
+                self.scheduler.submit(lane_key, self._send_frame, binding, list(frame),
+                                      key=("frame", key), priority=PRIORITY_NORMAL)
+            return
+
+        # One output per changed element, to the device named by device_id with {index} filled in
+        for index, value in enumerate(frame):
+            if last is not None and last[index] == value:
+                continue
+            element = self._element_bindings.get((key, index))
+            if element is None:
+                captures = {"index": str(index)}
+                element = self._element_bindings[(key, index)] = binding.model_copy(update={
+                    "device_id": fill_captures(binding.device_id, captures),
+                    "device_name": fill_captures(binding.device_name, captures),
+                })
+            self._dispatch(element, value, key=binding_key(element), stop=value == 0)
+
+    def _send_frame(self, binding: Binding, values: List[float]):
+        module = self.loaded_modules.get(binding.module_name)
+        apply_frame = getattr(module, "apply_frame", None)
+        if not callable(apply_frame):
+            return
+        labels = (binding.module_name,)
+        self.m_commands.inc((binding.module_name, binding.device_id, "frame"))
+        self.device_levels[(binding.module_name, binding.device_id)] = max(values, default=0.0)
+        self.m_calls.inc(labels)
+        started = time.perf_counter()
+        try:
+            apply_frame(binding, values)
+        except Exception as e:
+            self.m_errors.inc(labels)
+            print(f"Error executing 'apply_frame' in module '{binding.module_name}': {e}")
+        self.m_latency.observe(time.perf_counter() - started, labels)
+
+    @staticmethod
+    def _address_class(address: str) -> str:
+        # First two path segments, e.g. /avatar/parameters, to keep the label set small
+        parts = address.split("/", 3)
+        return "/".join(parts[:3]) if len(parts) > 2 else address
+
     def _find_contact(self, address: str) -> Optional[Contact]:
-        for contact in self.contacts:
-            # Check configured OSC path (exact match)
-            if contact.osc_path and contact.osc_path == address:
-                return contact
-            
-            # Check common VRChat parameter patterns
-            # e.g. /avatar/parameters/ContactName matches id="ContactName"
+        instance = self.pattern_instances.get(address)
+        if instance is not None:
+            self.pattern_instances.move_to_end(address)
+            return instance[1]
+
+        # Check configured OSC paths, exact or pattern
+        match = self.address_trie.match(address)
+        if match is not None:
+            contact, captures = match
+            return self._instantiate(contact, captures, address) if captures else contact
+
+        return self._contact_by_id(address)
+
+    def _contact_by_id(self, address: str) -> Optional[Contact]:
+        # Check common VRChat parameter patterns
+        # e.g. /avatar/parameters/ContactName matches id="ContactName"
+        contact = self.contacts_by_id.get(address.rsplit("/", 1)[-1])
+        if contact is not None:
+            return contact
+        for contact in self._slash_ids:
             if address.endswith(f"/{contact.id}"):
                 return contact
-                
         return None
 
-    def _trigger_binding(self, binding: Binding, raw_value: Any):
+    def needs_repeats(self, address: str) -> bool:
+        """Whether resent unchanged values of this address must still reach its bindings (Binding.pass_repeats)."""
+        if not self._repeat_contacts:
+            return False
+        cached = self._repeat_addresses.get(address)
+        if cached is None:
+            element = self.array_elements.get(address)
+            if element is not None:
+                contact = element[0]
+            else:
+                # Pattern contacts count by their own id, no instance is created here
+                match = self.address_trie.match(address)
+                contact = match[0] if match is not None else self._contact_by_id(address)
+            cached = self._repeat_addresses[address] = contact is not None and contact.id in self._repeat_contacts
+        return cached
+
+    def _send(self, binding: Binding, payload_value: float):
         module = self.loaded_modules.get(binding.module_name)
         if not module:
             print(f"Module '{binding.module_name}' not found for binding.")
             return
 
-        # Calculate the effective intensity or value
-        payload_value = self._calculate_payload(binding, raw_value)
-        
         # Function name corresponds to reaction_type (e.g. vibrate, shock)
         func_name = binding.reaction_type
         
         if hasattr(module, func_name):
             func = getattr(module, func_name)
-            try:
-                # We expect the module method signature to accept (binding, intensity)
-                func(binding, payload_value)
-            except Exception as e:
-                print(f"Error executing '{func_name}' in module '{binding.module_name}': {e}")
+        elif hasattr(module, "handle_event"):
+            # Fallback if specific reaction function is missing but a generic handler exists
+            func_name = "handle_event"
+            func = module.handle_event
         else:
-             # Fallback if specific reaction function is missing but a generic handler exists
-            if hasattr(module, "handle_event"):
-                try:
-                    module.handle_event(binding, payload_value)
-                except Exception as e:
-                    print(f"Error executing 'handle_event' in module '{binding.module_name}': {e}")
-            else:
-                print(f"Module '{binding.module_name}' does not implement '{func_name}'")
+            print(f"Module '{binding.module_name}' does not implement '{func_name}'")
+            return
+
+        labels = (binding.module_name,)
+        self.m_commands.inc((binding.module_name, binding.device_id, binding.reaction_type))
+        self.device_levels[(binding.module_name, binding.device_id)] = payload_value
+        self.m_calls.inc(labels)
+        started = time.perf_counter()
+        try:
+            # We expect the module method signature to accept (binding, intensity)
+            func(binding, payload_value)
+        except Exception as e:
+            self.m_errors.inc(labels)
+            print(f"Error executing '{func_name}' in module '{binding.module_name}': {e}")
+        self.m_latency.observe(time.perf_counter() - started, labels)
 
     def _calculate_payload(self, binding: Binding, raw_value: Any) -> float:
         # Handle Boolean
@@ -1,6 +1,7 @@
 from pythonosc.dispatcher import Dispatcher
 from pythonosc.osc_server import ThreadingOSCUDPServer
 import threading
+from core.recording import SessionRecorder
 
 class OSCSniffer:
     def __init__(self, port=9001):
@@ -10,6 +11,8 @@ class OSCSniffer:
         self.running = False
         self.last_address = None
         self.listeners = []
+        self.recorder = None
+        self.dedup = None # core.dedup.IngestDedup, drops resent unchanged values before the listeners
 
     def add_listener(self, callback):
         if callback not in self.listeners:
@@ -19,6 +22,19 @@ class OSCSniffer:
         if callback in self.listeners:
             self.listeners.remove(callback)
 
+    def start_recording(self, path):
+        """Appends every received message to a session recording (see core/recording.py)."""
+        self.stop_recording()
+        self.recorder = SessionRecorder(path)
+        print(f"Recording OSC session to {path}")
+
+    def stop_recording(self):
+        recorder = self.recorder
+        if recorder:
+            self.recorder = None
+            recorder.close()
+            print(f"Recorded {recorder.messages} messages to {recorder.path}")
+
     def start(self):
         if self.running:
             return
@@ -42,10 +58,17 @@ class OSCSniffer:
             self.server.server_close()
             self.server = None
         self.running = False
+        self.stop_recording()
         print("OSC Sniffer stopped")
 
     def _handler(self, address, *api_args):
         self.last_address = address
+        recorder = self.recorder
+        if recorder:
+            recorder.record(address, api_args)
+        dedup = self.dedup
+        if dedup and not dedup.admit(address, api_args):
+            return
         # print(f"Sniffed: {address}")
         for listener in self.listeners:
             try:
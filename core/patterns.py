@@ -0,0 +1,299 @@
+"""
+Haptic pattern engine.
+
+A binding with a pattern does not send one value per trigger. Instead it starts
+a pattern instance, and a single tick thread evaluates every active instance
+at a fixed rate and sends the resulting intensity to each device. With NumPy
+installed and many instances active, instances sharing a pattern are evaluated
+together with one vectorized interpolation.
+"""
+import bisect
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from schemas.patterns import Pattern
+from core.numeric import numpy
+
+BUILTIN_PATTERNS = {
+    "ramp_up": Pattern(name="ramp_up", keyframes=[(0.0, 0.0), (1.0, 1.0)]),
+    "ramp_down": Pattern(name="ramp_down", keyframes=[(0.0, 1.0), (1.0, 0.0)]),
+    "pulse": Pattern(name="pulse", keyframes=[(0.0, 1.0), (0.5, 1.0), (0.5, 0.0), (1.0, 0.0)]),
+    "heartbeat": Pattern(name="heartbeat", keyframes=[
+        (0.0, 0.0), (0.05, 1.0), (0.15, 0.1), (0.25, 0.7), (0.35, 0.0), (1.0, 0.0)]),
+    "sawtooth": Pattern(name="sawtooth", keyframes=[
+        (0.0, 0.0), (0.25, 1.0), (0.25, 0.0), (0.5, 1.0), (0.5, 0.0), (0.75, 1.0), (0.75, 0.0), (1.0, 1.0)]),
+}
+
+DEFAULT_RATE_HZ = 50
+VECTORIZE_THRESHOLD = 32  # active instances above which NumPy evaluation is used
+
+
+class CompiledPattern:
+    """Keyframes split into sorted time / value lists for fast interpolation."""
+    __slots__ = ("name", "times", "values", "np_times", "np_values")
+
+    def __init__(self, pattern: Pattern):
+        frames = sorted(pattern.keyframes, key=lambda kf: kf[0])
+        if not frames:
+            frames = [(0.0, 0.0), (1.0, 0.0)]
+        self.name = pattern.name
+        self.times = [float(t) for t, _ in frames]
+        self.values = [float(v) for _, v in frames]
+        # Filled in by the first vectorized evaluation
+        self.np_times = None
+        self.np_values = None
+
+    def evaluate(self, phase: float) -> float:
+        times = self.times
+        if phase <= times[0]:
+            return self.values[0]
+        if phase >= times[-1]:
+            return self.values[-1]
+        # Right-most keyframe at or before phase, so a step (two frames at the same time) jumps cleanly
+        i = bisect.bisect_right(times, phase) - 1
+        t0, t1 = times[i], times[i + 1]
+        v0, v1 = self.values[i], self.values[i + 1]
+        if t1 == t0:
+            return v1
+        return v0 + (v1 - v0) * (phase - t0) / (t1 - t0)
+
+
+class PatternInstance:
+    __slots__ = ("key", "binding", "pattern", "start", "period", "amplitude", "loop")
+
+    def __init__(self, key, binding, pattern: CompiledPattern, start: float, period: float, amplitude: float, loop: bool):
+        self.key = key
+        self.binding = binding
+        self.pattern = pattern
+        self.start = start
+        self.period = period
+        self.amplitude = amplitude
+        self.loop = loop
+
+
+class _Batch:
+    """
+    Active instances laid out as arrays for vectorized ticks. Built once from the
+    instance dict and reused every tick until an instance starts or stops.
+    """
+    def __init__(self, np, instances: List[PatternInstance], last_output: dict, output_key: Callable):
+        self.instances = instances
+        self.positions = {inst.key: i for i, inst in enumerate(instances)}
+        self.starts = np.array([inst.start for inst in instances], dtype=float)
+        self.periods = np.array([inst.period for inst in instances], dtype=float)
+        self.amplitudes = np.array([inst.amplitude for inst in instances], dtype=float)
+        self.loops = np.array([inst.loop for inst in instances], dtype=bool)
+
+        # One np.interp per distinct pattern over all its instances
+        groups: Dict[str, List[int]] = {}
+        for i, inst in enumerate(instances):
+            groups.setdefault(inst.pattern.name, []).append(i)
+        self.groups = []
+        for indices in groups.values():
+            pattern = instances[indices[0]].pattern
+            if pattern.np_times is None:
+                pattern.np_times = np.array(pattern.times)
+                pattern.np_values = np.array(pattern.values)
+            self.groups.append((pattern, np.array(indices)))
+
+        # Output slot per instance; outputs driven by several instances are reduced with a max
+        slots: Dict[tuple, int] = {}
+        self.out_bindings = []
+        out_index = []
+        for inst in instances:
+            key = output_key(inst.binding)
+            if key not in slots:
+                slots[key] = len(slots)
+                self.out_bindings.append(inst.binding)
+            out_index.append(slots[key])
+        self.out_keys = list(slots)
+        self.out_index = np.array(out_index)
+        members: Dict[int, List[int]] = {}
+        for i, o in enumerate(out_index):
+            members.setdefault(o, []).append(i)
+        self.shared = {o: np.array(m) for o, m in members.items() if len(m) > 1}
+        # NaN never compares equal, so outputs not sent yet always go out on the first tick
+        self.last = np.array([last_output.get(key, np.nan) for key in self.out_keys], dtype=float)
+
+
+class PatternEngine:
+    def __init__(self, send: Callable, patterns: Optional[List[Pattern]] = None,
+                 rate_hz: float = DEFAULT_RATE_HZ, clock: Callable[[], float] = time.monotonic,
+                 threaded: bool = True):
+        """
+        send: called as send(binding, value) from the tick thread for every output change.
+        threaded: False leaves ticking to the caller (benchmarks, tests).
+        """
+        self.send = send
+        self.clock = clock
+        self.rate_hz = rate_hz
+        self.patterns: Dict[str, CompiledPattern] = {}
+        self.set_patterns(patterns or [])
+
+        self.instances: Dict[object, PatternInstance] = {}
+        self.last_output = {} # {(module, device_id, reaction): value}
+        self._batch: Optional[_Batch] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._running = threaded
+        if threaded:
+            self._thread = threading.Thread(target=self._run, name="pattern-tick", daemon=True)
+            self._thread.start()
+
+    def set_patterns(self, patterns: List[Pattern]):
+        compiled = {name: CompiledPattern(p) for name, p in BUILTIN_PATTERNS.items()}
+        for p in patterns:
+            compiled[p.name] = CompiledPattern(p)
+        self.patterns = compiled
+
+    def names(self) -> List[str]:
+        return list(self.patterns.keys())
+
+    def start(self, key, binding, amplitude: float, loop: bool = False) -> bool:
+        """Starts (or restarts) the binding's pattern. Returns False if the pattern is unknown."""
+        pattern = self.patterns.get(binding.pattern)
+        if pattern is None:
+            return False
+        period = binding.duration if binding.duration > 0 else 1.0
+        with self._lock:
+            self.instances[key] = PatternInstance(key, binding, pattern, self.clock(), period, amplitude, loop)
+            self._batch = None
+        self._wake.set()
+        return True
+
+    def set_amplitude(self, key, amplitude: float) -> bool:
+        """Updates a running instance, returns False if it isn't running."""
+        with self._lock:
+            inst = self.instances.get(key)
+            if inst is None:
+                return False
+            inst.amplitude = amplitude
+            batch = self._batch
+            if batch is not None:
+                batch.amplitudes[batch.positions[key]] = amplitude
+            return True
+
+    def stop(self, key):
+        """Stops an instance. Returns the binding it was playing for, None if it wasn't running."""
+        with self._lock:
+            inst = self.instances.pop(key, None)
+            if inst is not None:
+                self._batch = None
+        if inst is None:
+            return None
+        self.last_output.pop(self._output_key(inst.binding), None)
+        return inst.binding
+
+    @staticmethod
+    def _output_key(binding):
+        return (binding.module_name, binding.device_id, binding.reaction_type)
+
+    def tick(self):
+        """Evaluates all instances once and sends changed per-device outputs."""
+        now = self.clock()
+        with self._lock:
+            count = len(self.instances)
+        if not count:
+            return
+        np = numpy() if count >= VECTORIZE_THRESHOLD else None
+        if np is None:
+            finished = self._tick_python(now)
+        else:
+            finished = self._tick_vectorized(np, now)
+        if finished:
+            self._finish(finished)
+
+    def _tick_python(self, now: float) -> List[PatternInstance]:
+        with self._lock:
+            instances = list(self.instances.values())
+
+        # Several instances on one device: strongest wins
+        outputs = {}
+        finished = []
+        for inst in instances:
+            phase = (now - inst.start) / inst.period
+            if inst.loop:
+                value = inst.pattern.evaluate(phase % 1.0) * inst.amplitude
+            elif phase >= 1.0:
+                finished.append(inst)
+                value = 0.0
+            else:
+                value = inst.pattern.evaluate(phase) * inst.amplitude
+            out_key = self._output_key(inst.binding)
+            current = outputs.get(out_key)
+            if current is None or value > current[1]:
+                outputs[out_key] = (inst.binding, value)
+
+        for out_key, (binding, value) in outputs.items():
+            if self.last_output.get(out_key) != value:
+                self._send(out_key, binding, value)
+        return finished
+
+    def _tick_vectorized(self, np, now: float) -> List[PatternInstance]:
+        with self._lock:
+            batch = self._batch
+            if batch is None:
+                batch = self._batch = _Batch(np, list(self.instances.values()), self.last_output, self._output_key)
+
+        elapsed = now - batch.starts
+        phases = elapsed / batch.periods
+        done = ~batch.loops & (phases >= 1.0)
+        np.remainder(phases, 1.0, out=phases, where=batch.loops)
+        values = np.empty(len(phases))
+        for pattern, idx in batch.groups:
+            values[idx] = np.interp(phases[idx], pattern.np_times, pattern.np_values)
+        values *= batch.amplitudes
+        values[done] = 0.0
+
+        # Several instances on one device: strongest wins
+        if batch.shared:
+            outputs = np.full(len(batch.out_keys), -np.inf)
+            np.maximum.at(outputs, batch.out_index, values)
+        else:
+            outputs = values
+        changed = np.flatnonzero(outputs != batch.last)
+        batch.last[changed] = outputs[changed]
+        for o, value in zip(changed.tolist(), outputs[changed].tolist()):
+            binding = batch.out_bindings[o]
+            members = batch.shared.get(o)
+            if members is not None:
+                binding = batch.instances[members[int(np.argmax(values[members]))]].binding
+            self._send(batch.out_keys[o], binding, value)
+        return [batch.instances[i] for i in np.flatnonzero(done).tolist()]
+
+    def _send(self, out_key, binding, value: float):
+        self.last_output[out_key] = value
+        try:
+            self.send(binding, value)
+        except Exception as e:
+            print(f"Error sending pattern output: {e}")
+
+    def _finish(self, finished: List[PatternInstance]):
+        with self._lock:
+            for inst in finished:
+                if self.instances.get(inst.key) is inst:
+                    del self.instances[inst.key]
+            self._batch = None
+            active = {self._output_key(i.binding) for i in self.instances.values()}
+        # Forget outputs nothing drives anymore, so a later start sends again
+        for inst in finished:
+            out_key = self._output_key(inst.binding)
+            if out_key not in active:
+                self.last_output.pop(out_key, None)
+
+    def _run(self):
+        while self._running:
+            if not self.instances:
+                # Nothing to render, sleep until an instance starts
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            started = self.clock()
+            self.tick()
+            interval = 1.0 / self.rate_hz if self.rate_hz > 0 else 1.0 / DEFAULT_RATE_HZ
+            time.sleep(max(0.0, interval - (self.clock() - started)))
+
+    def shutdown(self):
+        self._running = False
+        self._wake.set()
@@ -0,0 +1,215 @@
+"""
+Recording and replay of OSC sessions.
+
+A recording is an append-only binary file:
+
+    header   b"VRCHREC" + version byte
+    address  b"A" id:u16 length:u16 utf-8 bytes      (first time an address is seen)
+    message  b"M" t:i64 id:u16 argc:u8 args...       (t = monotonic ns since recording start)
+
+Each argument is a one byte type tag followed by its value: f (f64), i (i64),
+T / F (bools, no payload), N (None) or s (u16 length + utf-8). Addresses are
+interned so a message costs a dozen bytes however long its path is.
+"""
+import mmap
+import struct
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b"VRCHREC"
+VERSION = 1
+
+_ADDRESS = struct.Struct("<HH")
+_MESSAGE = struct.Struct("<qHB")
+_F64 = struct.Struct("<d")
+_I64 = struct.Struct("<q")
+_U16 = struct.Struct("<H")
+
+
+class ReplayClock:
+    """
+    Clock for components under replay: returns the recorded time of the message being played
+    instead of the wall clock, so cooldowns behave the same at any playback speed.
+
+    It only covers what is decided at ingest (OSCHandler's clock: cooldowns, triggers). Pulse
+    ends (TimerWheel), patterns (PatternEngine) and array/layout frame ticks run on their own
+    threads in real time, so at speeds other than 1.0 their output doesn't line up with the
+    recording the way it did live.
+    """
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class SessionRecorder:
+    def __init__(self, path: str, clock_ns: Callable[[], int] = time.monotonic_ns):
+        self.path = path
+        self.clock_ns = clock_ns
+        self.addresses: Dict[str, int] = {}
+        self.messages = 0
+        self._lock = threading.Lock()
+        self._file = open(path, "wb")
+        self._file.write(MAGIC + bytes([VERSION]))
+        self._start = clock_ns()
+
+    def record(self, address: str, args) -> bool:
+        """Appends one message. Returns False for values that can't be stored (they are skipped)."""
+        payload = bytearray()
+        for arg in args[:255]:
+            if not _encode_arg(payload, arg):
+                return False
+        with self._lock:
+            if self._file is None:
+                return False
+            t = self.clock_ns() - self._start
+            address_id = self.addresses.get(address)
+            if address_id is None:
+                address_id = len(self.addresses)
+                if address_id > 0xFFFF:
+                    return False
+                raw = address.encode("utf-8")
+                self._file.write(b"A" + _ADDRESS.pack(address_id, len(raw)) + raw)
+                self.addresses[address] = address_id
+            self._file.write(b"M" + _MESSAGE.pack(t, address_id, min(len(args), 255)) + payload)
+            self.messages += 1
+        return True
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def _encode_arg(out: bytearray, arg: Any) -> bool:
+    # bool before int, it's a subclass
+    if isinstance(arg, bool):
+        out += b"T" if arg else b"F"
+    elif isinstance(arg, int):
+        if not -(1 << 63) <= arg < (1 << 63):
+            return False
+        out += b"i" + _I64.pack(arg)
+    elif isinstance(arg, float):
+        out += b"f" + _F64.pack(arg)
+    elif arg is None:
+        out += b"N"
+    elif isinstance(arg, str):
+        raw = arg.encode("utf-8")
+        if len(raw) > 0xFFFF:
+            # Cut at a character boundary so replay can decode it
+            raw = raw[:0xFFFF].decode("utf-8", "ignore").encode("utf-8")
+        out += b"s" + _U16.pack(len(raw)) + raw
+    else:
+        return False
+    return True
+
+
+class SessionPlayer:
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"'{path}' is empty, not a session recording")
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"'{path}' is not a session recording")
+        if self._map[len(MAGIC)] != VERSION:
+            version = self._map[len(MAGIC)]
+            self.close()
+            raise ValueError(f"Unsupported recording version {version}")
+        self._cancelled = False
+
+    def messages(self) -> Iterator[Tuple[int, str, Tuple[Any, ...]]]:
+        """Yields (ns since recording start, address, args) in recorded order."""
+        buf = self._map
+        end = len(buf)
+        pos = len(MAGIC) + 1
+        addresses: List[str] = []
+        while pos < end:
+            kind = buf[pos]
+            pos += 1
+            try:
+                if kind == 0x41:  # b"A"
+                    address_id, length = _ADDRESS.unpack_from(buf, pos)
+                    pos += _ADDRESS.size
+                    name = buf[pos:pos + length].decode("utf-8")
+                    pos += length
+                    if address_id == len(addresses):
+                        addresses.append(name)
+                    continue
+                if kind != 0x4D:  # b"M"
+                    break
+                t, address_id, argc = _MESSAGE.unpack_from(buf, pos)
+                pos += _MESSAGE.size
+                args = []
+                for _ in range(argc):
+                    value, pos = _decode_arg(buf, pos)
+                    args.append(value)
+            except (struct.error, IndexError, ValueError):
+                # Truncated tail, e.g. the app was killed while recording
+                break
+            yield t, addresses[address_id], tuple(args)
+
+    def play(self, target: Callable[[str, Tuple[Any, ...]], Any], speed: float = 1.0,
+             clock: Optional[ReplayClock] = None) -> int:
+        """
+        Feeds every message to target(address, args) and returns how many were played.
+        speed: 1.0 plays in real time, 4.0 four times faster, 0 as fast as possible.
+        clock: if given, set to the recorded time (in seconds, offset by its start value) before each message.
+        Only speed 1.0 reproduces time-driven output (pulse ends, patterns, frames), see ReplayClock.
+        """
+        self._cancelled = False
+        base = clock.now if clock is not None else 0.0
+        wall_start = time.monotonic()
+        count = 0
+        for t, address, args in self.messages():
+            if self._cancelled:
+                break
+            if speed > 0:
+                delay = t / 1e9 / speed - (time.monotonic() - wall_start)
+                if delay > 0:
+                    time.sleep(delay)
+            if clock is not None:
+                clock.now = base + t / 1e9
+            try:
+                target(address, args)
+            except Exception as e:
+                print(f"Error replaying {address}: {e}")
+            count += 1
+        return count
+
+    def cancel(self):
+        """Stops a play() running on another thread after its current message."""
+        self._cancelled = True
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+def _decode_arg(buf, pos: int):
+    tag = buf[pos]
+    pos += 1
+    if tag == 0x66:  # f
+        return _F64.unpack_from(buf, pos)[0], pos + 8
+    if tag == 0x69:  # i
+        return _I64.unpack_from(buf, pos)[0], pos + 8
+    if tag == 0x54:  # T
+        return True, pos
+    if tag == 0x46:  # F
+        return False, pos
+    if tag == 0x4E:  # N
+        return None, pos
+    if tag == 0x73:  # s
+        length = _U16.unpack_from(buf, pos)[0]
+        pos += 2
+        return buf[pos:pos + length].decode("utf-8"), pos + length
+    raise ValueError(f"Unknown argument tag {tag!r}")
@@ -0,0 +1,121 @@
+"""
+Spatial mapping from contact positions to motor layouts.
+
+Contacts (Contact.position) and the motors of a layout (schemas.spatial.
+MotorLayout) share one body coordinate space. Bindings with `layout` set
+don't drive their device directly: all bindings into the same layout and
+device form a group, whose motor-by-contact weight matrix is computed once
+when the config changes. Each tick the motor intensities are one
+matrix-vector product of that matrix with the contacts' current payloads,
+so a contact between two motors drives both proportionally.
+"""
+import math
+from array import array
+from typing import Dict, List, Tuple
+
+from core.numeric import numpy
+from schemas.spatial import MotorLayout
+
+
+def _distance(a, b) -> float:
+    n = max(len(a), len(b))
+    a = list(a) + [0.0] * (n - len(a))
+    b = list(b) + [0.0] * (n - len(b))
+    return math.dist(a, b)
+
+
+def contact_weights(position, layout: MotorLayout) -> List[float]:
+    """Share of a contact's intensity each motor of the layout gets."""
+    distances = [_distance(position, motor) for motor in layout.motors]
+    if not distances:
+        return []
+    if layout.falloff == "gaussian":
+        two_sigma_sq = 2.0 * layout.sigma * layout.sigma
+        return [math.exp(-d * d / two_sigma_sq) if two_sigma_sq > 0 else float(d == 0) for d in distances]
+
+    weights = [0.0] * len(distances)
+    nearest = min(range(len(distances)), key=distances.__getitem__)
+    if distances[nearest] < 1e-9:
+        # Right on a motor
+        weights[nearest] = 1.0
+        return weights
+    if layout.radius > 0:
+        candidates = [i for i, d in enumerate(distances) if d <= layout.radius]
+    else:
+        candidates = sorted(range(len(distances)), key=distances.__getitem__)[:max(1, layout.neighbors)]
+    total = 0.0
+    for i in candidates:
+        weights[i] = 1.0 / distances[i] ** layout.power
+        total += weights[i]
+    if total > 0:
+        weights = [w / total for w in weights]
+    return weights
+
+
+class SpatialGroup:
+    """Bindings of several contacts into one layout on one device, with their precomputed weights."""
+
+    def __init__(self, key, binding, layout: MotorLayout, contacts: List[Tuple[str, List[float]]]):
+        """binding: stands for the group's output (module, device, reaction); contacts: (id, position)."""
+        self.key = key
+        self.binding = binding
+        self.layout = layout
+        self.columns = {contact_id: i for i, (contact_id, _) in enumerate(contacts)}
+        columns = [contact_weights(position, layout) for _, position in contacts]
+        motors = len(layout.motors)
+        if layout.overlap == "normalize":
+            for m in range(motors):
+                total = sum(col[m] for col in columns)
+                if total > 1.0:
+                    for col in columns:
+                        col[m] /= total
+        np = numpy()
+        if np is not None:
+            self.weights = np.array(columns, dtype=float).reshape(len(contacts), motors).T.copy()
+            self.values = np.zeros(len(contacts))
+        else:
+            # Per motor only the contacts that reach it: [(column, weight), ...]
+            self.weights = [[(c, col[m]) for c, col in enumerate(columns) if col[m] > 0] for m in range(motors)]
+            self.values = array('d', bytes(8 * len(contacts)))
+        self.last_frames = {}
+
+    def frame(self):
+        """Current motor intensities, capped at 1.0 where several contacts add up (overlap "clamp")."""
+        np = numpy()
+        if np is not None and not isinstance(self.weights, list):
+            return np.minimum(self.weights @ self.values, 1.0)
+        values = self.values
+        return [min(1.0, sum(values[c] * w for c, w in row)) for row in self.weights]
+
+
+def build_groups(contacts, bindings, layouts: List[MotorLayout]):
+    """
+    Returns ({group key: SpatialGroup}, {contact_id: [(group, column, binding), ...]}) for the
+    bindings with a layout. The group key is (layout, module, device_id, reaction_type).
+    """
+    layouts_by_name = {layout.name: layout for layout in layouts}
+    positions = {c.id: c.position for c in contacts if c.position}
+    members: Dict[tuple, list] = {}
+    for binding in bindings:
+        if not binding.layout:
+            continue
+        if binding.layout not in layouts_by_name:
+            print(f"Unknown layout '{binding.layout}' in binding of '{binding.contact_name}'")
+            continue
+        if binding.contact_id not in positions:
+            print(f"Contact '{binding.contact_name}' needs a position to drive layout '{binding.layout}'")
+            continue
+        key = (binding.layout, binding.module_name, binding.device_id, binding.reaction_type)
+        members.setdefault(key, []).append(binding)
+
+    groups = {}
+    index: Dict[str, list] = {}
+    for key, group_bindings in members.items():
+        layout = layouts_by_name[key[0]]
+        contact_ids = list(dict.fromkeys(b.contact_id for b in group_bindings))
+        output = group_bindings[0].model_copy(update={
+            "contact_id": f"layout:{layout.name}", "contact_name": layout.name, "is_continuous": True})
+        group = groups[key] = SpatialGroup(key, output, layout, [(cid, positions[cid]) for cid in contact_ids])
+        for binding in group_bindings:
+            index.setdefault(binding.contact_id, []).append((group, group.columns[binding.contact_id], binding))
+    return groups, index
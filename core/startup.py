@@ -0,0 +1,50 @@
+"""
+Startup profiling: time spent importing and constructing each component, and
+when milestones like "listening for OSC" are reached.
+
+app.py creates its profiler before importing anything else and prints the
+report when "profile_startup" is set in app_settings (or with
+--profile-startup). benchmarks/bench_startup.py uses the same data to check
+startup against a time budget.
+"""
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, List, Tuple
+
+
+class StartupProfiler:
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self.clock = clock
+        self.started = clock()
+        self.phases: List[Tuple[str, float]] = [] # (name, seconds), in the order they finished
+        self.marks: List[Tuple[str, float]] = [] # (name, seconds since start)
+
+    @contextmanager
+    def phase(self, name: str):
+        started = self.clock()
+        try:
+            yield
+        finally:
+            self.phases.append((name, self.clock() - started))
+
+    def mark(self, name: str):
+        """Records a milestone; only the first mark of a name counts."""
+        if all(n != name for n, _ in self.marks):
+            self.marks.append((name, self.clock() - self.started))
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        return {"phases": dict(self.phases), "marks": dict(self.marks)}
+
+    def report(self) -> str:
+        width = max([len(n) for n, _ in self.phases + self.marks] + [10])
+        lines = ["Startup profile:"]
+        for name, seconds in self.phases:
+            lines.append(f"  {name:<{width}} {seconds * 1000:8.1f} ms")
+        for name, seconds in self.marks:
+            lines.append(f"  {name:<{width}} {seconds * 1000:8.1f} ms after start")
+        return "\n".join(lines)
+
+
+def phase(profiler, name: str):
+    """profiler.phase(name), or a no-op when there is no profiler."""
+    return profiler.phase(name) if profiler is not None else nullcontext()
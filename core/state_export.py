@@ -0,0 +1,230 @@
+"""
+Live state in a memory-mapped file, for overlays, stream widgets and other external tools.
+
+A background thread copies the handler's state into the file a few dozen times per second;
+the OSC pipeline itself never touches it. Readers map the same file and take lock-free
+snapshots at any rate using the sequence counter (a seqlock).
+
+File layout, little endian, all offsets fixed for a given capacity:
+
+    Header (64 bytes)
+      0  char[4]  magic b"VRHS"
+      4  uint32   layout version (1)
+      8  uint64   sequence: odd while a snapshot is being written, +2 per published snapshot
+      16 float64  time of the snapshot (time.time())
+      24 uint32   contact count       28 uint32 device count
+      32 uint32   contact capacity    36 uint32 device capacity
+      40 reserved
+    Contact records (72 bytes each, contact capacity of them, starting at 64)
+      0  char[64] contact id, UTF-8, NUL padded
+      64 float64  last value received (bools as 0/1)
+      Array contacts get one record per element, named "<contact id>[<index>]". Contacts placed
+      on a motor layout also get one record per layout they drive, named
+      "<contact id>@<layout>/<device id>", holding the payload they currently feed into it.
+    Device records (112 bytes each, device capacity of them, after the contact records)
+      0  char[48] module name, UTF-8, NUL padded
+      48 char[48] device id, UTF-8, NUL padded
+      96 float64  intensity of the last command sent to the device
+      104 uint32  flags: 1 = connected, 2 = active (intensity > 0), 4 = known to the device registry
+      108 reserved
+
+To read: load the sequence; if it is odd, try again. Copy the records, then load the sequence
+again; if it changed, the copy may be torn, so try again. StateReader does exactly that.
+"""
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from core.device_registry import ONLINE
+
+MAGIC = b"VRHS"
+VERSION = 1
+HEADER = struct.Struct("<4sIQdIIII24x")
+SEQUENCE = struct.Struct("<Q")
+SEQUENCE_OFFSET = 8
+CONTACT = struct.Struct("<64sd")
+DEVICE = struct.Struct("<48s48sdI4x")
+
+FLAG_CONNECTED = 1
+FLAG_ACTIVE = 2
+FLAG_KNOWN = 4
+
+DEFAULT_PATH = os.path.join(tempfile.gettempdir(), "vrchaptics_state.bin")
+
+
+def file_size(contact_capacity: int, device_capacity: int) -> int:
+    return HEADER.size + contact_capacity * CONTACT.size + device_capacity * DEVICE.size
+
+
+def _number(value: Any) -> float:
+    if isinstance(value, bool):
+        return 1.0 if value else 0.0
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+class StateExporter:
+    """Publishes contact values, device intensities and connection flags of an OSCHandler."""
+
+    def __init__(self, osc_handler, registry=None, path: Optional[str] = None, rate_hz: float = 30,
+                 contact_capacity: int = 256, device_capacity: int = 64):
+        self.osc_handler = osc_handler
+        self.registry = registry
+        self.path = path or DEFAULT_PATH
+        self.interval = 1.0 / rate_hz if rate_hz > 0 else 1.0 / 30
+        self.contact_capacity = contact_capacity
+        self.device_capacity = device_capacity
+        self.sequence = 0
+        self.published = 0 # snapshots written
+        self.truncated = False # more contacts or devices than the file has room for
+        self._file = None
+        self._map = None
+        self._last = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread:
+            return
+        try:
+            size = file_size(self.contact_capacity, self.device_capacity)
+            self._file = open(self.path, "w+b")
+            self._file.truncate(size)
+            self._map = mmap.mmap(self._file.fileno(), size)
+        except Exception as e:
+            print(f"Failed to start state export: {e}")
+            self._close()
+            return
+        self._write_header(self.sequence, 0, 0, 0.0)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="state-export", daemon=True)
+        self._thread.start()
+        print(f"Exporting live state to {self.path}")
+
+    def stop(self):
+        if self._thread:
+            self._stop.set()
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self._close()
+
+    def _close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.publish()
+            except Exception as e:
+                print(f"Error exporting state: {e}")
+
+    def collect(self):
+        """Current state as (contacts, devices), both sorted so rows keep their place between snapshots."""
+        handler = self.osc_handler
+        # list() copies in one step, the OSC thread may be adding entries meanwhile
+        contacts = [(contact_id, _number(state.get("last_val")))
+                    for contact_id, state in list(handler.contact_states.items())]
+        for contact_id, state in list(handler.arrays.items()):
+            contacts.extend((f"{contact_id}[{i}]", float(v)) for i, v in enumerate(list(state.values)))
+        for group in list(handler.spatial_groups.values()):
+            layout, _, device_id, _ = group.key
+            values = list(group.values)
+            contacts.extend((f"{contact_id}@{layout}/{device_id}", float(values[column]))
+                            for contact_id, column in group.columns.items())
+        contacts.sort()
+        levels = dict(list(handler.device_levels.items()))
+        devices = {}
+        if self.registry is not None:
+            for device in self.registry.devices():
+                key = (device.module_name, device.device_id)
+                flags = FLAG_KNOWN | (FLAG_CONNECTED if device.status == ONLINE else 0)
+                devices[key] = flags
+        for key in levels:
+            devices.setdefault(key, 0)
+        rows = []
+        for key in sorted(devices):
+            level = _number(levels.get(key, 0.0))
+            rows.append((key[0], key[1], level, devices[key] | (FLAG_ACTIVE if level > 0 else 0)))
+        return contacts, rows
+
+    def publish(self) -> bool:
+        """Writes a snapshot if anything changed. Returns whether one was written."""
+        if self._map is None:
+            return False
+        contacts, devices = self.collect()
+        if (contacts, devices) == self._last:
+            return False
+        self._last = (contacts, devices)
+        self.truncated = len(contacts) > self.contact_capacity or len(devices) > self.device_capacity
+        contacts = contacts[:self.contact_capacity]
+        devices = devices[:self.device_capacity]
+
+        m = self._map
+        # Odd sequence: readers retry until the write is complete
+        self._write_header(self.sequence + 1, len(contacts), len(devices), time.time())
+        offset = HEADER.size
+        for contact_id, value in contacts:
+            CONTACT.pack_into(m, offset, contact_id.encode("utf-8")[:64], value)
+            offset += CONTACT.size
+        offset = HEADER.size + self.contact_capacity * CONTACT.size
+        for module_name, device_id, level, flags in devices:
+            DEVICE.pack_into(m, offset, module_name.encode("utf-8")[:48], str(device_id).encode("utf-8")[:48],
+                             level, flags)
+            offset += DEVICE.size
+        self.sequence += 2
+        SEQUENCE.pack_into(m, SEQUENCE_OFFSET, self.sequence)
+        self.published += 1
+        return True
+
+    def _write_header(self, sequence: int, contact_count: int, device_count: int, timestamp: float):
+        HEADER.pack_into(self._map, 0, MAGIC, VERSION, sequence, timestamp, contact_count, device_count,
+                         self.contact_capacity, self.device_capacity)
+
+
+class StateReader:
+    """Reads snapshots written by StateExporter, from this or any other process."""
+
+    def __init__(self, path: Optional[str] = None):
+        self._file = open(path or DEFAULT_PATH, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.retries = 0 # snapshots that had to be re-read because a write was in progress
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def snapshot(self, max_tries: int = 100) -> Optional[Dict[str, Any]]:
+        """{"sequence", "time", "contacts": {id: value}, "devices": [(module, device_id, intensity, flags)]}."""
+        m = self._map
+        for _ in range(max_tries):
+            sequence = SEQUENCE.unpack_from(m, SEQUENCE_OFFSET)[0]
+            if sequence & 1:
+                self.retries += 1
+                continue
+            magic, version, _, timestamp, n_contacts, n_devices, contact_capacity, _ = HEADER.unpack_from(m, 0)
+            data = m[:file_size(contact_capacity, n_devices)]
+            if SEQUENCE.unpack_from(m, SEQUENCE_OFFSET)[0] != sequence:
+                self.retries += 1
+                continue
+            if magic != MAGIC or version != VERSION:
+                return None
+            contacts = {name.rstrip(b"\0").decode("utf-8", "replace"): value for name, value in
+                        CONTACT.iter_unpack(data[HEADER.size:HEADER.size + n_contacts * CONTACT.size])}
+            base = HEADER.size + contact_capacity * CONTACT.size
+            devices = [(module_name.rstrip(b"\0").decode("utf-8", "replace"),
+                        device_id.rstrip(b"\0").decode("utf-8", "replace"), level, flags)
+                       for module_name, device_id, level, flags in
+                       DEVICE.iter_unpack(data[base:base + n_devices * DEVICE.size])]
+            return {"sequence": sequence, "time": timestamp, "contacts": contacts, "devices": devices}
+        return None
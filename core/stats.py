@@ -0,0 +1,26 @@
+"""Small helpers for timing measurements shared by the core services."""
+import collections
+from typing import Dict
+
+
+class LatencyStats:
+    """Durations (in seconds) of the most recent operations, summarised as percentiles."""
+    def __init__(self, size: int = 2048):
+        self.samples = collections.deque(maxlen=size)
+        self.count = 0
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def summary(self) -> Dict[str, float]:
+        if not self.samples:
+            return {"count": 0}
+        ordered = sorted(self.samples)
+        n = len(ordered)
+        return {
+            "count": self.count,
+            "p50_ms": ordered[n // 2] * 1000,
+            "p99_ms": ordered[min(n - 1, int(n * 0.99))] * 1000,
+            "max_ms": ordered[-1] * 1000,
+        }
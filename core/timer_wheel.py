@@ -0,0 +1,93 @@
+"""
+Hashed timer wheel used to end pulses after Binding.duration.
+
+Timers are hashed into a ring of slots by their deadline tick, so scheduling
+and cancelling are O(1) and thousands of overlapping timers are driven by a
+single thread instead of one sleeping worker per pulse.
+"""
+import math
+import threading
+import time
+from typing import Callable
+
+
+class TimerHandle:
+    __slots__ = ("deadline", "callback", "args", "slot")
+
+    def __init__(self, deadline: int, callback: Callable, args: tuple, slot: int):
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.slot = slot
+
+
+class TimerWheel:
+    def __init__(self, tick: float = 0.01, slots: int = 512, clock: Callable[[], float] = time.monotonic):
+        """
+        tick: resolution in seconds; timers fire on the first tick at or after their deadline.
+        slots: wheel size. Delays longer than tick * slots simply stay in their slot for extra rounds.
+        """
+        self.tick = tick
+        self.clock = clock
+        self._slots = [dict() for _ in range(slots)]  # insertion ordered set of handles
+        self._count = 0
+        self._current = 0
+        self._start = clock()
+        self._lock = threading.Lock()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="timer-wheel", daemon=True)
+        self._thread.start()
+
+    def __len__(self):
+        return self._count
+
+    def schedule(self, delay: float, callback: Callable, *args) -> TimerHandle:
+        """Runs callback(*args) on the wheel thread after `delay` seconds."""
+        # From the clock, not from _current: that is rounded down and lags while the wheel
+        # thread sleeps or runs callbacks, so counting from it could fire early
+        elapsed = self.clock() - self._start
+        with self._lock:
+            deadline = max(self._current + 1, math.ceil((elapsed + delay) / self.tick))
+            slot = deadline % len(self._slots)
+            handle = TimerHandle(deadline, callback, args, slot)
+            self._slots[slot][handle] = None
+            self._count += 1
+            return handle
+
+    def cancel(self, handle: TimerHandle) -> bool:
+        """Returns True if the timer was still pending."""
+        with self._lock:
+            if self._slots[handle.slot].pop(handle, False) is None:
+                self._count -= 1
+                return True
+            return False
+
+    def _advance(self, target: int):
+        """Moves the wheel forward to `target` and returns the handles that expired."""
+        expired = []
+        with self._lock:
+            while self._current < target:
+                self._current += 1
+                slot = self._slots[self._current % len(self._slots)]
+                if not slot:
+                    continue
+                due = [h for h in slot if h.deadline <= self._current]
+                for h in due:
+                    del slot[h]
+                self._count -= len(due)
+                expired.extend(due)
+        return expired
+
+    def _run(self):
+        while self._running:
+            target = int((self.clock() - self._start) / self.tick)
+            for handle in self._advance(target):
+                try:
+                    handle.callback(*handle.args)
+                except Exception as e:
+                    print(f"Error in timer callback: {e}")
+            next_tick = self._start + (self._current + 1) * self.tick
+            time.sleep(max(0.0, next_tick - self.clock()))
+
+    def shutdown(self):
+        self._running = False
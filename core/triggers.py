@@ -0,0 +1,94 @@
+"""
+Trigger rules for pulse bindings.
+
+A binding's trigger settings are compiled once into a TriggerRule. Each binding
+keeps a tiny TriggerState, and evaluating a message is a constant amount of work:
+update the armed/active state machine and report whether the pulse fires.
+"""
+from typing import Any, Optional
+
+
+def _as_float(raw_value: Any) -> float:
+    if isinstance(raw_value, bool):
+        return 1.0 if raw_value else 0.0
+    try:
+        return float(raw_value)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+class TriggerState:
+    __slots__ = ("active", "last_value", "last_time", "last_fire", "peak", "peak_raw")
+
+    def __init__(self):
+        self.active = False     # above the threshold (or, for velocity rules, fired and not re-armed)
+        self.last_value = 0.0
+        self.last_time = None
+        self.last_fire = None
+        self.peak = 0.0         # highest value while active, sent on falling edges
+        self.peak_raw = None
+
+
+class TriggerRule:
+    """
+    Compiled trigger settings of one binding.
+
+    rising:   value goes above threshold
+    falling:  value drops to threshold - hysteresis or below (fires with the peak value)
+    both:     either of the above
+    velocity: value rises at least trigger_velocity units per second
+    The hysteresis band keeps a value hovering around the threshold from retriggering,
+    and rearm is the minimum time between two pulses.
+    """
+    __slots__ = ("edge", "on_level", "off_level", "velocity", "rearm")
+
+    def __init__(self, binding):
+        self.edge = binding.trigger_edge
+        self.on_level = binding.trigger_threshold
+        self.off_level = binding.trigger_threshold - abs(binding.trigger_hysteresis)
+        self.velocity = binding.trigger_velocity
+        self.rearm = binding.trigger_rearm
+
+    def settings(self):
+        return (self.edge, self.on_level, self.off_level, self.velocity, self.rearm)
+
+    def evaluate(self, state: TriggerState, raw_value: Any, now: float) -> Optional[Any]:
+        """Feeds one value. Returns the value to pulse with, or None if nothing fires."""
+        x = _as_float(raw_value)
+        fire_value = None
+
+        if self.edge == "velocity":
+            dt = now - state.last_time if state.last_time is not None else 0.0
+            speed = (x - state.last_value) / dt if dt > 0 else 0.0
+            if not state.active:
+                if speed >= self.velocity > 0 and x > self.on_level:
+                    state.active = True
+                    fire_value = raw_value
+            elif speed <= 0 or x <= self.off_level:
+                # Re-arm once the value stops rising
+                state.active = False
+        elif not state.active:
+            if x > self.on_level:
+                state.active = True
+                state.peak = x
+                state.peak_raw = raw_value
+                if self.edge != "falling":
+                    fire_value = raw_value
+        else:
+            if x > state.peak:
+                state.peak = x
+                state.peak_raw = raw_value
+            if x <= self.off_level:
+                state.active = False
+                if self.edge != "rising":
+                    fire_value = state.peak_raw
+
+        state.last_value = x
+        state.last_time = now
+
+        if fire_value is None:
+            return None
+        if self.rearm > 0 and state.last_fire is not None and now - state.last_fire < self.rearm:
+            return None
+        state.last_fire = now
+        return fire_value
@@ -0,0 +1,212 @@
+"""
+Virtual haptic devices for trying out bindings and load testing without hardware.
+
+Every command is delayed by a configurable latency (plus random jitter), can
+fail at random, is rejected above a per-device command rate, and is written
+to an in-memory log with its timestamps. apply_batch() handles many outputs
+in one simulated backend message, paying the latency once, and apply_frame()
+takes all motor intensities of an array contact binding at once (logged with
+a tuple as intensity).
+
+Module config (user_config.json, "modules" -> "Simulator"), all optional:
+
+    device_count   number of virtual devices (default 4)
+    latency_ms     time each command takes (default 20)
+    jitter_ms      extra random delay of 0..jitter_ms (default 5)
+    failure_rate   fraction of commands that raise (default 0)
+    max_rate_hz    commands per second a device accepts, 0 for no limit (default 0)
+    log_size       commands kept in the log (default 10000)
+"""
+import collections
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+try:
+    from core.config_manager import ConfigManager
+except ImportError:
+    ConfigManager = None
+
+DEFAULTS = {
+    "device_count": 4,
+    "latency_ms": 20.0,
+    "jitter_ms": 5.0,
+    "failure_rate": 0.0,
+    "max_rate_hz": 0.0,
+    "log_size": 10000,
+}
+
+SimulatedCommand = collections.namedtuple(
+    "SimulatedCommand", "device_id reaction intensity received finished result")
+
+
+class SimulatorModule:
+    def __init__(self, seed: Optional[int] = None, **settings):
+        """Settings not passed as keyword arguments come from the module config, then DEFAULTS."""
+        config = {}
+        if ConfigManager is not None and not settings:
+            try:
+                config = ConfigManager.get_module_config("Simulator")
+            except Exception as e:
+                print(f"Simulator: could not read module config: {e}")
+        options = {key: settings.get(key, config.get(key, default)) for key, default in DEFAULTS.items()}
+
+        self.name = "Simulator"
+        self.device_count = int(options["device_count"])
+        self.latency = float(options["latency_ms"]) / 1000.0
+        self.jitter = float(options["jitter_ms"]) / 1000.0
+        self.failure_rate = float(options["failure_rate"])
+        self.max_rate_hz = float(options["max_rate_hz"])
+
+        self.log = collections.deque(maxlen=int(options["log_size"]))
+        self.calls = 0 # simulated backend messages, a batch counts once
+        self.devices: List[Dict[str, str]] = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._next_allowed = {} # {device_id: monotonic time the next command is accepted}
+        self.scan()
+
+    def scan(self, on_device=None):
+        """on_device(dev) is called for each device as it is found (see core.device_registry)."""
+        self.devices = [
+            {"id": f"sim{i}", "name": f"Virtual Device {i}", "status": "idle"}
+            for i in range(self.device_count)
+        ]
+        self._by_id = {dev["id"]: dev for dev in self.devices}
+        if on_device:
+            for dev in self.devices:
+                on_device(dev)
+        return self.devices
+
+    def export_state(self):
+        """Handed to the new instance when the module is hot-reloaded."""
+        return {"devices": self.devices, "log": self.log, "calls": self.calls}
+
+    def import_state(self, state):
+        self.devices = state["devices"]
+        self._by_id = {dev["id"]: dev for dev in self.devices}
+        self.log.extend(state["log"])
+        self.calls = state["calls"]
+
+    def vibrate(self, binding, intensity):
+        self._command(binding.device_id, "vibrate", intensity)
+
+    def shock(self, binding, intensity):
+        self._command(binding.device_id, "shock", intensity)
+
+    def handle_event(self, binding, intensity):
+        self._command(binding.device_id, binding.reaction_type, intensity)
+
+    def test_device(self, device_id):
+        self._command(device_id, "test", 1.0)
+
+    def apply_batch(self, commands):
+        """Applies a list of (binding, intensity) in one simulated message: latency and failure apply once."""
+        received = time.monotonic()
+        accepted = []
+        for binding, intensity in commands:
+            reaction = binding.reaction_type
+            if binding.device_id not in self._by_id:
+                self._record(binding.device_id, reaction, intensity, received, "unknown_device")
+            elif not self._admit(binding.device_id, received):
+                self._record(binding.device_id, reaction, intensity, received, "rate_limited")
+            else:
+                accepted.append((binding.device_id, reaction, intensity))
+        if not accepted:
+            return
+
+        delay, failed = self._roll()
+        if delay > 0:
+            time.sleep(delay)
+        if failed:
+            for device_id, reaction, intensity in accepted:
+                self._record(device_id, reaction, intensity, received, "failed")
+            raise RuntimeError("Simulated batch failure")
+        for device_id, reaction, intensity in accepted:
+            self._apply(device_id, reaction, intensity, received)
+
+    def apply_frame(self, binding, values):
+        """Array contact output: all motor intensities of one device in a single simulated message."""
+        received = time.monotonic()
+        if binding.device_id not in self._by_id:
+            self._record(binding.device_id, "frame", tuple(values), received, "unknown_device")
+            raise ValueError(f"Unknown simulated device '{binding.device_id}'")
+        if not self._admit(binding.device_id, received):
+            self._record(binding.device_id, "frame", tuple(values), received, "rate_limited")
+            raise RuntimeError(f"Simulated device '{binding.device_id}' is rate limited")
+
+        delay, failed = self._roll()
+        if delay > 0:
+            time.sleep(delay)
+        if failed:
+            self._record(binding.device_id, "frame", tuple(values), received, "failed")
+            raise RuntimeError(f"Simulated failure on '{binding.device_id}'")
+        self._apply(binding.device_id, "frame", tuple(values), received)
+
+    def _command(self, device_id, reaction, intensity):
+        received = time.monotonic()
+        if device_id not in self._by_id:
+            self._record(device_id, reaction, intensity, received, "unknown_device")
+            raise ValueError(f"Unknown simulated device '{device_id}'")
+
+        if not self._admit(device_id, received):
+            self._record(device_id, reaction, intensity, received, "rate_limited")
+            raise RuntimeError(f"Simulated device '{device_id}' is rate limited")
+
+        delay, failed = self._roll()
+        if delay > 0:
+            time.sleep(delay)
+
+        if failed:
+            self._record(device_id, reaction, intensity, received, "failed")
+            raise RuntimeError(f"Simulated failure on '{device_id}'")
+
+        self._apply(device_id, reaction, intensity, received)
+
+    def _admit(self, device_id, now) -> bool:
+        """Applies max_rate_hz, returns False if the device can't take another command yet."""
+        if self.max_rate_hz <= 0:
+            return True
+        with self._lock:
+            if now < self._next_allowed.get(device_id, 0.0):
+                return False
+            self._next_allowed[device_id] = now + 1.0 / self.max_rate_hz
+            return True
+
+    def _roll(self):
+        """Latency and failure of one backend message."""
+        with self._lock:
+            self.calls += 1
+            delay = self.latency + (self._random.uniform(0.0, self.jitter) if self.jitter > 0 else 0.0)
+            failed = self.failure_rate > 0 and self._random.random() < self.failure_rate
+        return delay, failed
+
+    def _apply(self, device_id, reaction, intensity, received):
+        level = max(intensity, default=0.0) if isinstance(intensity, tuple) else intensity
+        self._by_id[device_id]["status"] = f"{reaction} {level:.2f}" if level else "idle"
+        self._record(device_id, reaction, intensity, received, "ok")
+
+    def _record(self, device_id, reaction, intensity, received, result):
+        self.log.append(SimulatedCommand(device_id, reaction, intensity, received, time.monotonic(), result))
+
+    def commands(self, device_id: Optional[str] = None) -> List[SimulatedCommand]:
+        """Logged commands, oldest first, optionally for one device only."""
+        entries = list(self.log)
+        if device_id is None:
+            return entries
+        return [c for c in entries if c.device_id == device_id]
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Number of logged commands per device and result."""
+        counts = {}
+        for c in list(self.log):
+            per_device = counts.setdefault(c.device_id, {})
+            per_device[c.result] = per_device.get(c.result, 0) + 1
+        return counts
+
+    def clear_log(self):
+        self.log.clear()
+        with self._lock:
+            self.calls = 0
+            self._next_allowed.clear()
@@ -1,5 +1,10 @@
 from pydantic import BaseModel
-from typing import Optional, Literal
+from typing import List, Optional, Literal
+
+class AggregateInput(BaseModel):
+    contact_id: str
+    weight: float = 1.0 # used by "average"
+    priority: int = 0 # used by "priority", higher wins
 
 class Binding(BaseModel):
     contact_id: str
@@ -10,6 +15,12 @@ class Binding(BaseModel):
     reaction_type: str = "vibrate" # vibrate, shock, etc.
     intensity: float = 1.0
     duration: float = 0.5
+    auto_stop: bool = True # Pulses are stopped by the core once duration has passed
+    ramp_down: float = 0.0 # Seconds to fade out at the end of a pulse instead of a hard stop
+    pattern: Optional[str] = None # Play this pattern (one pass per duration) instead of a single value
+    deadband: float = 0.0 # Outputs below this are sent as 0
+    min_change: float = 0.005 # Continuous outputs closer than this fraction of the output range to the last sent value are skipped
+    pass_repeats: bool = False # Receive values VRChat resends unchanged (exempt from osc_dedup_window)
     
     # Advanced Mapping for Float/Int Inputs
     use_mapping: bool = False
@@ -20,3 +31,19 @@ class Binding(BaseModel):
     curve_type: Literal["linear", "exponential", "logarithmic", "threshold"] = "linear"
     is_continuous: bool = False
 
+    # Pulse trigger rules (ignored for continuous bindings)
+    trigger_edge: Literal["rising", "falling", "both", "velocity"] = "rising"
+    trigger_threshold: float = 0.0 # Active while the value is above this
+    trigger_hysteresis: float = 0.0 # Must drop this far below the threshold to count as released
+    trigger_velocity: float = 0.0 # "velocity" edge: minimum rise speed in units per second
+    trigger_rearm: float = 0.0 # Minimum seconds between two pulses
+
+    # Aggregation: drive one output from several contacts.
+    # The binding's own contact is always an input; aggregate_inputs adds the others.
+    aggregate_mode: Optional[Literal["max", "sum", "average", "priority"]] = None
+    aggregate_inputs: List[AggregateInput] = []
+
+    # Spatial mapping: feed this contact into the named motor layout of the device
+    # instead of driving it directly (see core/spatial.py)
+    layout: Optional[str] = None
+
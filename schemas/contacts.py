@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Literal, Optional
+from typing import List, Literal, Optional
 
 
 class Contact(BaseModel):
@@ -9,6 +9,18 @@ class Contact(BaseModel):
     osc_path: Optional[str] = None
     input_type: Literal["bool", "int", "float"] = "float"
     cooldown: float = 0.0
+    # Array contact: groups array_size indexed parameters (osc_path with an {index} placeholder)
+    # into one vector; 0 for a single value
+    array_size: int = 0
+    # Where the contact sits in body coordinates (2D or 3D), for bindings that drive a motor layout
+    position: Optional[List[float]] = None
+
+    # Smoothing for float inputs, applied before bindings are evaluated
+    filter_type: Literal["none", "ema", "one_euro", "median3"] = "none"
+    filter_alpha: float = 0.5 # EMA: weight of the newest sample
+    filter_min_cutoff: float = 1.0 # One Euro: cutoff (Hz) when the value is steady
+    filter_beta: float = 0.0 # One Euro: how fast the cutoff rises with speed
+    filter_d_cutoff: float = 1.0 # One Euro: cutoff (Hz) for the speed estimate
 
 
 class EventContact(BaseModel):
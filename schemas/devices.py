@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class KnownDevice(BaseModel):
+    module_name: str
+    device_id: str
+    name: str = "Unknown"
+    # "online" once a scan found it, "last_known" when only remembered from the
+    # previous run, "missing" when a completed scan didn't report it. A status
+    # reported by the module itself (e.g. "idle") counts as online.
+    status: str = "last_known"
+    capabilities: List[str] = [] # reaction types the module can send to it
+    last_seen: Optional[float] = None # time.time() of the last scan that reported it
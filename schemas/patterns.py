@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+from typing import List, Tuple
+
+
+class Pattern(BaseModel):
+    name: str
+    # (time, intensity) pairs. Time is a fraction of one pass (0.0 - 1.0),
+    # a pass lasts Binding.duration seconds. Intensity is scaled by the binding's output.
+    keyframes: List[Tuple[float, float]]
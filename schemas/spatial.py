@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import List, Literal
+
+
+class MotorLayout(BaseModel):
+    name: str
+    # Motor positions in the same body coordinates as Contact.position (2D or 3D),
+    # in the order the device numbers its motors
+    motors: List[List[float]]
+    # "idw": inverse-distance weighting, each contact's intensity is split between motors.
+    # "gaussian": every motor gets exp(-d^2 / (2 sigma^2)) of the intensity.
+    falloff: Literal["idw", "gaussian"] = "idw"
+    power: float = 2.0 # idw: distance exponent
+    radius: float = 0.0 # idw: only motors closer than this share a contact (0 = the nearest `neighbors`)
+    neighbors: int = 2 # idw: motors sharing a contact when radius is 0
+    sigma: float = 0.1 # gaussian: falloff width
+    # Several contacts reaching one motor. "clamp": their shares add up, capped at 1.0.
+    # "normalize": a motor's weights are scaled to add up to at most 1, so overlapping
+    # contacts give a weighted mean instead of saturating the motor.
+    overlap: Literal["clamp", "normalize"] = "clamp"
@@ -2,32 +2,32 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from schemas.contacts import Contact
 from ui.osc_finder import OSCFinderDialog
+from ui.list_model import KeyedListModel, bind_listbox, coerce_items
 # from core.osc_sniffer import OSCSniffer
 
 class ContactsTab(ttk.Frame):
-    def __init__(self, parent, osc_sniffer, on_change=None):
+    def __init__(self, parent, osc_sniffer, on_change=None, model=None):
+        """model: KeyedListModel of the contacts to edit (keyed by id), shared with other views; a new one if None."""
         super().__init__(parent)
         
         self.on_change = on_change
-        self.contacts = [] # List of Contact objects
+        self.model = model if model is not None else KeyedListModel(key=lambda c: c.id) # Views subscribe for row changes
         self.selected_contact_index = None
         self.sniffer = osc_sniffer 
         self.sniffing = False
 
         self._create_widgets()
+        bind_listbox(self.model, self.contact_listbox, lambda c: c.name)
         # self._load_dummy_data() # Removed in favor of proper loading
 
+    @property
+    def contacts(self):
+        """List of Contact objects (owned by the model, don't modify directly)."""
+        return self.model.items
+
     def load_data(self, contacts_data):
-        self.contacts = []
-        for item in contacts_data:
-            try:
-                if isinstance(item, dict):
-                    self.contacts.append(Contact(**item))
-                elif isinstance(item, Contact):
-                    self.contacts.append(item)
-            except Exception as e:
-                print(f"Skipping invalid contact: {e}")
-        self._refresh_list()
+        # Only the contacts that differ from what's shown touch the list
+        self.model.set_items(coerce_items(contacts_data, Contact, "contact"))
         
     def _notify_change(self):
         if self.on_change:
@@ -102,6 +102,12 @@ class ContactsTab(ttk.Frame):
         self.input_type_menu.grid(row=row, column=1, sticky="ew", padx=5, pady=2)
         row += 1
 
+        # Array size (groups indexed parameters into one contact)
+        ttk.Label(right_frame, text="Array Size (0 = single):").grid(row=row, column=0, sticky="w", padx=5, pady=2)
+        self.array_size_var = tk.IntVar(value=0)
+        ttk.Entry(right_frame, textvariable=self.array_size_var).grid(row=row, column=1, sticky="ew", padx=5, pady=2)
+        row += 1
+
         # Cooldown
         ttk.Label(right_frame, text="Cooldown (s):").grid(row=row, column=0, sticky="w", padx=5, pady=2)
         self.cooldown_var = tk.DoubleVar(value=0.0)
@@ -109,6 +115,27 @@ class ContactsTab(ttk.Frame):
         self.cooldown_entry.grid(row=row, column=1, sticky="ew", padx=5, pady=2)
         row += 1
 
+        # Smoothing Filter (float inputs)
+        ttk.Label(right_frame, text="Smoothing Filter:").grid(row=row, column=0, sticky="w", padx=5, pady=2)
+        self.filter_type_var = tk.StringVar(value="none")
+        filter_options = ["none", "ema", "one_euro", "median3"]
+        ttk.OptionMenu(right_frame, self.filter_type_var, "none", *filter_options).grid(row=row, column=1, sticky="ew", padx=5, pady=2)
+        row += 1
+
+        ttk.Label(right_frame, text="EMA Alpha:").grid(row=row, column=0, sticky="w", padx=5, pady=2)
+        self.filter_alpha_var = tk.DoubleVar(value=0.5)
+        ttk.Entry(right_frame, textvariable=self.filter_alpha_var).grid(row=row, column=1, sticky="ew", padx=5, pady=2)
+        row += 1
+
+        ttk.Label(right_frame, text="One Euro Min Cutoff / Beta:").grid(row=row, column=0, sticky="w", padx=5, pady=2)
+        euro_frame = ttk.Frame(right_frame)
+        euro_frame.grid(row=row, column=1, sticky="ew", padx=5, pady=2)
+        self.filter_min_cutoff_var = tk.DoubleVar(value=1.0)
+        self.filter_beta_var = tk.DoubleVar(value=0.0)
+        ttk.Entry(euro_frame, textvariable=self.filter_min_cutoff_var, width=8).pack(side=tk.LEFT)
+        ttk.Entry(euro_frame, textvariable=self.filter_beta_var, width=8).pack(side=tk.LEFT, padx=5)
+        row += 1
+
         # Save Button
         save_btn = ttk.Button(right_frame, text="Save Changes", command=self._save_changes)
         save_btn.grid(row=row, column=0, columnspan=2, pady=10)
@@ -120,13 +147,7 @@ class ContactsTab(ttk.Frame):
         # Just for testing / placeholder
         c1 = Contact(name="Left Hand", id="lh_tact", type=1, osc_path="/avatar/parameters/LeftHandHaptic", input_type="float")
         c2 = Contact(name="Right Hand", id="rh_tact", type=1, osc_path="/avatar/parameters/RightHandHaptic", input_type="bool")
-        self.contacts = [c1, c2]
-        self._refresh_list()
-
-    def _refresh_list(self):
-        self.contact_listbox.delete(0, tk.END)
-        for contact in self.contacts:
-            self.contact_listbox.insert(tk.END, contact.name)
+        self.model.set_items([c1, c2])
 
     def _on_contact_select(self, event):
         selection = self.contact_listbox.curselection()
@@ -143,6 +164,11 @@ class ContactsTab(ttk.Frame):
         self.osc_path_var.set(contact.osc_path if contact.osc_path else "")
         self.input_type_var.set(contact.input_type)
         self.cooldown_var.set(contact.cooldown)
+        self.array_size_var.set(contact.array_size)
+        self.filter_type_var.set(contact.filter_type)
+        self.filter_alpha_var.set(contact.filter_alpha)
+        self.filter_min_cutoff_var.set(contact.filter_min_cutoff)
+        self.filter_beta_var.set(contact.filter_beta)
 
     def _add_contact(self):
         # Generate a unique ID
@@ -154,8 +180,7 @@ class ContactsTab(ttk.Frame):
             cnt += 1
 
         new_c = Contact(name="New Contact", id=new_id, type=0, input_type="float")
-        self.contacts.append(new_c)
-        self._refresh_list()
+        self.model.append(new_c)
         self.contact_listbox.selection_clear(0, tk.END)
         self.contact_listbox.selection_set(tk.END)
         self._on_contact_select(None)
@@ -167,8 +192,7 @@ class ContactsTab(ttk.Frame):
             return
             
         if messagebox.askyesno("Confirm", "Delete selected contact?"):
-            del self.contacts[selection[0]]
-            self.contact_listbox.delete(selection[0])
+            self.model.pop(selection[0])
             self.selected_contact_index = None
             
             # Clear form
@@ -177,6 +201,8 @@ class ContactsTab(ttk.Frame):
             self.type_var.set(0)
             self.osc_path_var.set("")
             self.cooldown_var.set(0.0)
+            self.array_size_var.set(0)
+            self.filter_type_var.set("none")
             
             self._notify_change()
 
@@ -197,19 +223,26 @@ class ContactsTab(ttk.Frame):
                 return
 
         try:
-            c = self.contacts[self.selected_contact_index]
-            c.name = self.name_var.get()
-            c.id = new_id
-            c.type = self.type_var.get()
-            c.osc_path = self.osc_path_var.get()
-            c.cooldown = self.cooldown_var.get()
-            c.input_type = self.input_type_var.get()
-            
-            validated_contact = Contact(**c.model_dump())
-            self.contacts[self.selected_contact_index] = validated_contact
+            # Build a new Contact instead of editing the stored one, so the model sees the change
+            data = self.contacts[self.selected_contact_index].model_dump()
+            data.update(
+                name=self.name_var.get(),
+                id=new_id,
+                type=self.type_var.get(),
+                osc_path=self.osc_path_var.get(),
+                cooldown=self.cooldown_var.get(),
+                array_size=self.array_size_var.get(),
+                input_type=self.input_type_var.get(),
+                filter_type=self.filter_type_var.get(),
+                filter_alpha=self.filter_alpha_var.get(),
+                filter_min_cutoff=self.filter_min_cutoff_var.get(),
+                filter_beta=self.filter_beta_var.get(),
+            )
+            validated_contact = Contact(**data)
+            self.model.replace(self.selected_contact_index, validated_contact)
+            self.contact_listbox.selection_set(self.selected_contact_index)
             
-            self._refresh_list()
-            messagebox.showinfo("Success", f"Updated {c.name}")
+            messagebox.showinfo("Success", f"Updated {validated_contact.name}")
             self._notify_change()
             
         except Exception as e:
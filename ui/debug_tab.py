@@ -16,6 +16,8 @@ class DebugTab(ttk.Frame):
         ttk.Button(toolbar, text="Clear", command=self._clear_log).pack(side=tk.LEFT, padx=2)
         self.pause_btn = ttk.Button(toolbar, text="Pause", command=self._toggle_pause)
         self.pause_btn.pack(side=tk.LEFT, padx=2)
+        self.dedup_label = ttk.Label(toolbar, text="")
+        self.dedup_label.pack(side=tk.RIGHT, padx=5)
         
         # Log Area (Treeview for structured data)
         columns = ("time", "address", "value")
@@ -43,6 +45,11 @@ class DebugTab(ttk.Frame):
         for item in self.tree.get_children():
             self.tree.delete(item)
 
+    def show_dedup_stats(self, passed, suppressed):
+        total = passed + suppressed
+        share = suppressed / total * 100 if total else 0.0
+        self.dedup_label.config(text=f"Repeats dropped: {suppressed} of {total} ({share:.0f}%)")
+
     def log_message(self, address, *args):
         if self.paused:
             return
@@ -1,10 +1,27 @@
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 
+from core.device_registry import DeviceRegistry, ScanJob
+
+POLL_MS = 100 # how often running scans and tests are checked
+
 class DevicesTab(ttk.Frame):
-    def __init__(self, parent, modules):
+    def __init__(self, parent, modules, registry=None):
+        """registry: core.device_registry.DeviceRegistry the device lists are read from (a private one if None)."""
         super().__init__(parent)
         self.modules = modules
+        self.own_registry = registry is None
+        self.registry = registry if registry is not None else DeviceRegistry()
+        self.sections = {} # module name -> device container
+        self.controls = {} # module name -> (scan button, progress bar, status label)
+        # Scans and tests run on worker threads, the UI only polls them
+        self.scans = {} # module name -> ScanJob
+        self.shown_found = {} # module name -> devices found when the list was last rendered
+        self.test_results = queue.Queue() # (module name, device id, error or None)
+        self.tests_running = 0
+        self._polling = False
         self._create_widgets()
 
     def _create_widgets(self):
@@ -14,56 +31,152 @@ class DevicesTab(ttk.Frame):
         # Scrollable container? For now just a frame
         self.list_frame = ttk.Frame(self)
         self.list_frame.pack(fill=tk.BOTH, expand=True, padx=10)
+        self.refresh()
+
+    def refresh(self):
+        """Rebuilds the module sections, e.g. after a module was reloaded."""
+        for widget in self.list_frame.winfo_children():
+            widget.destroy()
+        self.sections = {}
+        self.controls = {}
 
         if not self.modules:
             ttk.Label(self.list_frame, text="No modules found.").pack()
             return
 
-        for name, module in self.modules.items():
+        for name, module in list(self.modules.items()):
             self._create_module_section(name, module)
 
     def _create_module_section(self, name, module):
         # Main Frame for the Module
         section_frame = ttk.LabelFrame(self.list_frame, text=getattr(module, 'name', name))
         section_frame.pack(fill=tk.X, pady=5, ipadx=5, ipady=5)
-        
+
         # --- Header Row (Controls) ---
         header_frame = ttk.Frame(section_frame)
         header_frame.pack(fill=tk.X)
-        
+
         # Connect/Test Button
         if hasattr(module, 'run'):
             btn_connect = ttk.Button(header_frame, text="Open Interface", command=lambda m=module: self._on_connect(m))
             btn_connect.pack(side=tk.LEFT, padx=5)
 
-        # Scan Devices Button
+        # Scan Devices Button, turns into Cancel while the scan runs
         if hasattr(module, 'scan'):
-            btn_scan = ttk.Button(header_frame, text="Scan Devices", command=lambda m=module, f=section_frame: self._on_scan(m, f))
+            btn_scan = ttk.Button(header_frame, text="Scan Devices", command=lambda n=name, m=module: self._on_scan(n, m))
             btn_scan.pack(side=tk.LEFT, padx=5)
+            progress = ttk.Progressbar(header_frame, mode="indeterminate", length=100)
+            status_lbl = ttk.Label(header_frame, text="")
+            status_lbl.pack(side=tk.RIGHT, padx=5)
+            self.controls[name] = (btn_scan, progress, status_lbl)
+            if name in self.scans:
+                self._set_scanning(name, True)
 
         # --- Device List Container ---
         # We will create a frame specifically to hold the device rows so we can clear it easily
         device_container = ttk.Frame(section_frame)
         device_container.pack(fill=tk.X, expand=True, pady=5)
-        
+
         # Store a reference to the container on the frame so we can find it later (hacky but works)
         section_frame.device_container = device_container
-        
+        self.sections[name] = device_container
+
+        if self.own_registry:
+            # Nobody else feeds the private registry, start from what the module already knows
+            self.registry.update_module(name, getattr(module, 'devices', None), module, complete=False)
+
         # Initial population if devices already exist
-        if hasattr(module, 'devices'):
-            self._render_devices(module.devices, device_container, module)
+        self.show_devices(name)
 
-    def _on_scan(self, module, section_frame):
-        try:
-            # Call scan() on module
-            devices = module.scan()
-            # Update UI
-            if hasattr(section_frame, 'device_container'):
-                self._render_devices(devices, section_frame.device_container, module)
-        except Exception as e:
-            messagebox.showerror("Error", f"Scan failed: {e}")
+    def show_devices(self, module_name):
+        """Re-renders one module's device list, e.g. after the registry reported changes for it."""
+        container = self.sections.get(module_name)
+        module = self.modules.get(module_name)
+        if container is None or module is None:
+            return
+        devices = [{'id': d.device_id, 'name': d.name, 'status': d.status}
+                   for d in self.registry.devices(module_name)]
+        self._render_devices(devices, container, module, module_name)
 
-    def _render_devices(self, devices, container, module=None):
+    def _on_scan(self, name, module):
+        job = self.scans.get(name)
+        if job is not None:
+            job.cancel()
+            self._poll()
+            return
+        self.scans[name] = ScanJob(self.registry, name, module)
+        self.shown_found[name] = 0
+        self._set_scanning(name, True)
+        self._start_polling()
+
+    def _set_scanning(self, name, scanning, message=""):
+        if name not in self.controls:
+            return
+        btn_scan, progress, status_lbl = self.controls[name]
+        if scanning:
+            btn_scan.configure(text="Cancel Scan")
+            progress.pack(side=tk.LEFT, padx=5)
+            progress.start(15)
+            status_lbl.configure(text="Scanning...")
+        else:
+            btn_scan.configure(text="Scan Devices")
+            progress.stop()
+            progress.pack_forget()
+            status_lbl.configure(text=message)
+
+    def _on_test(self, name, module, device_id):
+        def run():
+            try:
+                module.test_device(device_id)
+                self.test_results.put((name, device_id, None))
+            except Exception as e:
+                self.test_results.put((name, device_id, e))
+
+        self.tests_running += 1
+        if name in self.controls:
+            self.controls[name][2].configure(text=f"Testing {device_id}...")
+        threading.Thread(target=run, name=f"test-{name}", daemon=True).start()
+        self._start_polling()
+
+    def _start_polling(self):
+        if not self._polling:
+            self._polling = True
+            self.after(POLL_MS, self._poll)
+
+    def _poll(self):
+        self._polling = False
+        for name, job in list(self.scans.items()):
+            if job.found != self.shown_found.get(name):
+                # Stream devices into the list as the module reports them
+                self.shown_found[name] = job.found
+                self.show_devices(name)
+            if not job.done.is_set():
+                if name in self.controls:
+                    self.controls[name][2].configure(text=f"Scanning... {job.found} found")
+                continue
+            del self.scans[name]
+            if job.cancelled:
+                self._set_scanning(name, False, "Scan cancelled")
+            elif job.error is not None:
+                self._set_scanning(name, False, "Scan failed")
+                messagebox.showerror("Error", f"Scan failed: {job.error}")
+            else:
+                self._set_scanning(name, False, f"Found {len(job.devices or [])} devices")
+            self.show_devices(name)
+
+        while not self.test_results.empty():
+            name, device_id, error = self.test_results.get_nowait()
+            self.tests_running -= 1
+            if name in self.controls:
+                self.controls[name][2].configure(
+                    text=f"Test of {device_id} failed" if error else f"Tested {device_id}")
+            if error is not None:
+                messagebox.showerror("Error", f"Test failed: {error}")
+
+        if self.scans or self.tests_running:
+            self._start_polling()
+
+    def _render_devices(self, devices, container, module=None, module_name=None):
         # Clear existing
         for widget in container.winfo_children():
             widget.destroy()
@@ -84,18 +197,18 @@ class DevicesTab(ttk.Frame):
         for dev in devices:
             row = ttk.Frame(container)
             row.pack(fill=tk.X, padx=20, pady=1)
-            
+
             dev_id = dev.get('id', 'Unknown')
             dev_name = dev.get('name', 'Unknown')
             dev_status = dev.get('status', '-')
-            
+
             ttk.Label(row, text=dev_id, width=15).pack(side=tk.LEFT)
             ttk.Label(row, text=dev_name, width=25).pack(side=tk.LEFT)
             ttk.Label(row, text=dev_status, width=15).pack(side=tk.LEFT)
-            
+
             if module and hasattr(module, 'test_device'):
-                 ttk.Button(row, text="Test", width=6, 
-                            command=lambda m=module, d=dev_id: m.test_device(d)).pack(side=tk.LEFT)
+                 ttk.Button(row, text="Test", width=6,
+                            command=lambda n=module_name, m=module, d=dev_id: self._on_test(n, m, d)).pack(side=tk.LEFT)
 
     def _on_connect(self, module):
         try:
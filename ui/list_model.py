@@ -0,0 +1,183 @@
+"""
+Keyed list model for the config tabs.
+
+The model holds the ordered contacts or bindings a tab edits and tells its
+listeners exactly what changed: ADDED, REMOVED, MODIFIED or MOVED, with the
+row index. Views update just those rows instead of clearing and rebuilding,
+so the widget work per edit doesn't grow with the number of entries.
+
+Listeners are called as listener(kind, key, index, item, old_index); old_index
+is only set for MOVED. Events are sent one step at a time, so when a listener
+runs the model already reflects that step and nothing after it.
+"""
+import tkinter as tk
+from typing import Any, Callable, Hashable, Iterable, List, Optional
+
+ADDED = "added"
+REMOVED = "removed"
+MODIFIED = "modified"
+MOVED = "moved"
+
+
+class KeyedListModel:
+    def __init__(self, key: Callable[[Any], Hashable]):
+        """key(item) identifies an item across reloads; repeated keys are told apart by occurrence."""
+        self.key = key
+        self.items: List[Any] = [] # Same list object for the model's lifetime, edit it only through the model
+        self.keys: List[Hashable] = []
+        self._dumps = {} # key -> field values when last seen, to notice in-place edits
+        self._listeners: List[Callable] = []
+
+    def subscribe(self, listener: Callable):
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _emit(self, kind, key, index, item, old_index=None):
+        for listener in list(self._listeners):
+            try:
+                listener(kind, key, index, item, old_index)
+            except Exception as e:
+                print(f"Error in list model listener: {e}")
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def index(self, key: Hashable) -> int:
+        return self.keys.index(key)
+
+    def _unique_keys(self, items: Iterable[Any]) -> List[Hashable]:
+        keys, seen = [], {}
+        for item in items:
+            k = self.key(item)
+            n = seen.get(k, 0)
+            seen[k] = n + 1
+            keys.append(k if n == 0 else (k, n))
+        return keys
+
+    def _key_for(self, item, skip: Optional[int] = None) -> Hashable:
+        k = self.key(item)
+        own = self.keys[skip] if skip is not None else None
+        n, key = 0, k
+        while key in self._dumps and key != own:
+            n += 1
+            key = (k, n)
+        return key
+
+    # --- Single edits ---
+
+    def insert(self, index: int, item):
+        index = max(0, min(index, len(self.items)))
+        key = self._key_for(item)
+        self.items.insert(index, item)
+        self.keys.insert(index, key)
+        self._dumps[key] = item.model_dump()
+        self._emit(ADDED, key, index, item)
+
+    def append(self, item):
+        self.insert(len(self.items), item)
+
+    def pop(self, index: int):
+        item = self.items.pop(index)
+        key = self.keys.pop(index)
+        self._dumps.pop(key, None)
+        self._emit(REMOVED, key, index, item)
+        return item
+
+    def replace(self, index: int, item):
+        """Swaps the item at index. A new key counts as the old entry removed and a new one added."""
+        key = self._key_for(item, skip=index)
+        if key != self.keys[index]:
+            self.pop(index)
+            self.insert(index, item)
+            return
+        self.items[index] = item
+        self._dumps[key] = item.model_dump()
+        self._emit(MODIFIED, key, index, item)
+
+    def move(self, old_index: int, new_index: int):
+        if old_index == new_index:
+            return
+        item = self.items.pop(old_index)
+        key = self.keys.pop(old_index)
+        self.items.insert(new_index, item)
+        self.keys.insert(new_index, key)
+        self._emit(MOVED, key, new_index, item, old_index)
+
+    # --- Bulk load ---
+
+    def set_items(self, items: Iterable[Any]):
+        """Brings the model to `items`, sending only the changes needed to get there."""
+        items = list(items)
+        new_keys = self._unique_keys(items)
+        wanted = set(new_keys)
+
+        for i in range(len(self.keys) - 1, -1, -1):
+            if self.keys[i] not in wanted:
+                self.pop(i)
+
+        present = set(self.keys)
+        for i, (key, item) in enumerate(zip(new_keys, items)):
+            if key not in present:
+                self.items.insert(i, item)
+                self.keys.insert(i, key)
+                self._dumps[key] = item.model_dump()
+                present.add(key)
+                self._emit(ADDED, key, i, item)
+                continue
+            if self.keys[i] != key:
+                self.move(self.keys.index(key, i), i)
+            self.items[i] = item
+            dump = item.model_dump()
+            if dump != self._dumps.get(key):
+                self._dumps[key] = dump
+                self._emit(MODIFIED, key, i, item)
+
+
+def coerce_items(data: Iterable[Any], cls, what: str) -> List[Any]:
+    """Instances of the pydantic model cls from a mix of dicts and instances; invalid entries are skipped."""
+    items = []
+    for item in data:
+        try:
+            if isinstance(item, dict):
+                items.append(cls(**item))
+            elif isinstance(item, cls):
+                items.append(item)
+        except Exception as e:
+            print(f"Skipping invalid {what}: {e}")
+    return items
+
+
+def bind_listbox(model: KeyedListModel, listbox: tk.Listbox, label: Callable[[Any], str]):
+    """Keeps listbox showing label(item) for each item of model, one row per change."""
+    def on_change(kind, key, index, item, old_index):
+        if kind == ADDED:
+            listbox.insert(index, label(item))
+        elif kind == REMOVED:
+            listbox.delete(index)
+        elif kind == MOVED:
+            text = listbox.get(old_index)
+            listbox.delete(old_index)
+            listbox.insert(index, text)
+        elif kind == MODIFIED:
+            text = label(item)
+            if listbox.get(index) != text:
+                selected = listbox.selection_includes(index)
+                listbox.delete(index)
+                listbox.insert(index, text)
+                if selected:
+                    listbox.selection_set(index)
+
+    # Rows already in the model, e.g. for a tab built after the data was loaded
+    for item in model.items:
+        listbox.insert(tk.END, label(item))
+    model.subscribe(on_change)
+    return on_change
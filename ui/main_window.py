@@ -5,47 +5,82 @@ import queue
 import threading
 import time
 
-from .visualizer import VisualizerTab
-from .contacts import ContactsTab
-from .mappings import MappingsTab
-from .devices import DevicesTab
-from .debug_tab import DebugTab
-from .app_settings import AppSettingsTab
+from .list_model import KeyedListModel, coerce_items
 from core.osc_sniffer import OSCSniffer
+from core.config_watcher import parse_config
+from core.dedup import IngestDedup
+from core.dispatch import binding_key
+from core.startup import phase
+from schemas.bindings import Binding
+from schemas.contacts import Contact
 
 logger = logging.getLogger(__name__)
 
+DEVICE_SAVE_DELAY = 2.0 # seconds without registry changes and running scans before devices are saved
+
+# (name, title) of the notebook tabs, in order; the first one is built at startup
+TABS = (
+    ("visualizer", "Visualizer"),
+    ("contacts", "Contacts"),
+    ("mappings", "Mappings"),
+    ("devices", "Devices"),
+    ("debug", "Debug"),
+    ("settings", "Settings"),
+)
+
 class MainWindow(tk.Tk):
-    def __init__(self, config_manager, osc_handler):
+    def __init__(self, config_manager, osc_handler, registry=None, profiler=None):
+        """profiler: Optional core.startup.StartupProfiler; records tab build times and when the OSC listener is up."""
         super().__init__()
 
         self.config = config_manager
         self.osc_handler = osc_handler
+        self.registry = registry # core.device_registry.DeviceRegistry
+        self.profiler = profiler
         
         self.title("vrcHaptics - Main Window")
         self.geometry("1000x700")
         
         # UI Update Queue to prevent freezing
         self.ui_queue = queue.Queue()
+        self.module_events = queue.Queue() # (module_name, instance) from the module watcher thread
+        self.config_events = queue.Queue() # (contacts, bindings) from the config watcher thread
+        self.device_events = queue.Queue() # module names with registry changes, from scan threads
+        self._devices_changed_at = None # time of the last registry change not saved yet
         self.visualizer_lock = threading.Lock()
         
         # Start OSC Sniffer (Create early to pass to tabs)
         self.osc_port = self.config.get_app_settings().get("osc_port", 9001)
         self.osc_sniffer = OSCSniffer(port=self.osc_port)
         self.osc_sniffer.add_listener(self._on_osc_message_buffered)
+        # Drop values VRChat resends unchanged before they reach the queue below
+        dedup_window = self.config.get_app_settings().get("osc_dedup_window", 0)
+        if dedup_window > 0:
+            self.osc_sniffer.dedup = IngestDedup(dedup_window, exempt=self.osc_handler.needs_repeats)
+            self.osc_handler.metrics.add_collector(self.osc_sniffer.dedup.collect_metrics)
         self.osc_sniffer.start()
+        if self.profiler is not None and self.osc_sniffer.running:
+            self.profiler.mark("listening for OSC")
+        record_path = self.config.get_app_settings().get("record_session")
+        if record_path:
+            try:
+                self.osc_sniffer.start_recording(record_path)
+            except OSError as e:
+                print(f"Failed to start session recording: {e}")
         
-        # Initialize GUI
-        self._init_ui()
-        
-        # Load Data into Tabs
+        if self.registry is not None:
+            self.registry.subscribe(lambda kind, device: self.device_events.put(device.module_name))
+
+        # Contacts and bindings being edited; the tabs showing them may not be built yet
+        self.contacts_model = KeyedListModel(key=lambda c: c.id)
+        self.bindings_model = KeyedListModel(key=binding_key)
         if hasattr(self.osc_handler, 'contacts'):
-             self.contacts_tab.load_data(self.osc_handler.contacts)
-             self.visualizer_tab.update_contacts(self.osc_handler.contacts)
-             
+             self._load_contacts(self.osc_handler.contacts)
         if hasattr(self.osc_handler, 'bindings'):
-             # MappingsTab needs valid contacts first, which we just loaded
-             self.mappings_tab.load_data(self.osc_handler.bindings)
+             self._load_bindings(self.osc_handler.bindings)
+
+        # Initialize GUI
+        self._init_ui()
         
         # Setup window close handler
         self.protocol("WM_DELETE_WINDOW", self._on_close)
@@ -57,43 +92,145 @@ class MainWindow(tk.Tk):
         # Create Notebook (Tabs)
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        # Initialize Tabs
-        self.visualizer_tab = VisualizerTab(self.notebook)
-        
-        # Pass osc_sniffer to ContactsTab
-        self.contacts_tab = ContactsTab(
-            self.notebook, 
-            self.osc_sniffer, 
-            on_change=self._on_config_changed
-        )
-        
-        # Pass modules and contacts_provider to MappingsTab
-        self.mappings_tab = MappingsTab(
-            self.notebook, 
-            self.osc_handler.loaded_modules, 
-            lambda: self.contacts_tab.contacts,
-            on_change=self._on_config_changed
+
+        # One empty frame per tab; the tab itself is built the first time it is selected
+        self.tabs = {} # name -> tab widget, once built
+        self.tab_frames = {} # name -> frame in the notebook
+        for name, text in TABS:
+            frame = ttk.Frame(self.notebook)
+            self.notebook.add(frame, text=text)
+            self.tab_frames[name] = frame
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+        self._build_tab(TABS[0][0])
+
+    def _on_tab_changed(self, event=None):
+        selected = self.notebook.select()
+        for name, frame in self.tab_frames.items():
+            if str(frame) == selected:
+                self._build_tab(name)
+
+    def _build_tab(self, name):
+        tab = self.tabs.get(name)
+        if tab is None:
+            with phase(self.profiler, f"build {name} tab"):
+                tab = getattr(self, f"_create_{name}_tab")(self.tab_frames[name])
+                tab.pack(fill=tk.BOTH, expand=True)
+            self.tabs[name] = tab
+        return tab
+
+    # Tab modules are imported when the tab is first built, not at startup
+
+    def _create_visualizer_tab(self, parent):
+        from .visualizer import VisualizerTab
+        tab = VisualizerTab(parent)
+        # The visualizer follows the contacts model row by row
+        tab.bind_model(self.contacts_model)
+        return tab
+
+    def _create_contacts_tab(self, parent):
+        from .contacts import ContactsTab
+        return ContactsTab(parent, self.osc_sniffer, on_change=self._on_config_changed, model=self.contacts_model)
+
+    def _create_mappings_tab(self, parent):
+        from .mappings import MappingsTab
+        return MappingsTab(
+            parent,
+            self.osc_handler.loaded_modules,
+            lambda: self.contacts_model.items,
+            on_change=self._on_config_changed,
+            patterns_provider=self.osc_handler.pattern_engine.names,
+            registry=self.registry,
+            model=self.bindings_model
         )
-        
-        self.devices_tab = DevicesTab(self.notebook, self.osc_handler.loaded_modules)
-        self.debug_tab = DebugTab(self.notebook)
-        
+
+    def _create_devices_tab(self, parent):
+        from .devices import DevicesTab
+        return DevicesTab(parent, self.osc_handler.loaded_modules, self.registry)
+
+    def _create_debug_tab(self, parent):
+        from .debug_tab import DebugTab
+        return DebugTab(parent)
+
+    def _create_settings_tab(self, parent):
+        from .app_settings import AppSettingsTab
         # Define commands for AppSettingsTab
         settings_commands = {
             'import': self._import_config_dialog,
             'export': self._export_config_dialog,
             'save_app_settings': self._save_app_settings
         }
-        self.app_settings_tab = AppSettingsTab(self.notebook, settings_commands)
-        
-        # Add Tabs
-        self.notebook.add(self.visualizer_tab, text="Visualizer")
-        self.notebook.add(self.contacts_tab, text="Contacts")
-        self.notebook.add(self.mappings_tab, text="Mappings")
-        self.notebook.add(self.devices_tab, text="Devices")
-        self.notebook.add(self.debug_tab, text="Debug")
-        self.notebook.add(self.app_settings_tab, text="Settings")
+        return AppSettingsTab(parent, settings_commands)
+
+    def _load_contacts(self, contacts_data):
+        # Only the contacts that differ from what's shown touch the views
+        self.contacts_model.set_items(coerce_items(contacts_data, Contact, "contact"))
+
+    def _load_bindings(self, bindings_data):
+        self.bindings_model.set_items(coerce_items(bindings_data, Binding, "binding"))
+
+    def on_module_changed(self, module_name, instance):
+        """Called from the module watcher thread; the UI is refreshed from the update loop."""
+        self.module_events.put((module_name, instance))
+
+    def _apply_module_events(self):
+        changed = False
+        while not self.module_events.empty():
+            module_name, instance = self.module_events.get_nowait()
+            changed = True
+            if self.registry is not None:
+                # A removed module's devices stay listed as missing
+                devices = getattr(instance, 'devices', None) if instance is not None else []
+                self.registry.update_module(module_name, devices, instance)
+        if changed:
+            self.osc_handler.update_modules(self.osc_handler.loaded_modules)
+            devices_tab = self.tabs.get("devices")
+            if devices_tab is not None:
+                devices_tab.refresh()
+
+    def _apply_device_events(self):
+        modules = set()
+        while not self.device_events.empty():
+            modules.add(self.device_events.get_nowait())
+        if not modules:
+            return
+        # Tabs built later read the registry when they are created
+        mappings_tab = self.tabs.get("mappings")
+        if mappings_tab is not None:
+            mappings_tab.refresh_devices()
+        devices_tab = self.tabs.get("devices")
+        if devices_tab is not None:
+            for module_name in modules:
+                devices_tab.show_devices(module_name)
+        self._devices_changed_at = time.monotonic()
+
+    def _save_devices(self, force=False):
+        """Remembers the devices for the next start, once scans are done and changes have settled."""
+        if self._devices_changed_at is None:
+            return
+        if not force and (self.registry.scanning or time.monotonic() - self._devices_changed_at < DEVICE_SAVE_DELAY):
+            return
+        self._devices_changed_at = None
+        self.config.save_config(devices=self.registry.to_config())
+
+    def on_config_file_changed(self, contacts, bindings):
+        """Called from the config watcher thread when user_config.json was edited outside the app."""
+        self.config_events.put((contacts, bindings))
+
+    def _apply_config_events(self):
+        latest = None
+        while not self.config_events.empty():
+            latest = self.config_events.get_nowait()
+        if latest is None:
+            return
+        contacts, bindings = latest
+        diff = self.osc_handler.update_config(contacts, bindings)
+        if not any(diff["contacts"]) and not any(diff["bindings"]):
+            return # e.g. the app's own save
+        print("Applied external changes to the config file.")
+        self._load_contacts(contacts)
+        self._load_bindings(bindings)
+        # Hand the handler the models' lists, so later edits in the UI reach it as before
+        self.osc_handler.update_config(self.contacts_model.items, self.bindings_model.items)
 
     def _import_config_dialog(self):
         from tkinter import filedialog
@@ -106,20 +243,21 @@ class MainWindow(tk.Tk):
             
             # Reload Tabs
             if "contacts" in data:
-                 self.contacts_tab.load_data(data["contacts"])
+                 self._load_contacts(data["contacts"])
                  # Update OSCHandler
                  # Ideally we should reconstruct Contact objects here if config manager returned dicts
                  # But load_data handles dicts now.
                  # The handler needs actual objects.
                  # We can get them back from the tab? 
                  # Or just rely on re-saving logic. 
-                 self.visualizer_tab.update_contacts(self.contacts_tab.contacts)
+                 # The visualizer follows the contacts model on its own.
 
             if "bindings" in data:
-                 self.mappings_tab.load_data(data["bindings"])
+                 # parse_config drops bindings that repeat another one's binding_key
+                 self._load_bindings(parse_config({"bindings": data["bindings"]})[1])
                  
             # Note: We probably need to explicitly update self.osc_handler's knowledge
-            # self.osc_handler.update_config(self.contacts_tab.contacts, self.mappings_tab.bindings)
+            # self.osc_handler.update_config(self.contacts_model.items, self.bindings_model.items)
             # But the tabs manage their own lists. 
             # We should probably have a "Save/Apply" button generally?
             # Or assume import implies load-into-ui-only until saved.
@@ -135,7 +273,7 @@ class MainWindow(tk.Tk):
             return
             
         try:
-            self.config.export_config(filepath, self.contacts_tab.contacts, self.mappings_tab.bindings)
+            self.config.export_config(filepath, self.contacts_model.items, self.bindings_model.items)
             messagebox.showinfo("Export", "Configuration exported successfully.")
         except Exception as e:
             messagebox.showerror("Export Error", str(e))
@@ -144,8 +282,8 @@ class MainWindow(tk.Tk):
         try:
             # Re-save everything including app settings
             self.config.save_config(
-                contacts=self.contacts_tab.contacts,
-                bindings=self.mappings_tab.bindings,
+                contacts=self.contacts_model.items,
+                bindings=self.bindings_model.items,
                 app_settings=new_settings
             )
             messagebox.showinfo("Saved", "Settings saved successfully. Restart required for some changes.")
@@ -159,13 +297,10 @@ class MainWindow(tk.Tk):
         """
         if hasattr(self.osc_handler, 'update_config'):
              self.osc_handler.update_config(
-                 self.contacts_tab.contacts,
-                 self.mappings_tab.bindings
+                 self.contacts_model.items,
+                 self.bindings_model.items
              )
-        
-        # Also update visualizer contacts if needed
-        if hasattr(self.visualizer_tab, 'update_contacts'):
-             self.visualizer_tab.update_contacts(self.contacts_tab.contacts)
+        # The visualizer already got the row changes from the contacts model
 
     def _on_osc_message_buffered(self, address, value):
         """
@@ -180,6 +315,17 @@ class MainWindow(tk.Tk):
         Main thread loop to process buffered OSC messages.
         """
         try:
+            self._apply_module_events()
+            self._apply_device_events()
+            self._save_devices()
+            self._apply_config_events()
+            # Only tabs that have been opened are updated
+            visualizer_tab = self.tabs.get("visualizer")
+            debug_tab = self.tabs.get("debug")
+            dedup = self.osc_sniffer.dedup
+            if dedup is not None and debug_tab is not None:
+                debug_tab.show_dedup_stats(dedup.passed, dedup.suppressed)
+
             # Process up to N messages to prevent starving the GUI if flood happens
             count = 0
             while not self.ui_queue.empty() and count < 100:
@@ -187,14 +333,14 @@ class MainWindow(tk.Tk):
                 
                 # Update Visualizer (Thread Safe via Loop)
                 # value is the tuple of args from python-osc
-                if hasattr(self.visualizer_tab, 'process_osc_message'):
+                if hasattr(visualizer_tab, 'process_osc_message'):
                      # visualizer expects (address, args_list)
-                     self.visualizer_tab.process_osc_message(address, value)
+                     visualizer_tab.process_osc_message(address, value)
 
                 # Update Debug Tab
-                if hasattr(self.debug_tab, 'log_message'):
+                if hasattr(debug_tab, 'log_message'):
                     # debug_tab expects (address, *args)
-                    self.debug_tab.log_message(address, *value)
+                    debug_tab.log_message(address, *value)
                 
                 # Process Logic (Bindings/Triggers)
                 # osc_handler.map_message expects (address, args_list)
@@ -214,6 +360,7 @@ class MainWindow(tk.Tk):
 
     def _on_close(self):
         try:
+            self._save_devices(force=True)
             self.osc_sniffer.stop()
             # Stop any other threads or handlers
             if hasattr(self.osc_handler, 'shutdown'):
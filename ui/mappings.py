@@ -1,34 +1,50 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from typing import List, Dict, Any
-from schemas.bindings import Binding
+from typing import List, Dict, Any, Optional
+from schemas.bindings import Binding, AggregateInput
+from schemas.devices import KnownDevice
+from core.dispatch import binding_key
+from core.device_registry import display_name
+from ui.list_model import KeyedListModel, bind_listbox, coerce_items
+
+NO_PATTERN = "<None>"
+NO_AGGREGATE = "<None>"
 
 class MappingsTab(ttk.Frame):
-    def __init__(self, parent, modules, contacts_provider, on_change=None):
+    def __init__(self, parent, modules, contacts_provider, on_change=None, patterns_provider=None, registry=None,
+                 model=None):
         """
         contacts_provider: A function or object that returns the current list of contacts.
                            Since ContactsTab holds the state, we can pass a lambda accessing it.
+        patterns_provider: Optional function returning the names of the available haptic patterns.
+        registry: Optional core.device_registry.DeviceRegistry offering the devices to pick from.
+        model: KeyedListModel of the bindings to edit (keyed by binding_key); a new one if None.
         """
         super().__init__(parent)
         self.modules = modules
+        self.registry = registry
+        self.device_choices: List[KnownDevice] = [] # Entries of the device combobox, in order
+        self.selected_device: Optional[KnownDevice] = None
         self.get_contacts = contacts_provider
+        self.get_patterns = patterns_provider
         self.on_change = on_change
-        self.bindings: List[Binding] = []
+        self.model = model if model is not None else KeyedListModel(key=binding_key) # Views subscribe for row changes
         self.selected_binding_index = None
 
         self._create_widgets()
+        bind_listbox(self.model, self.bindings_listbox, self._label)
+
+    @property
+    def bindings(self) -> List[Binding]:
+        """List of Binding objects (owned by the model, don't modify directly)."""
+        return self.model.items
+
+    @staticmethod
+    def _label(b: Binding) -> str:
+        return f"{b.contact_name} -> {b.device_name} ({b.reaction_type})"
 
     def load_data(self, bindings_data):
-        self.bindings = []
-        for item in bindings_data:
-            try:
-                if isinstance(item, dict):
-                    self.bindings.append(Binding(**item))
-                elif isinstance(item, Binding):
-                    self.bindings.append(item)
-            except Exception as e:
-                print(f"Skipping invalid binding: {e}")
-        self._refresh_list()
+        self.model.set_items(coerce_items(bindings_data, Binding, "binding"))
 
     def _notify_change(self):
         if self.on_change:
@@ -73,8 +89,13 @@ class MappingsTab(ttk.Frame):
         ttk.Label(right_frame, text="Target (Device):").grid(row=row, column=0, sticky="w", padx=5, pady=5)
         self.device_combobox = ttk.Combobox(right_frame, state="readonly")
         self.device_combobox.grid(row=row, column=1, sticky="ew", padx=5, pady=5)
-        # Bind popup event to refresh list (devices might be scanned any time)
-        self.device_combobox.bind('<Button-1>', self._refresh_devices_combo)
+        self.device_combobox.bind('<<ComboboxSelected>>', self._on_device_selected)
+        if self.registry is None:
+            # Bind popup event to refresh list (devices might be scanned any time)
+            self.device_combobox.bind('<Button-1>', self._refresh_devices_combo)
+        else:
+            # The main window calls refresh_devices when the registry changes
+            self._refresh_devices_combo()
         row += 1
 
         # 3. Settings
@@ -84,6 +105,13 @@ class MappingsTab(ttk.Frame):
         self.reaction_combo.grid(row=row, column=1, sticky="ew", padx=5, pady=5)
         row += 1
 
+        ttk.Label(right_frame, text="Pattern:").grid(row=row, column=0, sticky="w", padx=5, pady=5)
+        self.pattern_var = tk.StringVar(value=NO_PATTERN)
+        self.pattern_combo = ttk.Combobox(right_frame, textvariable=self.pattern_var, values=[NO_PATTERN], state="readonly")
+        self.pattern_combo.grid(row=row, column=1, sticky="ew", padx=5, pady=5)
+        self.pattern_combo.bind('<Button-1>', self._refresh_patterns_combo)
+        row += 1
+
         ttk.Label(right_frame, text="Intensity (0.0 - 1.0):").grid(row=row, column=0, sticky="w", padx=5, pady=5)
         self.intensity_var = tk.DoubleVar(value=1.0)
         self.intensity_scale = ttk.Scale(right_frame, from_=0.0, to=1.0, variable=self.intensity_var, orient=tk.HORIZONTAL)
@@ -96,6 +124,29 @@ class MappingsTab(ttk.Frame):
         self.duration_entry.grid(row=row, column=1, sticky="ew", padx=5, pady=5)
         row += 1
 
+        self.auto_stop_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(right_frame, text="Stop automatically after duration", variable=self.auto_stop_var).grid(row=row, column=0, columnspan=2, sticky="w", padx=5)
+        row += 1
+
+        ttk.Label(right_frame, text="Ramp Down (sec):").grid(row=row, column=0, sticky="w", padx=5, pady=5)
+        self.ramp_down_var = tk.DoubleVar(value=0.0)
+        ttk.Entry(right_frame, textvariable=self.ramp_down_var).grid(row=row, column=1, sticky="ew", padx=5, pady=5)
+        row += 1
+
+        ttk.Label(right_frame, text="Deadband / Min Change:").grid(row=row, column=0, sticky="w", padx=5, pady=5)
+        band_frame = ttk.Frame(right_frame)
+        band_frame.grid(row=row, column=1, sticky="w", padx=5, pady=5)
+        self.deadband_var = tk.DoubleVar(value=0.0)
+        self.min_change_var = tk.DoubleVar(value=0.005)
+        ttk.Entry(band_frame, textvariable=self.deadband_var, width=8).pack(side=tk.LEFT)
+        ttk.Entry(band_frame, textvariable=self.min_change_var, width=8).pack(side=tk.LEFT, padx=5)
+        row += 1
+
+        self.pass_repeats_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(right_frame, text="Receive repeated values (skip deduplication)",
+                        variable=self.pass_repeats_var).grid(row=row, column=0, columnspan=2, sticky="w", padx=5)
+        row += 1
+
         # --- Advanced Mapping (Collapsible or just separated) ---
         ttk.Separator(right_frame, orient=tk.HORIZONTAL).grid(row=row, column=0, columnspan=2, sticky="ew", pady=10)
         row += 1
@@ -144,6 +195,51 @@ class MappingsTab(ttk.Frame):
         
         self._toggle_mapping_fields() # Initial State
 
+        # --- Pulse Trigger Rules ---
+        ttk.Separator(right_frame, orient=tk.HORIZONTAL).grid(row=row, column=0, columnspan=2, sticky="ew", pady=10)
+        row += 1
+        ttk.Label(right_frame, text="Pulse Trigger", font=("Arial", 10, "bold")).grid(row=row, column=0, columnspan=2, sticky="w", padx=5)
+        row += 1
+
+        ttk.Label(right_frame, text="Edge:").grid(row=row, column=0, sticky="w", padx=5, pady=5)
+        self.trigger_edge_var = tk.StringVar(value="rising")
+        ttk.Combobox(right_frame, textvariable=self.trigger_edge_var, values=["rising", "falling", "both", "velocity"], state="readonly").grid(row=row, column=1, sticky="ew", padx=5, pady=5)
+        row += 1
+
+        ttk.Label(right_frame, text="Threshold / Hysteresis:").grid(row=row, column=0, sticky="w", padx=5, pady=5)
+        trigger_frame = ttk.Frame(right_frame)
+        trigger_frame.grid(row=row, column=1, sticky="w", padx=5, pady=5)
+        self.trigger_threshold_var = tk.DoubleVar(value=0.0)
+        self.trigger_hysteresis_var = tk.DoubleVar(value=0.0)
+        ttk.Entry(trigger_frame, textvariable=self.trigger_threshold_var, width=8).pack(side=tk.LEFT)
+        ttk.Entry(trigger_frame, textvariable=self.trigger_hysteresis_var, width=8).pack(side=tk.LEFT, padx=5)
+        row += 1
+
+        ttk.Label(right_frame, text="Min Velocity (/s) / Re-arm (s):").grid(row=row, column=0, sticky="w", padx=5, pady=5)
+        rearm_frame = ttk.Frame(right_frame)
+        rearm_frame.grid(row=row, column=1, sticky="w", padx=5, pady=5)
+        self.trigger_velocity_var = tk.DoubleVar(value=0.0)
+        self.trigger_rearm_var = tk.DoubleVar(value=0.0)
+        ttk.Entry(rearm_frame, textvariable=self.trigger_velocity_var, width=8).pack(side=tk.LEFT)
+        ttk.Entry(rearm_frame, textvariable=self.trigger_rearm_var, width=8).pack(side=tk.LEFT, padx=5)
+        row += 1
+
+        # --- Aggregation (several contacts -> one device) ---
+        ttk.Separator(right_frame, orient=tk.HORIZONTAL).grid(row=row, column=0, columnspan=2, sticky="ew", pady=10)
+        row += 1
+        ttk.Label(right_frame, text="Combine Contacts", font=("Arial", 10, "bold")).grid(row=row, column=0, columnspan=2, sticky="w", padx=5)
+        row += 1
+
+        ttk.Label(right_frame, text="Combine Mode:").grid(row=row, column=0, sticky="w", padx=5, pady=5)
+        self.aggregate_mode_var = tk.StringVar(value=NO_AGGREGATE)
+        ttk.Combobox(right_frame, textvariable=self.aggregate_mode_var, values=[NO_AGGREGATE, "max", "sum", "average", "priority"], state="readonly").grid(row=row, column=1, sticky="ew", padx=5, pady=5)
+        row += 1
+
+        ttk.Label(right_frame, text="Other Contacts (id:weight:priority, ...):").grid(row=row, column=0, sticky="w", padx=5, pady=5)
+        self.aggregate_inputs_var = tk.StringVar()
+        ttk.Entry(right_frame, textvariable=self.aggregate_inputs_var).grid(row=row, column=1, sticky="ew", padx=5, pady=5)
+        row += 1
+
         # Save Button
         ttk.Button(right_frame, text="Save Mapping", command=self._save_binding).grid(row=row, column=0, columnspan=2, pady=20)
         
@@ -163,21 +259,36 @@ class MappingsTab(ttk.Frame):
         values = [f"{c.name} ({c.id})" for c in contacts]
         self.contact_combobox['values'] = values
 
+    def _refresh_patterns_combo(self, event=None):
+        names = self.get_patterns() if self.get_patterns else []
+        self.pattern_combo['values'] = [NO_PATTERN] + list(names)
+
+    def refresh_devices(self):
+        self._refresh_devices_combo()
+
     def _refresh_devices_combo(self, event=None):
-        # Aggregate all devices from all modules
-        device_list = []
-        for mod_name, module in self.modules.items():
-            if hasattr(module, 'devices') and module.devices:
-                for dev in module.devices:
-                    # Format: "ModuleName : DeviceName (ID)"
-                    display = f"{mod_name} : {dev.get('name', 'Unknown')} ({dev.get('id', '?')})"
-                    device_list.append(display)
-        
+        if self.registry is not None:
+            self.device_choices = self.registry.devices()
+        else:
+            # Aggregate all devices from all modules
+            self.device_choices = [
+                KnownDevice(module_name=mod_name, device_id=str(dev.get('id', '?')),
+                            name=dev.get('name', 'Unknown'), status=dev.get('status') or 'online')
+                for mod_name, module in self.modules.items()
+                for dev in (getattr(module, 'devices', None) or [])
+            ]
+
+        device_list = [display_name(d) for d in self.device_choices]
         if not device_list:
             device_list = ["No devices found (Try scanning in Devices tab)"]
             
         self.device_combobox['values'] = device_list
 
+    def _on_device_selected(self, event=None):
+        index = self.device_combobox.current()
+        if 0 <= index < len(self.device_choices):
+            self.selected_device = self.device_choices[index]
+
     def _new_binding(self):
         # Create a placeholder binding
         new_b = Binding(
@@ -187,8 +298,7 @@ class MappingsTab(ttk.Frame):
             reaction_type="vibrate",
             intensity=1.0, duration=0.5
         )
-        self.bindings.append(new_b)
-        self._refresh_list()
+        self.model.append(new_b)
         
         # Select the new item
         last_idx = len(self.bindings) - 1
@@ -201,9 +311,16 @@ class MappingsTab(ttk.Frame):
     def _clear_form(self):
         self.contact_combobox.set('')
         self.device_combobox.set('')
+        self.selected_device = None
         self.reaction_var.set('vibrate')
+        self.pattern_var.set(NO_PATTERN)
         self.intensity_var.set(1.0)
         self.duration_var.set(0.5)
+        self.auto_stop_var.set(True)
+        self.ramp_down_var.set(0.0)
+        self.deadband_var.set(0.0)
+        self.min_change_var.set(0.005)
+        self.pass_repeats_var.set(False)
         
         self.use_mapping_var.set(False)
         self.input_min_var.set(0.0)
@@ -212,6 +329,13 @@ class MappingsTab(ttk.Frame):
         self.output_max_var.set(1.0)
         self.curve_var.set('linear')
         self.continuous_var.set(False)
+        self.trigger_edge_var.set('rising')
+        self.trigger_threshold_var.set(0.0)
+        self.trigger_hysteresis_var.set(0.0)
+        self.trigger_velocity_var.set(0.0)
+        self.trigger_rearm_var.set(0.0)
+        self.aggregate_mode_var.set(NO_AGGREGATE)
+        self.aggregate_inputs_var.set('')
         self._toggle_mapping_fields()
 
     def _on_select(self, event):
@@ -226,10 +350,25 @@ class MappingsTab(ttk.Frame):
         # Populate form
         # We need to match the combo strings
         self.contact_combobox.set(f"{binding.contact_name} ({binding.contact_id})")
-        self.device_combobox.set(f"{binding.module_name} : {binding.device_name} ({binding.device_id})")
+        # Bindings keep pointing at their device even before a scan has found it this run
+        device = self.registry.get(binding.module_name, binding.device_id) if self.registry is not None else None
+        if device is None and binding.module_name != "?":
+            device = KnownDevice(module_name=binding.module_name, device_id=binding.device_id,
+                                 name=binding.device_name)
+        self.selected_device = device
+        if device is not None:
+            self.device_combobox.set(display_name(device))
+        else:
+            self.device_combobox.set(f"{binding.module_name} : {binding.device_name} ({binding.device_id})")
         self.reaction_var.set(binding.reaction_type)
+        self.pattern_var.set(getattr(binding, 'pattern', None) or NO_PATTERN)
         self.intensity_var.set(binding.intensity)
         self.duration_var.set(binding.duration)
+        self.auto_stop_var.set(getattr(binding, 'auto_stop', True))
+        self.ramp_down_var.set(getattr(binding, 'ramp_down', 0.0))
+        self.deadband_var.set(getattr(binding, 'deadband', 0.0))
+        self.min_change_var.set(getattr(binding, 'min_change', 0.005))
+        self.pass_repeats_var.set(getattr(binding, 'pass_repeats', False))
         
         # Mapping fields
         self.use_mapping_var.set(getattr(binding, 'use_mapping', False))
@@ -239,6 +378,15 @@ class MappingsTab(ttk.Frame):
         self.output_max_var.set(getattr(binding, 'output_max', 1.0))
         self.curve_var.set(getattr(binding, 'curve_type', 'linear'))
         self.continuous_var.set(getattr(binding, 'is_continuous', False))
+        self.trigger_edge_var.set(getattr(binding, 'trigger_edge', 'rising'))
+        self.trigger_threshold_var.set(getattr(binding, 'trigger_threshold', 0.0))
+        self.trigger_hysteresis_var.set(getattr(binding, 'trigger_hysteresis', 0.0))
+        self.trigger_velocity_var.set(getattr(binding, 'trigger_velocity', 0.0))
+        self.trigger_rearm_var.set(getattr(binding, 'trigger_rearm', 0.0))
+        self.aggregate_mode_var.set(getattr(binding, 'aggregate_mode', None) or NO_AGGREGATE)
+        self.aggregate_inputs_var.set(", ".join(
+            f"{i.contact_id}:{i.weight:g}:{i.priority}" for i in getattr(binding, 'aggregate_inputs', [])
+        ))
         self._toggle_mapping_fields()
 
     def _save_binding(self):
@@ -255,21 +403,28 @@ class MappingsTab(ttk.Frame):
             messagebox.showerror("Error", "Invalid contact format selected.")
             return
 
-        # Parse Device
-        d_str = self.device_combobox.get()
-        if not d_str or "No devices found" in d_str:
+        device = self.selected_device
+        if device is None:
             messagebox.showwarning("Missing Info", "Please select a device.")
             return
-        # Format: "Module : Device (ID)"
+        mod_name, d_id, d_name = device.module_name, device.device_id, device.name
+
+        # Parse aggregate inputs "id:weight:priority, ..." (weight and priority optional)
+        aggregate_inputs = []
         try:
-            parts = d_str.split(' : ')
-            mod_name = parts[0]
-            rest = parts[1]
-            d_name = rest.rsplit(' (', 1)[0]
-            d_id = rest.rsplit(' (', 1)[1][:-1]
-        except:
-            messagebox.showerror("Error", "Invalid device format selected.")
+            for item in self.aggregate_inputs_var.get().split(','):
+                parts = [p.strip() for p in item.split(':')]
+                if not parts[0]:
+                    continue
+                aggregate_inputs.append(AggregateInput(
+                    contact_id=parts[0],
+                    weight=float(parts[1]) if len(parts) > 1 and parts[1] else 1.0,
+                    priority=int(parts[2]) if len(parts) > 2 and parts[2] else 0
+                ))
+        except ValueError:
+            messagebox.showerror("Error", "Invalid combine contacts format. Use id:weight:priority, ...")
             return
+        aggregate_mode = self.aggregate_mode_var.get()
 
         binding = Binding(
             contact_id=c_id,
@@ -278,8 +433,14 @@ class MappingsTab(ttk.Frame):
             device_id=d_id,
             device_name=d_name,
             reaction_type=self.reaction_var.get(),
+            pattern=None if self.pattern_var.get() == NO_PATTERN else self.pattern_var.get(),
             intensity=self.intensity_var.get(),
             duration=self.duration_var.get(),
+            auto_stop=self.auto_stop_var.get(),
+            ramp_down=self.ramp_down_var.get(),
+            deadband=self.deadband_var.get(),
+            min_change=self.min_change_var.get(),
+            pass_repeats=self.pass_repeats_var.get(),
             # Mapping fields
             use_mapping=self.use_mapping_var.get(),
             input_min=self.input_min_var.get(),
@@ -287,15 +448,31 @@ class MappingsTab(ttk.Frame):
             output_min=self.output_min_var.get(),
             output_max=self.output_max_var.get(),
             curve_type=self.curve_var.get(),
-            is_continuous=self.continuous_var.get()
+            is_continuous=self.continuous_var.get(),
+            trigger_edge=self.trigger_edge_var.get(),
+            trigger_threshold=self.trigger_threshold_var.get(),
+            trigger_hysteresis=self.trigger_hysteresis_var.get(),
+            trigger_velocity=self.trigger_velocity_var.get(),
+            trigger_rearm=self.trigger_rearm_var.get(),
+            aggregate_mode=None if aggregate_mode == NO_AGGREGATE else aggregate_mode,
+            aggregate_inputs=aggregate_inputs,
+            # Not on the form, kept from the edited binding
+            layout=self.bindings[self.selected_binding_index].layout if self.selected_binding_index is not None else None
         )
 
+        # Trigger, pulse and pattern state is kept per binding_key, so it must stay unique
+        key = binding_key(binding)
+        if any(binding_key(b) == key for i, b in enumerate(self.bindings) if i != self.selected_binding_index):
+            messagebox.showwarning("Duplicate Mapping",
+                                   "This contact already drives that device with this reaction. "
+                                   "Edit the existing mapping instead.")
+            return
+
         if self.selected_binding_index is not None:
-            self.bindings[self.selected_binding_index] = binding
+            self.model.replace(self.selected_binding_index, binding)
         else:
-            self.bindings.append(binding)
+            self.model.append(binding)
             
-        self._refresh_list()
         self._new_binding() # Reset selection
         messagebox.showinfo("Saved", "Mapping saved!")
         self._notify_change()
@@ -306,12 +483,6 @@ class MappingsTab(ttk.Frame):
             return
         
         if messagebox.askyesno("Confirm", "Delete selected mapping?"):
-            del self.bindings[sel[0]]
-            self._refresh_list()
+            self.model.pop(sel[0])
             self._new_binding()
             self._notify_change()
-
-    def _refresh_list(self):
-        self.bindings_listbox.delete(0, tk.END)
-        for b in self.bindings:
-            self.bindings_listbox.insert(tk.END, f"{b.contact_name} -> {b.device_name} ({b.reaction_type})")
@@ -1,12 +1,17 @@
 import tkinter as tk
 from tkinter import ttk
 
+from ui.list_model import KeyedListModel, ADDED, REMOVED, MODIFIED, MOVED
+
 class VisualizerTab(ttk.Frame):
     def __init__(self, parent):
         super().__init__(parent)
         self.bars = {}
         self.contacts_map = {} # Path -> ID map
-        self.contact_widgets = {} # ID -> (Label, ProgressBar, ValueLabel)
+        self.contact_widgets = {} # Path -> (ProgressBar, ValueLabel)
+        self.rows = {} # model key -> (frame, name label, progress bar, value label, osc path)
+        self.empty_label = None
+        self.model = None # KeyedListModel of the shown contacts
         
         self.canvas = tk.Canvas(self)
         self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
@@ -27,36 +32,89 @@ class VisualizerTab(ttk.Frame):
         
         ttk.Label(self.scrollable_frame, text="Active Inputs Visualizer", font=("Helvetica", 12, "bold")).pack(pady=10)
 
-    def update_contacts(self, contacts):
-        # Clear existing
-        for w in self.scrollable_frame.winfo_children():
-            if w.winfo_class() == 'TLabel' and w.cget("text") == "Active Inputs Visualizer":
-                continue
-            w.destroy()
-            
-        self.bars = {}
-        self.contacts_map = {}
-        self.contact_widgets = {}
+    def bind_model(self, model):
+        """Shows the contacts of a KeyedListModel and follows its changes row by row."""
+        if self.model is not None:
+            self.model.unsubscribe(self._on_contact_change)
+            for key in list(self.rows):
+                self._drop_row(key)
+        self.model = model
+        model.subscribe(self._on_contact_change)
+        for index, (key, contact) in enumerate(zip(model.keys, model.items)):
+            self._add_row(key, index, contact)
+        self._update_empty()
 
-        if not contacts:
-            ttk.Label(self.scrollable_frame, text="No contacts configured.").pack(padx=20)
-            return
+    def update_contacts(self, contacts):
+        # Without a bound model the tab keeps its own, so only differences touch widgets
+        if self.model is None:
+            self.bind_model(KeyedListModel(key=lambda c: c.id))
+        self.model.set_items(contacts)
 
-        for contact in contacts:
-            frame = ttk.Frame(self.scrollable_frame)
-            frame.pack(fill=tk.X, padx=10, pady=2)
-            
-            ttk.Label(frame, text=contact.name, width=20).pack(side=tk.LEFT)
-            
-            pb = ttk.Progressbar(frame, orient="horizontal", length=200, mode="determinate")
-            pb.pack(side=tk.LEFT, padx=10)
-            
-            val_lbl = ttk.Label(frame, text="0.0")
-            val_lbl.pack(side=tk.LEFT)
-            
+    def _on_contact_change(self, kind, key, index, contact, old_index):
+        if kind == ADDED:
+            self._add_row(key, index, contact)
+        elif kind == REMOVED:
+            self._drop_row(key)
+        elif kind == MOVED:
+            self._place(self.rows[key][0], index)
+        elif kind == MODIFIED:
+            frame, name_lbl, pb, val_lbl, osc_path = self.rows[key]
+            if name_lbl.cget("text") != contact.name:
+                name_lbl.configure(text=contact.name)
+            if osc_path != contact.osc_path:
+                self._unmap(osc_path, pb)
+                self.rows[key] = (frame, name_lbl, pb, val_lbl, contact.osc_path)
             # Map OSC path to this widget set
-            self.contacts_map[contact.osc_path] = contact.name # Or use ID
+            self.contacts_map[contact.osc_path] = contact.name
             self.contact_widgets[contact.osc_path] = (pb, val_lbl)
+        self._update_empty()
+
+    def _add_row(self, key, index, contact):
+        frame = ttk.Frame(self.scrollable_frame)
+        self._place(frame, index)
+
+        name_lbl = ttk.Label(frame, text=contact.name, width=20)
+        name_lbl.pack(side=tk.LEFT)
+
+        pb = ttk.Progressbar(frame, orient="horizontal", length=200, mode="determinate")
+        pb.pack(side=tk.LEFT, padx=10)
+
+        val_lbl = ttk.Label(frame, text="0.0")
+        val_lbl.pack(side=tk.LEFT)
+        self.rows[key] = (frame, name_lbl, pb, val_lbl, contact.osc_path)
+
+        # Map OSC path to this widget set
+        self.contacts_map[contact.osc_path] = contact.name
+        self.contact_widgets[contact.osc_path] = (pb, val_lbl)
+
+    def _drop_row(self, key):
+        frame, name_lbl, pb, val_lbl, osc_path = self.rows.pop(key)
+        self._unmap(osc_path, pb)
+        frame.destroy()
+
+    def _unmap(self, osc_path, pb):
+        # Another contact may have taken over the path since
+        if self.contact_widgets.get(osc_path, (None,))[0] is pb:
+            del self.contact_widgets[osc_path]
+            self.contacts_map.pop(osc_path, None)
+
+    def _place(self, frame, index):
+        """Packs frame as row `index`, in front of the row currently following it in the model."""
+        keys = self.model.keys
+        following = self.rows.get(keys[index + 1]) if index + 1 < len(keys) else None
+        if following is not None and following[0] is not frame:
+            frame.pack(fill=tk.X, padx=10, pady=2, before=following[0])
+        else:
+            frame.pack_forget()
+            frame.pack(fill=tk.X, padx=10, pady=2)
+
+    def _update_empty(self):
+        if self.rows and self.empty_label is not None:
+            self.empty_label.destroy()
+            self.empty_label = None
+        elif not self.rows and self.empty_label is None:
+            self.empty_label = ttk.Label(self.scrollable_frame, text="No contacts configured.")
+            self.empty_label.pack(padx=20)
 
     def process_osc_message(self, address, args):
         if address in self.contact_widgets: